@@ -1,924 +1,5437 @@
 # E-commerce Store Management System - Complete with Visualization
 # For BBA Students - Integrated System with Data Analytics
 
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+import argparse
+import asyncio
+import base64
+import csv
+import html
+import io
+import itertools
 import json
 import os
+import bisect
+import sqlite3
+import calendar
+import math
+import re
+import sys
+import queue
+import random
+import tempfile
+import threading
+import urllib.request
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import pandas as pd
 import numpy as np
 
-class EcommerceStoreComplete:
-    def __init__(self):
-        self.products = {}
-        self.sales_history = []
-        self.total_revenue = 0.0
-        self.data_file = "store_data.json"
-        
-        # Create main window
-        self.root = tk.Tk()
-        self.root.title("🛒 E-commerce Store Manager - Complete System")
-        self.root.geometry("1200x800")
-        self.root.configure(bg='#f0f0f0')
-        
-        # Load data
-        self.load_data()
-        
-        # Setup GUI
-        self.setup_gui()
+# pandas and matplotlib are only needed for analytics. load_analytics_stack()
+# imports them on first use, so the inventory window opens without them.
+pd = cm = Figure = FigureCanvasAgg = FigureCanvasTkAgg = None
+analytics_stack_lock = threading.Lock()
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
+
+def load_analytics_stack():
+    """Import pandas and matplotlib if not yet loaded; returns the seconds spent"""
+    global pd, cm, Figure, FigureCanvasAgg, FigureCanvasTkAgg
+    if FigureCanvasTkAgg is not None:
+        return 0.0
+    with analytics_stack_lock:
+        if FigureCanvasTkAgg is not None:
+            return 0.0
+        started = time.perf_counter()
+        import pandas as pd
+        import matplotlib.cm as cm
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        # Assigned last: other threads treat it as "everything is loaded"
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        return time.perf_counter() - started
+
+class SalesLedger:
+    """Sales history stored as growable, typed NumPy columns.
     
-    def load_data(self):
-        """Load existing data from file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as file:
-                    data = json.load(file)
-                    self.products = data.get('products', {})
-                    self.sales_history = data.get('sales_history', [])
-                    self.total_revenue = data.get('total_revenue', 0.0)
-            except:
-                pass
+    Each sale costs ~36 bytes: an int64 epoch timestamp, an interned product
+    code, the quantity and two float amounts. Indexing, slicing and
+    iteration still hand out the familiar sale dicts, so existing callers
+    keep working, while to_frame() gives pandas zero-copy column views.
+    """
     
-    def save_data(self):
-        """Save current data to file"""
-        data = {
-            'products': self.products,
-            'sales_history': self.sales_history,
-            'total_revenue': self.total_revenue
-        }
-        try:
-            with open(self.data_file, 'w') as file:
-                json.dump(data, file, indent=2)
-            messagebox.showinfo("Success", "Data saved successfully!")
-        except:
-            messagebox.showerror("Error", "Error saving data.")
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    COLUMNS = ('timestamp', 'code', 'quantity', 'unit_price', 'total_amount')
     
-    def setup_gui(self):
-        """Setup the main GUI interface"""
-        
-        # Title Frame
-        title_frame = tk.Frame(self.root, bg='#2c3e50', height=60)
-        title_frame.pack(fill='x', padx=5, pady=5)
-        title_frame.pack_propagate(False)
-        
-        title_label = tk.Label(title_frame, text="🛒 E-COMMERCE STORE MANAGER", 
-                              font=('Arial', 16, 'bold'), fg='white', bg='#2c3e50')
-        title_label.pack(expand=True)
-        
-        # Dashboard Frame
-        dashboard_frame = tk.Frame(self.root, bg='#f0f0f0')
-        dashboard_frame.pack(fill='x', padx=5, pady=5)
-        
-        # Revenue Display
-        self.revenue_frame = tk.Frame(dashboard_frame, bg='#27ae60', height=50)
-        self.revenue_frame.pack(side='left', fill='both', expand=True, padx=2)
-        
-        self.revenue_label = tk.Label(self.revenue_frame, 
-                                     text=f"💰 Revenue: ${self.total_revenue:.2f}", 
-                                     font=('Arial', 12, 'bold'), fg='white', bg='#27ae60')
-        self.revenue_label.pack(expand=True)
-        
-        # Products Count
-        self.products_frame = tk.Frame(dashboard_frame, bg='#3498db', height=50)
-        self.products_frame.pack(side='left', fill='both', expand=True, padx=2)
-        
-        self.products_label = tk.Label(self.products_frame, 
-                                      text=f"📦 Products: {len(self.products)}", 
-                                      font=('Arial', 12, 'bold'), fg='white', bg='#3498db')
-        self.products_label.pack(expand=True)
-        
-        # Sales Count
-        self.sales_frame = tk.Frame(dashboard_frame, bg='#e74c3c', height=50)
-        self.sales_frame.pack(side='left', fill='both', expand=True, padx=2)
-        
-        self.sales_label = tk.Label(self.sales_frame, 
-                                    text=f"🛍️ Sales: {len(self.sales_history)}", 
-                                    font=('Arial', 12, 'bold'), fg='white', bg='#e74c3c')
-        self.sales_label.pack(expand=True)
-        
-        # Button Frame
-        button_frame = tk.Frame(self.root, bg='#f0f0f0')
-        button_frame.pack(fill='x', padx=10, pady=5)
-        
-        buttons = [
-            ("➕ Add Product", self.add_product_dialog, '#3498db'),
-            ("📦 Update Stock", self.update_stock_dialog, '#f39c12'),
-            ("❌ Remove", self.remove_product_dialog, '#e74c3c'),
-            ("🛒 Process Order", self.process_order_dialog, '#2ecc71'),
-            ("📊 Sales Report", self.show_sales_report, '#9b59b6'),
-            ("⚠️ Low Stock", self.check_low_stock, '#e67e22'),
-            ("📈 Analytics", self.show_visualizations, '#16a085'),
-            ("💾 Save", self.save_data, '#34495e')
-        ]
-        
-        for i, (text, command, color) in enumerate(buttons):
-            btn = tk.Button(button_frame, text=text, command=command, 
-                           font=('Arial', 9, 'bold'), fg='white', bg=color,
-                           width=13, height=2, relief='flat')
-            btn.grid(row=i//4, column=i%4, padx=3, pady=3, sticky='ew')
-        
-        for i in range(4):
-            button_frame.columnconfigure(i, weight=1)
-        
-        # Inventory Frame
-        inventory_frame = tk.LabelFrame(self.root, text="📋 Current Inventory", 
-                                       font=('Arial', 12, 'bold'), bg='#f0f0f0')
-        inventory_frame.pack(fill='both', expand=True, padx=10, pady=5)
-        
-        columns = ('ID', 'Name', 'Price', 'Stock', 'Sold', 'Revenue')
-        self.inventory_tree = ttk.Treeview(inventory_frame, columns=columns, show='headings', height=12)
-        
-        col_widths = {'ID': 100, 'Name': 200, 'Price': 100, 'Stock': 80, 'Sold': 80, 'Revenue': 120}
-        for col in columns:
-            self.inventory_tree.heading(col, text=col)
-            self.inventory_tree.column(col, width=col_widths[col], anchor='center')
-        
-        scrollbar = ttk.Scrollbar(inventory_frame, orient='vertical', command=self.inventory_tree.yview)
-        self.inventory_tree.configure(yscrollcommand=scrollbar.set)
-        
-        self.inventory_tree.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
-        
-        self.update_inventory_display()
-        
-        # Status bar
-        self.status_bar = tk.Label(self.root, text="Ready", 
-                                  bd=1, relief='sunken', anchor='w', bg='#ecf0f1')
-        self.status_bar.pack(side='bottom', fill='x')
-        
-        self.update_dashboard()
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._codes = np.empty(capacity, dtype=np.int32)
+        self._quantities = np.empty(capacity, dtype=np.int64)
+        self._unit_prices = np.empty(capacity, dtype=np.float64)
+        self._amounts = np.empty(capacity, dtype=np.float64)
+        # Interned (product_id, product_name) pairs; a code indexes both lists
+        self.product_ids = []
+        self.product_names = []
+        self._code_index = {}
     
-    def update_inventory_display(self):
-        """Update the inventory treeview"""
-        for item in self.inventory_tree.get_children():
-            self.inventory_tree.delete(item)
-        
-        for product_id, product in self.products.items():
-            revenue = product['price'] * product['total_sold']
-            self.inventory_tree.insert('', 'end', values=(
-                product_id,
-                product['name'],
-                f"${product['price']:.2f}",
-                product['quantity'],
-                product['total_sold'],
-                f"${revenue:.2f}"
-            ))
+    @classmethod
+    def from_records(cls, records):
+        ledger = cls(capacity=max(len(records), 1024))
+        ledger.extend(records)
+        return ledger
     
-    def update_dashboard(self):
-        """Update dashboard displays"""
-        self.revenue_label.config(text=f"💰 Revenue: ${self.total_revenue:.2f}")
-        self.products_label.config(text=f"📦 Products: {len(self.products)}")
-        self.sales_label.config(text=f"🛍️ Sales: {len(self.sales_history)}")
+    @classmethod
+    def from_columns(cls, columns, product_ids, product_names):
+        """Wrap existing column arrays, such as memory-mapped .npy files, without copying.
         
-        total_items = sum(p['quantity'] for p in self.products.values())
-        self.status_bar.config(text=f"Ready | Products: {len(self.products)} | Stock: {total_items}")
+        The arrays are never written to: the first append moves the rows
+        into new, growable arrays.
+        """
+        ledger = cls.__new__(cls)
+        ledger._size = len(columns['timestamp'])
+        ledger._timestamps = columns['timestamp']
+        ledger._codes = columns['code']
+        ledger._quantities = columns['quantity']
+        ledger._unit_prices = columns['unit_price']
+        ledger._amounts = columns['total_amount']
+        ledger.product_ids = list(product_ids)
+        ledger.product_names = list(product_names)
+        ledger._code_index = {key: code for code, key in enumerate(zip(ledger.product_ids, ledger.product_names))}
+        return ledger
     
-    def add_product_dialog(self):
-        """Dialog to add new product"""
-        dialog = tk.Toplevel(self.root)
-        dialog.title("Add New Product")
-        dialog.geometry("400x300")
-        dialog.configure(bg='#f0f0f0')
-        dialog.grab_set()
-        
-        tk.Label(dialog, text="Add New Product", font=('Arial', 14, 'bold'), bg='#f0f0f0').pack(pady=10)
-        
-        fields = [
-            ("Product ID:", tk.StringVar()),
-            ("Product Name:", tk.StringVar()),
-            ("Price ($):", tk.StringVar()),
-            ("Initial Stock:", tk.StringVar())
-        ]
-        
-        entries = {}
-        for label_text, var in fields:
-            frame = tk.Frame(dialog, bg='#f0f0f0')
-            frame.pack(fill='x', padx=20, pady=5)
-            tk.Label(frame, text=label_text, width=15, anchor='w', bg='#f0f0f0').pack(side='left')
-            entry = tk.Entry(frame, textvariable=var, width=25)
-            entry.pack(side='right')
-            entries[label_text] = var
-        
-        def add_product():
-            try:
-                product_id = entries["Product ID:"].get().strip()
-                name = entries["Product Name:"].get().strip()
-                price = float(entries["Price ($):"].get())
-                quantity = int(entries["Initial Stock:"].get())
-                
-                if not product_id or not name:
-                    messagebox.showerror("Error", "Please fill all fields!")
-                    return
-                
-                if product_id in self.products:
-                    messagebox.showerror("Error", f"Product {product_id} already exists!")
-                    return
-                
-                self.products[product_id] = {
-                    'name': name,
-                    'price': price,
-                    'quantity': quantity,
-                    'total_sold': 0
-                }
-                
-                self.update_inventory_display()
-                self.update_dashboard()
-                messagebox.showinfo("Success", f"Product '{name}' added!")
-                dialog.destroy()
-                
-            except ValueError:
-                messagebox.showerror("Error", "Invalid input!")
-        
-        button_frame = tk.Frame(dialog, bg='#f0f0f0')
-        button_frame.pack(pady=20)
-        
-        tk.Button(button_frame, text="Add", command=add_product, 
-                 bg='#3498db', fg='white', font=('Arial', 10, 'bold'), width=10).pack(side='left', padx=10)
-        tk.Button(button_frame, text="Cancel", command=dialog.destroy, 
-                 bg='#95a5a6', fg='white', font=('Arial', 10, 'bold'), width=10).pack(side='left')
+    def __len__(self):
+        return self._size
     
-    def update_stock_dialog(self):
-        """Update product stock"""
-        if not self.products:
-            messagebox.showwarning("Warning", "No products available!")
-            return
-        
-        product_id = simpledialog.askstring("Update Stock", "Enter Product ID:")
-        if not product_id or product_id not in self.products:
-            messagebox.showerror("Error", "Product not found!")
+    def _intern(self, product_id, product_name):
+        key = (product_id, product_name)
+        code = self._code_index.get(key)
+        if code is None:
+            code = len(self.product_ids)
+            self._code_index[key] = code
+            self.product_ids.append(product_id)
+            self.product_names.append(product_name)
+        return code
+    
+    def _reserve(self, capacity):
+        if capacity <= len(self._timestamps):
             return
-        
-        new_quantity = simpledialog.askinteger("Update Stock", 
-                                              f"Current: {self.products[product_id]['quantity']}\nNew quantity:")
-        if new_quantity is not None and new_quantity >= 0:
-            self.products[product_id]['quantity'] = new_quantity
-            self.update_inventory_display()
-            self.update_dashboard()
-            messagebox.showinfo("Success", "Stock updated!")
+        capacity = max(capacity, 2 * len(self._timestamps))
+        for name in ('_timestamps', '_codes', '_quantities', '_unit_prices', '_amounts'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
     
-    def remove_product_dialog(self):
-        """Remove product"""
-        if not self.products:
-            messagebox.showwarning("Warning", "No products!")
+    def append(self, sale_record):
+        """Append one sale dict"""
+        self._reserve(self._size + 1)
+        i = self._size
+        self._timestamps[i] = calendar.timegm(time.strptime(sale_record['date'], self.DATE_FORMAT))
+        self._codes[i] = self._intern(sale_record['product_id'], sale_record['product_name'])
+        self._quantities[i] = sale_record['quantity']
+        self._unit_prices[i] = sale_record['unit_price']
+        self._amounts[i] = sale_record['total_amount']
+        self._size += 1
+    
+    def extend(self, records):
+        """Append many sale dicts, parsing their dates in one vectorized pass"""
+        records = list(records)
+        if not records:
             return
+        start, end = self._size, self._size + len(records)
+        self._reserve(end)
+        dates = np.array([sale['date'] for sale in records], dtype='datetime64[s]')
+        self._timestamps[start:end] = dates.astype(np.int64)
+        self._codes[start:end] = [self._intern(sale['product_id'], sale['product_name']) for sale in records]
+        self._quantities[start:end] = [sale['quantity'] for sale in records]
+        self._unit_prices[start:end] = [sale['unit_price'] for sale in records]
+        self._amounts[start:end] = [sale['total_amount'] for sale in records]
+        self._size = end
+    
+    def _record(self, i):
+        code = self._codes[i]
+        return {
+            'date': time.strftime(self.DATE_FORMAT, time.gmtime(int(self._timestamps[i]))),
+            'product_id': self.product_ids[code],
+            'product_name': self.product_names[code],
+            'quantity': int(self._quantities[i]),
+            'unit_price': float(self._unit_prices[i]),
+            'total_amount': float(self._amounts[i])
+        }
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("sales index out of range")
+        return self._record(index)
+    
+    def __iter__(self):
+        for i in range(self._size):
+            yield self._record(i)
+    
+    def snapshot(self):
+        """Frozen view sharing the filled column memory; safe to read from a worker thread.
         
-        product_id = simpledialog.askstring("Remove Product", "Enter Product ID:")
-        if not product_id or product_id not in self.products:
-            messagebox.showerror("Error", "Product not found!")
-            return
+        Later appends write past the snapshot's end or into new arrays, so
+        the rows it sees never change.
+        """
+        view = SalesLedger.__new__(SalesLedger)
+        view._size = self._size
+        for name in ('_timestamps', '_codes', '_quantities', '_unit_prices', '_amounts'):
+            setattr(view, name, getattr(self, name)[:self._size])
+        view.product_ids = list(self.product_ids)
+        view.product_names = list(self.product_names)
+        view._code_index = dict(self._code_index)
+        return view
+    
+    def columns(self):
+        """Zero-copy views of the filled part of each column"""
+        n = self._size
+        return {
+            'timestamp': self._timestamps[:n],
+            'code': self._codes[:n],
+            'quantity': self._quantities[:n],
+            'unit_price': self._unit_prices[:n],
+            'total_amount': self._amounts[:n]
+        }
+    
+    def summary(self):
+        """Return (transactions, revenue, items sold)"""
+        cols = self.columns()
+        return self._size, float(cols['total_amount'].sum()), int(cols['quantity'].sum())
+    
+    def time_index(self, previous=None):
+        """SalesTimeIndex over the sales so far; index a snapshot() if others may append meanwhile.
         
-        name = self.products[product_id]['name']
-        if messagebox.askyesno("Confirm", f"Remove '{name}'?"):
-            del self.products[product_id]
-            self.update_inventory_display()
-            self.update_dashboard()
-            messagebox.showinfo("Success", f"'{name}' removed!")
+        Given the index of an earlier snapshot, extends that one with the
+        sales since instead of indexing the whole history again.
+        """
+        cols = self.columns()
+        args = (cols['timestamp'], cols['code'], cols['quantity'], cols['total_amount'],
+                list(self.product_ids), lambda positions: [self._record(i) for i in positions])
+        if isinstance(previous, SalesTimeIndex) and previous.extend(*args):
+            return previous
+        return SalesTimeIndex(*args)
+
+
+class SalesTimeIndex:
+    """Sales sorted by time with running totals, for date-range reports.
     
-    def process_order_dialog(self):
-        """Process customer order"""
-        if not self.products:
-            messagebox.showwarning("Warning", "No products!")
-            return
+    Built from the sales columns, then extended as sales are appended. A
+    range's bounds are two binary searches over the sorted timestamps and
+    its totals are differences of prefix sums, so a summary costs O(log n)
+    however many sales it covers, and indexing new sales costs O(new).
+    Per-product indexes are built the first time a product is asked for.
+    Sale dicts are fetched from the history only for the rows on screen.
+    """
+    
+    def __init__(self, timestamps, codes, quantities, amounts, product_ids, fetch):
+        # fetch(positions) returns the sale dicts at those history positions
+        self.fetch = fetch
+        self.product_ids = product_ids
+        if len(timestamps) and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+        else:
+            # Sales are appended as they happen, so this is the usual case
+            order = np.arange(len(timestamps))
+        # Arrays grow by doubling; only the first `size` rows are filled
+        self.size = len(order)
+        self.positions = order
+        self.codes = codes[order]
+        self.quantities = quantities[order]
+        self.amounts = amounts[order]
+        self.subsets = {None: self._subset(np.arange(len(order)), timestamps[order])}
+    
+    @staticmethod
+    def _put(array, used, values):
+        """Write values after the first `used` entries, doubling the capacity when full"""
+        end = used + len(values)
+        if end > len(array):
+            grown = np.empty(max(end, 2 * len(array)), dtype=array.dtype)
+            grown[:used] = array[:used]
+            array = grown
+        array[used:end] = values
+        return array
+    
+    def _subset(self, rows, timestamps):
+        subset = {'rows': np.empty(0, dtype=np.int64), 'timestamps': np.empty(0, dtype=np.int64),
+                  'revenue': np.zeros(1), 'quantity': np.zeros(1, dtype=np.int64), 'size': 0}
+        self._extend_subset(subset, rows, timestamps)
+        return subset
+    
+    def _extend_subset(self, subset, rows, timestamps):
+        """Append rows (in time order) to a subset, carrying its prefix sums on"""
+        used = subset['size']
+        subset['rows'] = self._put(subset['rows'], used, rows)
+        subset['timestamps'] = self._put(subset['timestamps'], used, timestamps)
+        subset['revenue'] = self._put(subset['revenue'], used + 1,
+                                      subset['revenue'][used] + np.cumsum(self.amounts[rows]))
+        subset['quantity'] = self._put(subset['quantity'], used + 1,
+                                       subset['quantity'][used] + np.cumsum(self.quantities[rows]))
+        subset['size'] = used + len(rows)
+    
+    def _codes_of(self, product_id):
+        return [code for code, pid in enumerate(self.product_ids) if pid == product_id]
+    
+    def extend(self, timestamps, codes, quantities, amounts, product_ids, fetch):
+        """Index the sales appended to the history since this index was built.
         
-        product_id = simpledialog.askstring("Process Order", "Enter Product ID:")
-        if not product_id or product_id not in self.products:
-            messagebox.showerror("Error", "Product not found!")
+        Takes the same arguments as the constructor, covering the whole
+        history. Returns False, leaving the index as it was, when the new
+        sales do not follow the indexed ones in time; build a new index then.
+        """
+        first = self.size
+        if len(timestamps) < first:
+            return False
+        new = np.asarray(timestamps[first:])
+        whole = self.subsets[None]
+        if len(new) and (np.any(new[1:] < new[:-1])
+                         or (first and new[0] < whole['timestamps'][first - 1])):
+            return False
+        new_codes = np.asarray(codes[first:])
+        self.positions = self._put(self.positions, first, np.arange(first, first + len(new)))
+        self.codes = self._put(self.codes, first, new_codes)
+        self.quantities = self._put(self.quantities, first, quantities[first:])
+        self.amounts = self._put(self.amounts, first, amounts[first:])
+        self.size = first + len(new)
+        self.product_ids = product_ids
+        self.fetch = fetch
+        for product_id, subset in self.subsets.items():
+            if product_id is None:
+                offsets = np.arange(len(new))
+            else:
+                offsets = np.flatnonzero(np.isin(new_codes, self._codes_of(product_id)))
+            self._extend_subset(subset, first + offsets, new[offsets])
+        return True
+    
+    def has_product(self, product_id):
+        """True if any indexed sale is of product_id"""
+        return product_id in self.product_ids
+    
+    def _product(self, product_id):
+        subset = self.subsets.get(product_id)
+        if subset is None:
+            rows = np.flatnonzero(np.isin(self.codes[:self.size], self._codes_of(product_id)))
+            subset = self.subsets[product_id] = self._subset(rows, self.subsets[None]['timestamps'][rows])
+        return subset
+    
+    def bounds(self, start=None, end=None, product_id=None):
+        """(subset, lo, hi) for sales with start <= timestamp < end (epoch seconds; None is open)"""
+        subset = self._product(product_id)
+        timestamps = subset['timestamps'][:subset['size']]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, 'left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, 'left'))
+        return subset, lo, max(lo, hi)
+    
+    def summary(self, start=None, end=None, product_id=None):
+        """Return (transactions, revenue, items sold) for the range"""
+        subset, lo, hi = self.bounds(start, end, product_id)
+        return hi - lo, float(subset['revenue'][hi] - subset['revenue'][lo]), int(subset['quantity'][hi] - subset['quantity'][lo])
+    
+    def page(self, start=None, end=None, product_id=None, offset=0, limit=25):
+        """Sale dicts for rows offset..offset+limit of the range, newest first"""
+        subset, lo, hi = self.bounds(start, end, product_id)
+        first = max(hi - offset - limit, lo)
+        last = max(hi - offset, lo)
+        rows = subset['rows'][first:last][::-1]
+        return self.fetch([int(position) for position in self.positions[rows]])
+    
+    def time_span(self):
+        """(first, last) sale timestamps, or None without sales"""
+        whole = self.subsets[None]
+        timestamps = whole['timestamps'][:whole['size']]
+        return (int(timestamps[0]), int(timestamps[-1])) if len(timestamps) else None
+
+
+class SalesRollups:
+    """Pre-aggregated sales totals, updated as each sale is recorded.
+    
+    Both tables map a key to (revenue, quantity, transactions): daily by
+    'YYYY-MM-DD' and products by product name. Trend charts read these in
+    O(days) instead of grouping the whole sales history.
+    """
+    
+    def __init__(self):
+        self.daily = {}
+        self.products = {}
+        self.sales_count = 0
+    
+    @staticmethod
+    def _bump(table, key, revenue, quantity, transactions=1):
+        old = table.get(key)
+        if old is None:
+            table[key] = (revenue, quantity, transactions)
+        else:
+            table[key] = (old[0] + revenue, old[1] + quantity, old[2] + transactions)
+    
+    def add(self, sale_record):
+        """Fold one sale into every table"""
+        date = sale_record['date']
+        revenue, quantity = sale_record['total_amount'], sale_record['quantity']
+        name = sale_record['product_name']
+        self._bump(self.daily, date[:10], revenue, quantity)
+        self._bump(self.products, name, revenue, quantity)
+        self.sales_count += 1
+    
+    @classmethod
+    def from_ledger(cls, ledger):
+        """Build every table from a SalesLedger with vectorized group-bys"""
+        rollups = cls()
+        rollups.sales_count = len(ledger)
+        if not len(ledger):
+            return rollups
+        cols = ledger.columns()
+        names, name_codes = np.unique(np.array(ledger.product_names, dtype=object), return_inverse=True)
+        name_codes = name_codes[cols['code']]
+        
+        def group(keys):
+            unique, inverse = np.unique(keys, return_inverse=True)
+            revenue = np.bincount(inverse, weights=cols['total_amount'])
+            quantity = np.bincount(inverse, weights=cols['quantity'])
+            transactions = np.bincount(inverse)
+            return unique, zip(revenue.tolist(), quantity.astype(np.int64).tolist(), transactions.tolist())
+        
+        unique, totals = group(cols['timestamp'] // 86400)
+        rollups.daily = {str(np.datetime64(int(day), 'D')): total for day, total in zip(unique, totals)}
+        unique, totals = group(name_codes)
+        rollups.products = {names[code]: total for code, total in zip(unique, totals)}
+        return rollups
+    
+    def daily_totals(self):
+        """Return [(day, revenue, quantity)] sorted by day"""
+        return [(day, revenue, quantity) for day, (revenue, quantity, _) in sorted(self.daily.items())]
+    
+    def product_totals(self):
+        """Return [(product_name, quantity, revenue)]"""
+        return [(name, quantity, revenue) for name, (revenue, quantity, _) in self.products.items()]
+    
+    def snapshot(self):
+        """Copy of the tables that a worker thread can read while sales continue"""
+        copy = SalesRollups()
+        copy.daily = dict(self.daily)
+        copy.products = dict(self.products)
+        copy.sales_count = self.sales_count
+        return copy
+    
+    def to_dict(self):
+        return {
+            'sales_count': self.sales_count,
+            'daily': {day: list(total) for day, total in self.daily.items()},
+            'products': {name: list(total) for name, total in self.products.items()}
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        rollups = cls()
+        rollups.sales_count = data['sales_count']
+        rollups.daily = {day: tuple(total) for day, total in data['daily'].items()}
+        rollups.products = {name: tuple(total) for name, total in data['products'].items()}
+        return rollups
+
+
+class SalesJournal:
+    """Append-only, line-delimited log of sales and catalog changes.
+    
+    Each order appends one JSON line per sale and each product edit one
+    line holding the product as it now is, so the snapshot plus the
+    journal always describe the current store. The full snapshot
+    (store_data.json) is only rewritten when the journal is compacted,
+    after compact_every entries.
+    """
+    
+    def __init__(self, path, compact_every=5000):
+        self.path = path
+        self.compact_every = compact_every
+        self.generation = 0
+        # Entries after the header in the current generation
+        self.entries = 0
+        # How many entries of the previous generation the snapshot holds;
+        # None for snapshots written before this was recorded
+        self.resume_from = None
+        # Set when an append failed, so the next save compacts
+        self.damaged = False
+        # Orders and background saves append from different threads
+        self.lock = threading.Lock()
+    
+    def _append(self, *entries):
+        """Write entries one per line and flush them to disk with a single fsync"""
+        with self.lock, open(self.path, 'a') as file:
+            start = file.tell()
+            try:
+                if start == 0:
+                    file.write(json.dumps({'type': 'header', 'generation': self.generation}) + "\n")
+                file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+                file.flush()
+                os.fsync(file.fileno())
+            except Exception:
+                # Later entries must not land behind a torn line, which replay stops at
+                self.damaged = True
+                try:
+                    file.truncate(start)
+                except OSError:
+                    pass
+                raise
+            self.entries += len(entries)
+    
+    def append_sales(self, start_seq, sale_records):
+        """Record consecutive sales; start_seq is the first one's position in sales_history"""
+        self._append(*({'type': 'sale', 'seq': start_seq + i, 'sale': sale}
+                       for i, sale in enumerate(sale_records)))
+    
+    def append_product(self, product_id, product):
+        """Record a product's new state, or None when it was removed"""
+        self._append({'type': 'product', 'product_id': product_id, 'product': product})
+    
+    def mark(self):
+        """(generation, entries) so far; a snapshot taken now holds exactly these entries"""
+        return self.generation, self.entries
+    
+    def needs_compaction(self):
+        return self.damaged or self.entries >= self.compact_every
+    
+    def replay(self, repair=True):
+        """Yield the journal entries the snapshot does not already hold.
+        
+        That is every entry of the current generation. A journal one
+        generation behind is what a crash between replacing the snapshot
+        and restarting the journal leaves; from it only the entries after
+        resume_from are yielded (only its sales for older snapshots, and
+        the caller skips those the snapshot already holds). Afterwards a
+        torn tail is cut off and a stale or previous-generation journal
+        removed or restarted, unless repair is False.
+        """
+        if not os.path.exists(self.path):
             return
-        
-        product = self.products[product_id]
-        quantity = simpledialog.askinteger("Process Order", 
-                                          f"Product: {product['name']}\nPrice: ${product['price']:.2f}\n"
-                                          f"Available: {product['quantity']}\n\nQuantity:")
-        
-        if quantity is None or quantity <= 0:
+        stale = False
+        previous = False
+        carried = []
+        position = 0
+        good_end = 0
+        with open(self.path, 'r') as file:
+            line = file.readline()
+            while line:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append
+                    break
+                if good_end == 0:
+                    if entry.get('type') != 'header':
+                        stale = True
+                        break
+                    previous = entry.get('generation') == self.generation - 1
+                    if entry.get('generation') != self.generation and not previous:
+                        # Left over from before the last compaction
+                        stale = True
+                        break
+                elif not previous:
+                    self.entries += 1
+                    yield entry
+                else:
+                    if (entry.get('type') == 'sale' if self.resume_from is None
+                            else position >= self.resume_from):
+                        carried.append(entry)
+                        yield entry
+                    position += 1
+                good_end = file.tell()
+                line = file.readline()
+        
+        if not repair:
             return
+        if stale:
+            os.remove(self.path)
+        elif good_end < os.path.getsize(self.path):
+            with open(self.path, 'r+') as file:
+                file.truncate(good_end)
+        if previous:
+            with self.lock:
+                self.reset(self.generation, carried)
+    
+    def entries_from(self, position):
+        """The entries of the current journal from position on"""
+        entries = []
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as file:
+                file.readline()
+                for index, line in enumerate(file):
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    if index >= position:
+                        entries.append(entry)
+        return entries
+    
+    def reset(self, generation, carried=()):
+        """Start the journal for a new generation after a compaction.
         
-        if product['quantity'] < quantity:
-            messagebox.showerror("Error", f"Insufficient stock! Available: {product['quantity']}")
+        carried are the entries written after the compacted snapshot was
+        taken; they move into the new journal. Call with self.lock held,
+        straight after the snapshot has been replaced.
+        """
+        self.generation = generation
+        self.entries = len(carried)
+        self.damaged = False
+        if not carried:
+            if os.path.exists(self.path):
+                os.remove(self.path)
             return
-        
-        total_price = product['price'] * quantity
-        product['quantity'] -= quantity
-        product['total_sold'] += quantity
-        
-        sale_record = {
-            'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'product_id': product_id,
-            'product_name': product['name'],
-            'quantity': quantity,
-            'unit_price': product['price'],
-            'total_amount': total_price
-        }
-        
-        self.sales_history.append(sale_record)
-        self.total_revenue += total_price
-        
-        self.update_inventory_display()
-        self.update_dashboard()
-        
-        messagebox.showinfo("Success", 
-                           f"Product: {product['name']}\n"
-                           f"Quantity: {quantity}\n"
-                           f"Total: ${total_price:.2f}\n"
-                           f"Remaining: {product['quantity']}")
+        temp = self.path + '.tmp'
+        with open(temp, 'w') as file:
+            file.write(json.dumps({'type': 'header', 'generation': generation}) + "\n")
+            file.write("".join(json.dumps(entry) + "\n" for entry in carried))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, self.path)
+
+
+class StorageBackend:
+    """Where the store keeps its products, sales and revenue.
     
-    def show_sales_report(self):
-        """Show sales report"""
-        if not self.sales_history:
-            messagebox.showinfo("Sales Report", "No sales yet!")
+    Loading has two phases so a catalog can be shown before the sales are
+    in: load_products() returns the products dict, and load_sales() returns
+    (products, sales_history, total_revenue, rollups) with any later product
+    changes applied to a copy. sales_history supports len(), iteration,
+    slicing, append() and extend(), plus summary(), snapshot() and
+    time_index() for the reports; rollups is a SalesRollups covering every
+    sale in it. Unreadable data raises OSError or ValueError.
+    """
+    
+    def load(self, progress=None):
+        """Load everything in one call"""
+        return self.load_sales(self.load_products(), progress)
+    
+    def load_products(self):
+        raise NotImplementedError
+    
+    def load_sales(self, products, progress=None):
+        """May run on a worker thread; progress(fraction) reports how far it got"""
+        raise NotImplementedError
+    
+    def record_sale(self, seq, sale_record):
+        """Persist a sale already appended to sales_history and applied in memory"""
+        self.record_sales(seq, [sale_record])
+    
+    # True when each change is durable as soon as it is recorded, so save()
+    # has nothing that must run off the caller's thread
+    writes_through = False
+    
+    def record_sales(self, start_seq, sale_records):
+        """Persist consecutive sales as one write"""
+        raise NotImplementedError
+    
+    def record_product(self, product_id, product):
+        """Persist one catalog change (product is None when removed)"""
+        raise NotImplementedError
+    
+    def mark(self):
+        """Opaque position of the changes recorded so far, taken with a state snapshot"""
+        return None
+    
+    def save(self, products, sales_history, total_revenue, rollups, mark=None):
+        """Persist a state; mark is what mark() returned when it was taken"""
+        raise NotImplementedError
+    
+    def size_on_disk(self):
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+
+
+class JsonStreamReader:
+    """Incremental reader for a file holding one JSON object.
+    
+    Top-level keys are visited in file order; each value is either decoded
+    whole with value() or, for a large array, walked one element at a time
+    with items(). Only a bounded window of the file is held in memory.
+    """
+    
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+    
+    def __init__(self, file, chunk_size=1 << 20):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+    
+    @property
+    def consumed(self):
+        """Characters of the file parsed so far"""
+        return self.offset + self.pos
+    
+    def _fill(self, size=None):
+        """Drop the parsed prefix and append the next chunk; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.file.read(max(size or 0, self.chunk_size))
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+    
+    def _peek(self):
+        while True:
+            self.pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+    
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected {' or '.join(map(repr, chars))} at character {self.consumed} "
+                             f"of {getattr(self.file, 'name', 'the file')}")
+        self.pos += 1
+        return char
+    
+    def value(self):
+        """Decode the next complete JSON value"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                # Read at least as much again, so one large value costs O(size) to decode
+                if not self._fill(len(self.buffer) - self.pos):
+                    raise ValueError(f"{error.msg} at character {self.offset + error.pos}") from None
+                continue
+            # A number cut off by the end of the buffer may continue in the next chunk
+            cut = end == len(self.buffer) or (isinstance(value, (int, float)) and self.buffer[end] in '.eE')
+            if cut and self._fill():
+                continue
+            self.pos = end
+            return value
+    
+    def keys(self):
+        """Yield top-level keys; the caller consumes each key's value before the next"""
+        self._expect('{')
+        if self._peek() == '}':
+            self.pos += 1
             return
-        
-        report_window = tk.Toplevel(self.root)
-        report_window.title("📊 Sales Report")
-        report_window.geometry("700x500")
-        report_window.configure(bg='#f0f0f0')
-        
-        header = tk.Frame(report_window, bg='#34495e')
-        header.pack(fill='x', padx=5, pady=5)
-        tk.Label(header, text="📊 SALES REPORT", 
-                font=('Arial', 14, 'bold'), fg='white', bg='#34495e').pack(pady=10)
-        
-        summary = tk.Frame(report_window, bg='#f0f0f0')
-        summary.pack(fill='x', padx=10, pady=10)
-        
-        total_items = sum(sale['quantity'] for sale in self.sales_history)
-        avg_sale = self.total_revenue / len(self.sales_history)
-        
-        tk.Label(summary, text=f"Transactions: {len(self.sales_history)}", 
-                font=('Arial', 11), bg='#f0f0f0').pack(anchor='w')
-        tk.Label(summary, text=f"Revenue: ${self.total_revenue:.2f}", 
-                font=('Arial', 11, 'bold'), fg='#27ae60', bg='#f0f0f0').pack(anchor='w')
-        tk.Label(summary, text=f"Items Sold: {total_items}", 
-                font=('Arial', 11), bg='#f0f0f0').pack(anchor='w')
-        tk.Label(summary, text=f"Avg Sale: ${avg_sale:.2f}", 
-                font=('Arial', 11), bg='#f0f0f0').pack(anchor='w')
-        
-        list_frame = tk.Frame(report_window)
-        list_frame.pack(fill='both', expand=True, padx=10, pady=5)
-        
-        columns = ('Date', 'Product', 'Qty', 'Amount')
-        sales_tree = ttk.Treeview(list_frame, columns=columns, show='headings')
-        
-        for col, width in zip(columns, [150, 200, 80, 100]):
-            sales_tree.heading(col, text=col)
-            sales_tree.column(col, width=width, anchor='center' if col in ['Qty', 'Amount'] else 'w')
-        
-        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=sales_tree.yview)
-        sales_tree.configure(yscrollcommand=scrollbar.set)
-        
-        for sale in reversed(self.sales_history[-50:]):
-            sales_tree.insert('', 0, values=(
-                sale['date'],
-                sale['product_name'],
-                sale['quantity'],
-                f"${sale['total_amount']:.2f}"
-            ))
-        
-        sales_tree.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
+        while True:
+            key = self.value()
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
     
-    def check_low_stock(self):
-        """Check low stock"""
-        threshold = simpledialog.askinteger("Low Stock", "Threshold:", initialvalue=5)
-        if threshold is None:
+    def items(self):
+        """Yield the elements of the array at the current position"""
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
             return
-        
-        low_stock = [f"{pid}: {p['name']} (Stock: {p['quantity']})"
-                     for pid, p in self.products.items() if p['quantity'] <= threshold]
-        
-        if low_stock:
-            messagebox.showwarning("Low Stock", f"⚠️ Low Stock (≤{threshold}):\n\n" + "\n".join(low_stock))
+        while True:
+            yield self.value()
+            if self._expect(',]') == ']':
+                return
+
+
+class JsonStorage(StorageBackend):
+    """store_data.json snapshot plus an append-only sales journal"""
+    
+    SALES_CHUNK = 10000
+    
+    def __init__(self, path, compact_every=5000, read_only=False):
+        self.path = path
+        # Read-only loads leave a damaged or stale journal as it is
+        self.read_only = read_only
+        self.journal = SalesJournal(os.path.splitext(path)[0] + '.journal', compact_every)
+    
+    def load_products(self):
+        """Read the snapshot only as far as the product catalog"""
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as file:
+            reader = JsonStreamReader(file)
+            for key in reader.keys():
+                if key == 'products':
+                    return reader.value()
+                if key == 'sales_history':
+                    for _ in reader.items():
+                        pass
+                else:
+                    reader.value()
+        return {}
+    
+    def load_sales(self, products, progress=None):
+        """Read the snapshot's sales, then replay the journal tail"""
+        products = {product_id: dict(product) for product_id, product in products.items()}
+        sales_history, total_revenue, saved_rollups = self.read_snapshot(progress)
+        if saved_rollups is not None and saved_rollups.get('sales_count') == len(sales_history):
+            rollups = SalesRollups.from_dict(saved_rollups)
         else:
-            messagebox.showinfo("Stock Status", "✅ All products have sufficient stock!")
+            rollups = SalesRollups.from_ledger(sales_history)
+        
+        def apply(sale):
+            product = products.get(sale['product_id'])
+            if product is not None:
+                product['quantity'] -= sale['quantity']
+                product['total_sold'] += sale['quantity']
+            return sale['total_amount']
+        
+        for entry in self.journal.replay(repair=not self.read_only):
+            if entry['type'] == 'product':
+                if entry['product'] is None:
+                    products.pop(entry['product_id'], None)
+                else:
+                    products[entry['product_id']] = dict(entry['product'])
+            elif entry['type'] == 'checkpoint':
+                # Written by versions that saved the whole catalog to the journal
+                products = entry['products']
+                total_revenue = entry['total_revenue']
+                # A background save can finish after later orders were journaled;
+                # its checkpoint predates them, so apply them again on top
+                for sale in sales_history[entry.get('sales_count', len(sales_history)):]:
+                    total_revenue += apply(sale)
+            elif entry['type'] == 'sale' and entry['seq'] >= len(sales_history):
+                sale = entry['sale']
+                sales_history.append(sale)
+                rollups.add(sale)
+                total_revenue += apply(sale)
+        if progress is not None:
+            progress(1.0)
+        
+        return products, sales_history, total_revenue, rollups
     
-    def show_visualizations(self):
-        """Show comprehensive visualizations using matplotlib, pandas, numpy"""
-        if not self.products and not self.sales_history:
-            messagebox.showinfo("Analytics", "No data available!")
-            return
-        
-        viz_window = tk.Toplevel(self.root)
-        viz_window.title("📈 Business Analytics Dashboard")
-        viz_window.geometry("1400x900")
-        viz_window.configure(bg='#f0f0f0')
-        
-        header = tk.Frame(viz_window, bg='#2c3e50', height=50)
-        header.pack(fill='x')
-        header.pack_propagate(False)
-        tk.Label(header, text="📈 BUSINESS ANALYTICS DASHBOARD", 
-                font=('Arial', 16, 'bold'), fg='white', bg='#2c3e50').pack(expand=True)
-        
-        notebook = ttk.Notebook(viz_window)
-        notebook.pack(fill='both', expand=True, padx=10, pady=10)
+    def read_snapshot(self, progress=None):
+        """Stream the snapshot into (sales_history, total_revenue, saved rollups or None).
         
-        self.create_inventory_analytics(notebook)
-        self.create_sales_analytics(notebook)
-        self.create_performance_analytics(notebook)
-        self.create_financial_analytics(notebook)
+        Sales are parsed SALES_CHUNK at a time, so memory holds the compact
+        ledger plus one chunk of dicts however large the file is.
+        """
+        sales_history, total_revenue, saved_rollups = SalesLedger(), 0.0, None
+        if not os.path.exists(self.path):
+            return sales_history, total_revenue, saved_rollups
+        size = os.path.getsize(self.path) or 1
+        with open(self.path, 'r') as file:
+            reader = JsonStreamReader(file)
+            for key in reader.keys():
+                if key == 'sales_history':
+                    chunk = []
+                    for sale in reader.items():
+                        chunk.append(sale)
+                        if len(chunk) == self.SALES_CHUNK:
+                            sales_history.extend(chunk)
+                            chunk = []
+                            if progress is not None:
+                                progress(reader.consumed / size)
+                    sales_history.extend(chunk)
+                elif key == 'total_revenue':
+                    total_revenue = reader.value()
+                elif key == 'journal_generation':
+                    self.journal.generation = reader.value()
+                elif key == 'journal_resume':
+                    self.journal.resume_from = reader.value()
+                elif key == 'rollups':
+                    saved_rollups = reader.value()
+                else:
+                    reader.value()
+        return sales_history, total_revenue, saved_rollups
     
-    def create_inventory_analytics(self, notebook):
-        """Inventory analytics with numpy, pandas, matplotlib"""
-        tab = tk.Frame(notebook, bg='white')
-        notebook.add(tab, text='📦 Inventory Analytics')
-        
-        if not self.products:
-            tk.Label(tab, text="No inventory data", font=('Arial', 14)).pack(expand=True)
-            return
-        
-        fig = Figure(figsize=(14, 8), facecolor='white', dpi=100)
-        
-        # Prepare data using pandas
-        product_data = pd.DataFrame([
-            {
-                'id': pid,
-                'name': p['name'],
-                'price': p['price'],
-                'quantity': p['quantity'],
-                'sold': p['total_sold'],
-                'value': p['price'] * p['quantity'],
-                'revenue': p['price'] * p['total_sold']
-            }
-            for pid, p in self.products.items()
-        ])
-        
-        # Chart 1: Stock Levels Bar Chart
-        ax1 = fig.add_subplot(2, 2, 1)
-        names = [n[:15] for n in product_data['name']]
-        stocks = product_data['quantity'].values
-        
-        # Color coding using numpy
-        colors = np.where(stocks > 10, '#2ecc71', np.where(stocks > 5, '#f39c12', '#e74c3c'))
-        
-        bars = ax1.bar(range(len(names)), stocks, color=colors, alpha=0.8, edgecolor='black', linewidth=1.2)
-        ax1.set_xlabel('Products', fontweight='bold', fontsize=10)
-        ax1.set_ylabel('Stock Quantity', fontweight='bold', fontsize=10)
-        ax1.set_title('Current Stock Levels by Product', fontweight='bold', fontsize=12, pad=15)
-        ax1.set_xticks(range(len(names)))
-        ax1.set_xticklabels(names, rotation=45, ha='right', fontsize=8)
-        ax1.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., height, f'{int(height)}',
-                    ha='center', va='bottom', fontsize=9, fontweight='bold')
-        
-        # Chart 2: Inventory Value Pie Chart
-        ax2 = fig.add_subplot(2, 2, 2)
-        values = product_data['value'].values
-        
-        if values.sum() > 0:
-            wedges, texts, autotexts = ax2.pie(values, labels=names, autopct='%1.1f%%',
-                                               startangle=90, colors=plt.cm.Pastel1.colors,
-                                               explode=[0.05] * len(names))
-            for text in texts:
-                text.set_fontsize(8)
-            for autotext in autotexts:
-                autotext.set_color('black')
-                autotext.set_fontweight('bold')
-                autotext.set_fontsize(8)
-            
-            ax2.set_title('Inventory Value Distribution ($)', fontweight='bold', fontsize=12, pad=15)
-        
-        # Chart 3: Stock vs Sold Comparison
-        ax3 = fig.add_subplot(2, 2, 3)
-        x = np.arange(len(names))
-        width = 0.35
+    def record_sales(self, start_seq, sale_records):
+        self.journal.append_sales(start_seq, sale_records)
+    
+    def record_product(self, product_id, product):
+        self.journal.append_product(product_id, product)
+    
+    def mark(self):
+        return self.journal.mark()
+    
+    def size_on_disk(self):
+        return sum(os.path.getsize(path) for path in (self.path, self.journal.path) if os.path.exists(path))
+    
+    def save(self, products, sales_history, total_revenue, rollups, mark=None):
+        """Compact when due; until then the journal already holds every change"""
+        if self.journal.needs_compaction():
+            self.compact(products, sales_history, total_revenue, rollups, mark)
+    
+    def _resume_position(self, mark):
+        """Journal entries the state taken at mark holds, or None if a later compaction superseded it"""
+        if mark is None:
+            return self.journal.entries
+        generation, position = mark
+        return position if generation == self.journal.generation else None
+    
+    def compact(self, products, sales_history, total_revenue, rollups, mark=None):
+        """Rewrite the full snapshot and start a fresh journal.
         
-        bars1 = ax3.bar(x - width/2, product_data['quantity'], width, 
-                       label='Current Stock', color='#3498db', alpha=0.8, edgecolor='black')
-        bars2 = ax3.bar(x + width/2, product_data['sold'], width, 
-                       label='Total Sold', color='#e74c3c', alpha=0.8, edgecolor='black')
-        
-        ax3.set_xlabel('Products', fontweight='bold', fontsize=10)
-        ax3.set_ylabel('Quantity', fontweight='bold', fontsize=10)
-        ax3.set_title('Stock vs Sales Comparison', fontweight='bold', fontsize=12, pad=15)
-        ax3.set_xticks(x)
-        ax3.set_xticklabels(names, rotation=45, ha='right', fontsize=8)
-        ax3.legend(loc='upper right', fontsize=9)
-        ax3.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        # Chart 4: Stock Status Distribution
-        ax4 = fig.add_subplot(2, 2, 4)
-        high = (stocks > 10).sum()
-        medium = ((stocks > 5) & (stocks <= 10)).sum()
-        low = (stocks <= 5).sum()
-        
-        categories = ['High Stock\n(>10)', 'Medium Stock\n(5-10)', 'Low Stock\n(≤5)']
-        counts = np.array([high, medium, low])
-        colors_status = ['#2ecc71', '#f39c12', '#e74c3c']
-        
-        bars = ax4.bar(categories, counts, color=colors_status, alpha=0.8, edgecolor='black', linewidth=1.5)
-        ax4.set_ylabel('Number of Products', fontweight='bold', fontsize=10)
-        ax4.set_title('Stock Status Distribution', fontweight='bold', fontsize=12, pad=15)
-        ax4.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax4.text(bar.get_x() + bar.get_width()/2., height, f'{int(height)}',
-                    ha='center', va='bottom', fontsize=11, fontweight='bold')
-        
-        # Add statistics text
-        total_value = values.sum()
-        avg_stock = stocks.mean()
-        stats_text = f'Total Inventory Value: ${total_value:.2f}\nAverage Stock: {avg_stock:.1f} units'
-        fig.text(0.99, 0.01, stats_text, ha='right', va='bottom', fontsize=9, 
-                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-        
-        fig.tight_layout(pad=3.0)
-        
-        canvas = FigureCanvasTkAgg(fig, tab)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
-    
-    def create_sales_analytics(self, notebook):
-        """Sales analytics with numpy, pandas, matplotlib"""
-        tab = tk.Frame(notebook, bg='white')
-        notebook.add(tab, text='📊 Sales Analytics')
-        
-        if not self.sales_history:
-            tk.Label(tab, text="No sales data", font=('Arial', 14)).pack(expand=True)
+        mark is the journal position the state was taken at; entries
+        written since then are carried into the new journal.
+        """
+        position = self._resume_position(mark)
+        if position is None:
             return
+        generation = self.journal.generation + 1
+        header = {
+            'products': products,
+            'total_revenue': total_revenue,
+            'journal_generation': generation,
+            'journal_resume': position,
+            'rollups': rollups.to_dict()
+        }
+        # Written beside the snapshot and renamed over it, so a crash
+        # mid-write leaves the previous snapshot intact
+        temp = self.path + '.tmp'
+        with open(temp, 'w') as file:
+            # Products first and sales last, one per line, so a streaming
+            # load can show the catalog early and never holds every sale
+            for i, (key, value) in enumerate(header.items()):
+                file.write(('{' if i == 0 else ',\n') + json.dumps(key) + ': ' + json.dumps(value))
+            file.write(',\n"sales_history": [')
+            for i, sale in enumerate(sales_history):
+                file.write((',\n' if i else '\n') + json.dumps(sale))
+            file.write('\n]}\n')
+            file.flush()
+            os.fsync(file.fileno())
+        with self.journal.lock:
+            os.replace(temp, self.path)
+            self.journal.reset(generation, self.journal.entries_from(position))
+
+
+class NpyStorage(JsonStorage):
+    """Binary snapshot directory: one .npy file per sales column plus meta.json.
+    
+    meta.json holds the products, revenue and the interned product table;
+    the sales columns are memory-mapped on load, so opening a store with
+    millions of sales parses nothing per sale. New sales go to a journal
+    in the same directory until the next compaction, as with JsonStorage.
+    
+    The directory is made by the first write. Loading one that does not
+    exist raises FileNotFoundError unless create is set, so a mistyped
+    path is reported instead of opening as an empty store.
+    """
+    
+    def __init__(self, path, compact_every=5000, read_only=False, create=False):
+        self.path = path
+        self.read_only = read_only
+        self.create = create
+        self.journal = SalesJournal(os.path.join(path, 'sales.journal'), compact_every)
+    
+    def _file(self, name):
+        return os.path.join(self.path, name)
+    
+    def _make_directory(self):
+        os.makedirs(self.path, exist_ok=True)
+    
+    def column_file(self, column, generation):
+        # Each compaction writes new files, so columns mapped by a running
+        # process are never overwritten underneath it
+        return self._file(f"{column}.{generation}.npy")
+    
+    def read_meta(self):
+        if not os.path.exists(self._file('meta.json')):
+            return None
+        with open(self._file('meta.json'), 'r') as file:
+            return json.load(file)
+    
+    def _write_json(self, name, data):
+        """Replace a JSON file atomically"""
+        temp = self._file(name + '.tmp')
+        with open(temp, 'w') as file:
+            json.dump(data, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, self._file(name))
+    
+    def load_products(self):
+        if not self.create and not os.path.isdir(self.path):
+            raise FileNotFoundError(f"{self.path} does not exist")
+        meta = self.read_meta()
+        return meta['products'] if meta else {}
+    
+    def record_sales(self, start_seq, sale_records):
+        if not os.path.exists(self.journal.path):
+            self._make_directory()
+        super().record_sales(start_seq, sale_records)
+    
+    def record_product(self, product_id, product):
+        if not os.path.exists(self.journal.path):
+            self._make_directory()
+        super().record_product(product_id, product)
+    
+    def size_on_disk(self):
+        if not os.path.isdir(self.path):
+            return 0
+        return sum(entry.stat().st_size for entry in os.scandir(self.path) if entry.is_file())
+    
+    def read_snapshot(self, progress=None):
+        """Map the sales columns of the current generation without reading them"""
+        meta = self.read_meta()
+        if meta is None:
+            return SalesLedger(), 0.0, None
+        generation, count = meta['journal_generation'], meta['sales_count']
+        self.journal.generation = generation
+        self.journal.resume_from = meta.get('journal_resume')
+        if count:
+            columns = {column: np.load(self.column_file(column, generation), mmap_mode='r')[:count]
+                       for column in SalesLedger.COLUMNS}
+            sales_history = SalesLedger.from_columns(columns, meta['product_ids'], meta['product_names'])
+        else:
+            sales_history = SalesLedger()
+        saved_rollups = None
+        if os.path.exists(self._file('rollups.json')):
+            with open(self._file('rollups.json'), 'r') as file:
+                saved_rollups = json.load(file)
+        return sales_history, meta['total_revenue'], saved_rollups
+    
+    def compact(self, products, sales_history, total_revenue, rollups, mark=None):
+        """Write the columns for a new generation, then switch meta.json over to it.
         
-        fig = Figure(figsize=(14, 8), facecolor='white', dpi=100)
-        
-        # Create DataFrame using pandas
-        df = pd.DataFrame(self.sales_history)
-        df['date'] = pd.to_datetime(df['date'])
-        df['date_only'] = df['date'].dt.date
-        
-        # Chart 1: Daily Revenue Trend
-        ax1 = fig.add_subplot(2, 2, 1)
-        daily_revenue = df.groupby('date_only')['total_amount'].sum()
-        
-        ax1.plot(range(len(daily_revenue)), daily_revenue.values, 
-                marker='o', linewidth=2.5, markersize=7, color='#2ecc71', 
-                markerfacecolor='#27ae60', markeredgecolor='white', markeredgewidth=2)
-        ax1.fill_between(range(len(daily_revenue)), daily_revenue.values, 
-                         alpha=0.3, color='#2ecc71')
-        
-        ax1.set_xlabel('Days', fontweight='bold', fontsize=10)
-        ax1.set_ylabel('Revenue ($)', fontweight='bold', fontsize=10)
-        ax1.set_title('Daily Sales Revenue Trend', fontweight='bold', fontsize=12, pad=15)
-        ax1.grid(True, alpha=0.3, linestyle='--')
-        ax1.set_xticks(range(len(daily_revenue)))
-        ax1.set_xticklabels([str(d) for d in daily_revenue.index], rotation=45, ha='right', fontsize=7)
-        
-        # Add trend line using numpy polyfit
-        if len(daily_revenue) > 1:
-            z = np.polyfit(range(len(daily_revenue)), daily_revenue.values, 1)
-            p = np.poly1d(z)
-            ax1.plot(range(len(daily_revenue)), p(range(len(daily_revenue))), 
-                    "r--", alpha=0.8, linewidth=2, label=f'Trend: ${z[0]:.2f}/day')
-            ax1.legend(fontsize=9)
-        
-        # Chart 2: Top Selling Products
-        ax2 = fig.add_subplot(2, 2, 2)
-        product_sales = df.groupby('product_name')['quantity'].sum().sort_values(ascending=True)
-        top_10 = product_sales.tail(10)
-        
-        colors_grad = plt.cm.viridis(np.linspace(0.3, 0.9, len(top_10)))
-        bars = ax2.barh(range(len(top_10)), top_10.values, color=colors_grad, 
-                       alpha=0.8, edgecolor='black')
-        ax2.set_yticks(range(len(top_10)))
-        ax2.set_yticklabels([name[:20] for name in top_10.index], fontsize=9)
-        ax2.set_xlabel('Quantity Sold', fontweight='bold', fontsize=10)
-        ax2.set_title('Top 10 Best-Selling Products', fontweight='bold', fontsize=12, pad=15)
-        ax2.grid(axis='x', alpha=0.3, linestyle='--')
-        
-        for i, (bar, value) in enumerate(zip(bars, top_10.values)):
-            ax2.text(value + 0.5, i, f'{int(value)}', va='center', fontsize=9, fontweight='bold')
-        
-        # Chart 3: Revenue Distribution by Product
-        ax3 = fig.add_subplot(2, 2, 3)
-        product_revenue = df.groupby('product_name')['total_amount'].sum().sort_values(ascending=False)
-        top_8 = product_revenue.head(8)
-        
-        explode = np.array([0.1 if i == 0 else 0.05 for i in range(len(top_8))])
-        wedges, texts, autotexts = ax3.pie(top_8.values, labels=[n[:15] for n in top_8.index],
-                                           autopct='%1.1f%%', startangle=90,
-                                           colors=plt.cm.Set3.colors, explode=explode,
-                                           shadow=True)
-        for text in texts:
-            text.set_fontsize(8)
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
-            autotext.set_fontsize(8)
-        
-        ax3.set_title('Revenue Distribution by Product', fontweight='bold', fontsize=12, pad=15)
-        
-        # Chart 4: Sales Volume Over Time
-        ax4 = fig.add_subplot(2, 2, 4)
-        daily_quantity = df.groupby('date_only')['quantity'].sum()
-        
-        colors_bars = plt.cm.coolwarm(np.linspace(0.2, 0.8, len(daily_quantity)))
-        bars = ax4.bar(range(len(daily_quantity)), daily_quantity.values, 
-                      color=colors_bars, alpha=0.8, edgecolor='black')
-        
-        ax4.set_xlabel('Days', fontweight='bold', fontsize=10)
-        ax4.set_ylabel('Items Sold', fontweight='bold', fontsize=10)
-        ax4.set_title('Daily Sales Volume (Units)', fontweight='bold', fontsize=12, pad=15)
-        ax4.set_xticks(range(len(daily_quantity)))
-        ax4.set_xticklabels([str(d) for d in daily_quantity.index], rotation=45, ha='right', fontsize=7)
-        ax4.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        # Add average line
-        avg_qty = daily_quantity.mean()
-        ax4.axhline(y=avg_qty, color='r', linestyle='--', linewidth=2, 
-                   label=f'Average: {avg_qty:.1f} units/day', alpha=0.7)
-        ax4.legend(fontsize=9)
-        
-        # Add statistics
-        total_sales = df['total_amount'].sum()
-        total_items = df['quantity'].sum()
-        stats_text = f'Total Revenue: ${total_sales:.2f}\nTotal Items Sold: {total_items}'
-        fig.text(0.99, 0.01, stats_text, ha='right', va='bottom', fontsize=9,
-                bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
-        
-        fig.tight_layout(pad=3.0)
-        
-        canvas = FigureCanvasTkAgg(fig, tab)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
-    
-    def create_performance_analytics(self, notebook):
-        """Product performance analytics"""
-        tab = tk.Frame(notebook, bg='white')
-        notebook.add(tab, text='🎯 Performance Metrics')
-        
-        if not self.products:
-            tk.Label(tab, text="No performance data", font=('Arial', 14)).pack(expand=True)
+        Columns only ever grow, so a crash before meta.json is replaced
+        leaves the previous generation readable as it was.
+        """
+        position = self._resume_position(mark)
+        if position is None:
             return
+        if not isinstance(sales_history, SalesLedger):
+            sales_history = SalesLedger.from_records(sales_history[:])
+        self._make_directory()
+        generation = self.journal.generation + 1
+        for column, values in sales_history.columns().items():
+            with open(self.column_file(column, generation), 'wb') as file:
+                np.save(file, values)
+                file.flush()
+                os.fsync(file.fileno())
+        self._write_json('rollups.json', rollups.to_dict())
+        with self.journal.lock:
+            self._write_json('meta.json', {
+                'products': products,
+                'total_revenue': total_revenue,
+                'journal_generation': generation,
+                'journal_resume': position,
+                'sales_count': len(sales_history),
+                'product_ids': sales_history.product_ids,
+                'product_names': sales_history.product_names
+            })
+            self.journal.reset(generation, self.journal.entries_from(position))
+        
+        current = f".{generation}.npy"
+        for name in os.listdir(self.path):
+            if name.endswith('.npy') and not name.endswith(current):
+                try:
+                    os.remove(self._file(name))
+                except OSError:
+                    # Still mapped on some platforms; removed after a later compaction
+                    pass
+
+class SQLiteSalesView:
+    """Sales history backed by the `sales` table; rows are read on demand.
+    
+    Row ids are assigned as position + 1, so indexing and slicing are
+    primary-key range lookups rather than OFFSET scans. Sales appended
+    since the last commit are held in `pending` and come after the rows.
+    """
+    
+    COLUMNS = ('date', 'product_id', 'product_name', 'quantity', 'unit_price', 'total_amount')
+    
+    def __init__(self, conn, path=None, count=None, pending=(), readers=None):
+        self._conn = conn
+        self.path = path
+        # Snapshots have no connection of their own: they share one per
+        # thread with every other snapshot of the same history
+        self.readers = readers if readers is not None else threading.local()
+        # Committed rows only; raised by committed() once a write has gone through
+        self._count = count if count is not None else conn.execute("SELECT COUNT(*) FROM sales").fetchone()[0]
+        self.pending = list(pending)
+    
+    @property
+    def conn(self):
+        if self._conn is not None:
+            return self._conn
+        conn = getattr(self.readers, 'conn', None)
+        if conn is None:
+            conn = self.readers.conn = sqlite3.connect(self.path, check_same_thread=False, uri=True)
+        return conn
+    
+    def __len__(self):
+        return self._count + len(self.pending)
+    
+    def __bool__(self):
+        return len(self) > 0
+    
+    def _rows(self, start, stop):
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM sales WHERE id > ? AND id <= ? ORDER BY id",
+            (start, stop))
+        for row in cursor:
+            yield dict(zip(self.COLUMNS, row))
+    
+    def __iter__(self):
+        return itertools.chain(self._rows(0, self._count), list(self.pending))
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            rows = list(self._rows(start, min(stop, self._count))) if min(stop, self._count) > start else []
+            if stop > self._count:
+                rows += self.pending[max(start - self._count, 0):stop - self._count]
+            return rows[::step] if step != 1 else rows
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("sales index out of range")
+        if index >= self._count:
+            return self.pending[index - self._count]
+        row = next(self._rows(index, index + 1), None)
+        if row is None:
+            raise IndexError(f"sales row {index + 1} is missing")
+        return row
+    
+    def append(self, sale_record):
+        """Add a sale; the storage's next write commits it"""
+        self.extend([sale_record])
+    
+    def extend(self, sale_records):
+        """Add many sales; the storage's next write commits them"""
+        self.pending.extend(sale_records)
+    
+    def write_pending(self):
+        """Insert the pending sales with one statement inside the caller's transaction"""
+        self.conn.executemany(
+            f"INSERT INTO sales (id, {', '.join(self.COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(self._count + i + 1,) + tuple(sale[col] for col in self.COLUMNS)
+             for i, sale in enumerate(self.pending)])
+    
+    def committed(self):
+        """The transaction holding write_pending() has committed"""
+        self._count += len(self.pending)
+        self.pending = []
+    
+    def snapshot(self):
+        """View pinned to the current rows, reading through the calling thread's reader connection"""
+        return SQLiteSalesView(None, self.path, self._count, self.pending, self.readers)
+    
+    def summary(self):
+        count, revenue, items = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(total_amount), 0), COALESCE(SUM(quantity), 0) "
+            "FROM sales WHERE id <= ?", (self._count,)).fetchone()
+        for sale in self.pending:
+            count, revenue, items = count + 1, revenue + sale['total_amount'], items + sale['quantity']
+        return count, revenue, items
+    
+    def time_index(self, previous=None):
+        """SQLiteTimeIndex over the rows this view covers; nothing is read up front.
         
-        fig = Figure(figsize=(14, 8), facecolor='white', dpi=100)
-        
-        # Prepare performance data
-        perf_data = pd.DataFrame([
-            {
-                'name': p['name'],
-                'stock': p['quantity'],
-                'sold': p['total_sold'],
-                'price': p['price'],
-                'revenue': p['price'] * p['total_sold'],
-                'turnover': p['total_sold'] / (p['total_sold'] + p['quantity']) * 100 if (p['total_sold'] + p['quantity']) > 0 else 0
-            }
-            for p in self.products.values()
-        ])
-        
-        # Chart 1: Product Performance Matrix (Scatter Plot)
-        ax1 = fig.add_subplot(2, 2, 1)
-        scatter = ax1.scatter(perf_data['sold'], perf_data['revenue'], 
-                            s=perf_data['price']*20, alpha=0.6, 
-                            c=perf_data['turnover'], cmap='RdYlGn',
-                            edgecolors='black', linewidth=1.5)
-        
-        ax1.set_xlabel('Units Sold', fontweight='bold', fontsize=10)
-        ax1.set_ylabel('Revenue Generated ($)', fontweight='bold', fontsize=10)
-        ax1.set_title('Product Performance Matrix', fontweight='bold', fontsize=12, pad=15)
-        ax1.grid(True, alpha=0.3, linestyle='--')
-        
-        # Add colorbar
-        cbar = plt.colorbar(scatter, ax=ax1)
-        cbar.set_label('Turnover Rate (%)', fontweight='bold', fontsize=9)
-        
-        # Annotate top performers
-        for idx, row in perf_data.nlargest(3, 'revenue').iterrows():
-            ax1.annotate(row['name'][:10], (row['sold'], row['revenue']),
-                        xytext=(5, 5), textcoords='offset points', fontsize=7,
-                        bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.7))
-        
-        # Chart 2: Revenue per Product (Horizontal Bar)
-        ax2 = fig.add_subplot(2, 2, 2)
-        top_revenue = perf_data.nlargest(10, 'revenue').sort_values('revenue')
-        
-        colors = plt.cm.plasma(np.linspace(0.3, 0.9, len(top_revenue)))
-        bars = ax2.barh(range(len(top_revenue)), top_revenue['revenue'], 
-                       color=colors, alpha=0.8, edgecolor='black')
-        ax2.set_yticks(range(len(top_revenue)))
-        ax2.set_yticklabels([n[:20] for n in top_revenue['name']], fontsize=9)
-        ax2.set_xlabel('Revenue ($)', fontweight='bold', fontsize=10)
-        ax2.set_title('Top 10 Revenue Generators', fontweight='bold', fontsize=12, pad=15)
-        ax2.grid(axis='x', alpha=0.3, linestyle='--')
-        
-        for i, (bar, value) in enumerate(zip(bars, top_revenue['revenue'])):
-            ax2.text(value + max(top_revenue['revenue'])*0.01, i, f'${value:.0f}',
-                    va='center', fontsize=8, fontweight='bold')
-        
-        # Chart 3: Turnover Rate Analysis
-        ax3 = fig.add_subplot(2, 2, 3)
-        sorted_turnover = perf_data.sort_values('turnover', ascending=False)
-        
-        colors_turn = ['#2ecc71' if x > 50 else '#f39c12' if x > 25 else '#e74c3c' 
-                      for x in sorted_turnover['turnover']]
-        
-        bars = ax3.bar(range(len(sorted_turnover)), sorted_turnover['turnover'],
-                      color=colors_turn, alpha=0.8, edgecolor='black')
-        ax3.set_xlabel('Products', fontweight='bold', fontsize=10)
-        ax3.set_ylabel('Turnover Rate (%)', fontweight='bold', fontsize=10)
-        ax3.set_title('Product Turnover Rate', fontweight='bold', fontsize=12, pad=15)
-        ax3.set_xticks(range(len(sorted_turnover)))
-        ax3.set_xticklabels([n[:12] for n in sorted_turnover['name']], 
-                           rotation=45, ha='right', fontsize=7)
-        ax3.grid(axis='y', alpha=0.3, linestyle='--')
-        ax3.axhline(y=50, color='green', linestyle='--', alpha=0.5, label='Good (>50%)')
-        ax3.axhline(y=25, color='orange', linestyle='--', alpha=0.5, label='Fair (>25%)')
-        ax3.legend(fontsize=8, loc='upper right')
-        
-        # Chart 4: Price vs Sales Correlation
-        ax4 = fig.add_subplot(2, 2, 4)
-        
-        # Create price bins
-        price_bins = pd.cut(perf_data['price'], bins=5)
-        price_sales = perf_data.groupby(price_bins)['sold'].sum()
-        
-        bin_labels = [f'${interval.left:.0f}-${interval.right:.0f}' 
-                     for interval in price_sales.index]
-        
-        bars = ax4.bar(range(len(price_sales)), price_sales.values,
-                      color='#9b59b6', alpha=0.8, edgecolor='black')
-        ax4.set_xlabel('Price Range', fontweight='bold', fontsize=10)
-        ax4.set_ylabel('Units Sold', fontweight='bold', fontsize=10)
-        ax4.set_title('Sales by Price Range', fontweight='bold', fontsize=12, pad=15)
-        ax4.set_xticks(range(len(price_sales)))
-        ax4.set_xticklabels(bin_labels, rotation=45, ha='right', fontsize=8)
-        ax4.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax4.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height)}', ha='center', va='bottom', 
-                    fontsize=9, fontweight='bold')
-        
-        # Add statistics
-        avg_turnover = perf_data['turnover'].mean()
-        best_product = perf_data.loc[perf_data['revenue'].idxmax(), 'name']
-        stats_text = f'Avg Turnover: {avg_turnover:.1f}%\nBest Product: {best_product[:15]}'
-        fig.text(0.99, 0.01, stats_text, ha='right', va='bottom', fontsize=9,
-                bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.5))
-        
-        fig.tight_layout(pad=3.0)
-        
-        canvas = FigureCanvasTkAgg(fig, tab)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
-    
-    def create_financial_analytics(self, notebook):
-        """Financial analytics dashboard"""
-        tab = tk.Frame(notebook, bg='white')
-        notebook.add(tab, text='💰 Financial Summary')
-        
-        fig = Figure(figsize=(14, 8), facecolor='white', dpi=100)
-        
-        # Prepare financial data
-        if self.products:
-            product_df = pd.DataFrame([
-                {
-                    'name': p['name'],
-                    'revenue': p['price'] * p['total_sold'],
-                    'inventory_value': p['price'] * p['quantity'],
-                    'profit_margin': 30  # Assumed 30% profit margin
-                }
-                for p in self.products.values()
-            ])
-        else:
-            product_df = pd.DataFrame()
+        Range totals an earlier index worked out are carried over, so they
+        only need the rows added since.
+        """
+        totals = previous.totals if isinstance(previous, SQLiteTimeIndex) else None
+        return SQLiteTimeIndex(self.conn, self._count, totals)
+
+
+class SQLiteTimeIndex:
+    """Date-range reports answered by the `sales` table, with SalesTimeIndex's interface.
+    
+    Totals are SUM/COUNT queries and pages ORDER BY date ... LIMIT/OFFSET
+    over the sales_date index, restricted to the first `count` rows, so
+    building one reads nothing and a newer view just moves that limit.
+    A range's totals are remembered with the row count they cover, and
+    later indexes add only the rows past it.
+    """
+    
+    def __init__(self, conn, count, totals=None):
+        self.conn = conn
+        self.count = count
+        # {(start, end, product_id): (rows covered, (transactions, revenue, items))}
+        self.totals = totals if totals is not None else {}
+    
+    def _where(self, start, end, product_id, after=0):
+        clauses, params = ["id > ?", "id <= ?"], [after, self.count]
+        # Rows added since `after` are a short rowid range; +date stops the
+        # planner from scanning the date range through sales_date instead
+        date = "+date" if after else "date"
+        if start is not None:
+            clauses.append(f"{date} >= ?")
+            params.append(time.strftime(SalesLedger.DATE_FORMAT, time.gmtime(start)))
+        if end is not None:
+            clauses.append(f"{date} < ?")
+            params.append(time.strftime(SalesLedger.DATE_FORMAT, time.gmtime(end)))
+        if product_id is not None:
+            clauses.append("product_id = ?")
+            params.append(product_id)
+        return " AND ".join(clauses), params
+    
+    def has_product(self, product_id):
+        return self.conn.execute("SELECT 1 FROM sales WHERE product_id = ? AND id <= ? LIMIT 1",
+                                 (product_id, self.count)).fetchone() is not None
+    
+    def summary(self, start=None, end=None, product_id=None):
+        """Return (transactions, revenue, items sold) for the range"""
+        key = (start, end, product_id)
+        covered, (count, revenue, items) = self.totals.get(key, (0, (0, 0.0, 0)))
+        if covered > self.count:
+            covered, count, revenue, items = 0, 0, 0.0, 0
+        if covered < self.count:
+            where, params = self._where(start, end, product_id, covered)
+            more = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(total_amount), 0), COALESCE(SUM(quantity), 0) "
+                f"FROM sales WHERE {where}", params).fetchone()
+            count, revenue, items = count + more[0], revenue + float(more[1]), items + int(more[2])
+            self.totals[key] = (self.count, (count, revenue, items))
+        return count, revenue, items
+    
+    def page(self, start=None, end=None, product_id=None, offset=0, limit=25):
+        """Sale dicts for rows offset..offset+limit of the range, newest first"""
+        where, params = self._where(start, end, product_id)
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(SQLiteSalesView.COLUMNS)} FROM sales WHERE {where} "
+            "ORDER BY date DESC, id DESC LIMIT ? OFFSET ?", params + [limit, offset])
+        return [dict(zip(SQLiteSalesView.COLUMNS, row)) for row in cursor]
+    
+    def time_span(self):
+        """(first, last) sale timestamps, or None without sales"""
+        span = []
+        for order in ("ASC", "DESC"):
+            # +id keeps the planner walking sales_date rather than sorting a rowid range
+            row = self.conn.execute(f"SELECT date FROM sales WHERE +id <= ? ORDER BY date {order} LIMIT 1",
+                                    (self.count,)).fetchone()
+            if row is None:
+                return None
+            span.append(calendar.timegm(time.strptime(row[0], SalesLedger.DATE_FORMAT)))
+        return tuple(span)
+
+
+class SQLiteStorage(StorageBackend):
+    """Embedded SQLite database with indexed products and sales tables"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS products (
+            product_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            quantity INTEGER NOT NULL,
+            total_sold INTEGER NOT NULL DEFAULT 0,
+            reorder_point INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS sales (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            product_id TEXT NOT NULL,
+            product_name TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            unit_price REAL NOT NULL,
+            total_amount REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sales_date ON sales (date);
+        CREATE INDEX IF NOT EXISTS sales_product ON sales (product_id);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value
+        );
+        CREATE TABLE IF NOT EXISTS rollup_daily (
+            day TEXT PRIMARY KEY,
+            revenue REAL NOT NULL,
+            quantity INTEGER NOT NULL,
+            transactions INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS rollup_products (
+            product_name TEXT PRIMARY KEY,
+            revenue REAL NOT NULL,
+            quantity INTEGER NOT NULL,
+            transactions INTEGER NOT NULL
+        );
+        -- Rollups kept by older versions that nothing reads
+        DROP TABLE IF EXISTS rollup_hourly;
+        DROP TABLE IF EXISTS rollup_product_daily;
+    """
+    
+    ROLLUP_TOTALS = "SUM(total_amount), SUM(quantity), COUNT(*) FROM sales"
+    ROLLUP_QUERIES = {
+        'rollup_daily': f"SELECT substr(date, 1, 10) AS day, {ROLLUP_TOTALS} GROUP BY day",
+        'rollup_products': f"SELECT product_name, {ROLLUP_TOTALS} GROUP BY product_name"
+    }
+    
+    ROLLUP_UPSERT = (" VALUES (?, ?, ?, 1) ON CONFLICT DO UPDATE SET "
+                     "revenue = revenue + excluded.revenue, quantity = quantity + excluded.quantity, "
+                     "transactions = transactions + 1")
+    
+    def __init__(self, path, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        # Read-only stores are opened with a mode=ro URI, so nothing here
+        # (schema, migrations, rollup repair) can change the file
+        self.database = (f"file:{urllib.request.pathname2url(os.path.abspath(path))}?mode=ro"
+                         if read_only else path)
+        # Sales may be loaded on a worker thread; the engine never uses the
+        # connection from two threads at once
+        self.conn = sqlite3.connect(self.database, check_same_thread=False, uri=True)
+        if not read_only:
+            self.conn.executescript(self.SCHEMA)
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        # Read-only databases from before the rollup tables compute them from the sales table
+        self.has_rollups = set(self.ROLLUP_QUERIES) <= tables
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(products)")]
+        self.reorder_column = 'reorder_point'
+        if 'reorder_point' not in columns:
+            # Databases from before per-product reorder points
+            if read_only:
+                self.reorder_column = 'NULL'
+            else:
+                with self.conn:
+                    self.conn.execute("ALTER TABLE products ADD COLUMN reorder_point INTEGER")
+    
+    def load_products(self):
+        products = {}
+        for product_id, name, price, quantity, total_sold, reorder_point in self.conn.execute(
+                f"SELECT product_id, name, price, quantity, total_sold, {self.reorder_column} FROM products"):
+            products[product_id] = {'name': name, 'price': price, 'quantity': quantity, 'total_sold': total_sold}
+            if reorder_point is not None:
+                products[product_id]['reorder_point'] = reorder_point
+        return products
+    
+    def load_sales(self, products, progress=None):
+        """Sales stay in the database; only the revenue and rollups are read"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'total_revenue'").fetchone()
+        total_revenue = row[0] if row else 0.0
+        sales_history = self.sales_view = SQLiteSalesView(self.conn, self.database)
+        rollups = self.load_rollups(len(sales_history))
+        if progress is not None:
+            progress(1.0)
+        return products, sales_history, total_revenue, rollups
+    
+    def load_rollups(self, sales_count):
+        """Read the rollup tables, rebuilding them first if they lag the sales table.
         
-        # Chart 1: Revenue vs Inventory Value
-        ax1 = fig.add_subplot(2, 2, 1)
-        if not product_df.empty:
-            x = np.arange(len(product_df))
-            width = 0.35
-            
-            bars1 = ax1.bar(x - width/2, product_df['revenue'], width,
-                          label='Revenue', color='#2ecc71', alpha=0.8, edgecolor='black')
-            bars2 = ax1.bar(x + width/2, product_df['inventory_value'], width,
-                          label='Inventory Value', color='#3498db', alpha=0.8, edgecolor='black')
-            
-            ax1.set_xlabel('Products', fontweight='bold', fontsize=10)
-            ax1.set_ylabel('Amount ($)', fontweight='bold', fontsize=10)
-            ax1.set_title('Revenue vs Inventory Value', fontweight='bold', fontsize=12, pad=15)
-            ax1.set_xticks(x)
-            ax1.set_xticklabels([n[:12] for n in product_df['name']], 
-                               rotation=45, ha='right', fontsize=8)
-            ax1.legend(fontsize=9)
-            ax1.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        # Chart 2: Revenue Breakdown
-        ax2 = fig.add_subplot(2, 2, 2)
-        total_revenue = self.total_revenue
-        total_inventory = sum(p['price'] * p['quantity'] for p in self.products.values())
-        estimated_profit = total_revenue * 0.30
-        
-        financial_data = np.array([total_revenue, total_inventory, estimated_profit])
-        labels = ['Total Revenue', 'Inventory Value', 'Est. Profit (30%)']
-        colors_fin = ['#2ecc71', '#3498db', '#f39c12']
-        
-        bars = ax2.bar(range(3), financial_data, color=colors_fin, 
-                      alpha=0.8, edgecolor='black', linewidth=2)
-        ax2.set_ylabel('Amount ($)', fontweight='bold', fontsize=10)
-        ax2.set_title('Financial Overview', fontweight='bold', fontsize=12, pad=15)
-        ax2.set_xticks(range(3))
-        ax2.set_xticklabels(labels, fontsize=9)
-        ax2.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        for bar, value in zip(bars, financial_data):
-            ax2.text(bar.get_x() + bar.get_width()/2., value,
-                    f'${value:.2f}', ha='center', va='bottom',
-                    fontsize=10, fontweight='bold')
-        
-        # Chart 3: Sales Trend with Moving Average
-        ax3 = fig.add_subplot(2, 2, 3)
-        if self.sales_history:
-            df = pd.DataFrame(self.sales_history)
-            df['date'] = pd.to_datetime(df['date'])
-            df['date_only'] = df['date'].dt.date
-            daily_rev = df.groupby('date_only')['total_amount'].sum()
-            
-            # Plot daily revenue
-            ax3.plot(range(len(daily_rev)), daily_rev.values,
-                    marker='o', linewidth=2, markersize=6, color='#3498db',
-                    label='Daily Revenue', alpha=0.7)
-            
-            # Calculate moving average if enough data
-            if len(daily_rev) >= 3:
-                window = min(3, len(daily_rev))
-                moving_avg = pd.Series(daily_rev.values).rolling(window=window).mean()
-                ax3.plot(range(len(moving_avg)), moving_avg.values,
-                        linewidth=3, color='#e74c3c', linestyle='--',
-                        label=f'{window}-Day Moving Avg', alpha=0.8)
-            
-            ax3.set_xlabel('Days', fontweight='bold', fontsize=10)
-            ax3.set_ylabel('Revenue ($)', fontweight='bold', fontsize=10)
-            ax3.set_title('Revenue Trend Analysis', fontweight='bold', fontsize=12, pad=15)
-            ax3.legend(fontsize=9)
-            ax3.grid(True, alpha=0.3, linestyle='--')
-            ax3.fill_between(range(len(daily_rev)), daily_rev.values, alpha=0.2, color='#3498db')
-        
-        # Chart 4: Key Performance Indicators
-        ax4 = fig.add_subplot(2, 2, 4)
-        ax4.axis('off')
-        
-        # Calculate KPIs
-        total_products = len(self.products)
-        total_sales_count = len(self.sales_history)
-        avg_order_value = total_revenue / total_sales_count if total_sales_count > 0 else 0
-        total_items_sold = sum(p['total_sold'] for p in self.products.values())
-        
-        # Create KPI display
-        kpi_text = f"""
-        KEY PERFORMANCE INDICATORS (KPIs)
-        {'='*50}
-        
-        📊 Sales Metrics:
-           • Total Revenue: ${total_revenue:,.2f}
-           • Total Transactions: {total_sales_count}
-           • Average Order Value: ${avg_order_value:.2f}
-           • Total Units Sold: {total_items_sold}
-        
-        📦 Inventory Metrics:
-           • Total Products: {total_products}
-           • Inventory Value: ${total_inventory:,.2f}
-           • Avg Product Value: ${total_inventory/total_products if total_products > 0 else 0:.2f}
-        
-        💰 Financial Metrics:
-           • Estimated Profit: ${estimated_profit:,.2f}
-           • Profit Margin: 30.0%
-           • ROI: {(total_revenue/total_inventory*100 if total_inventory > 0 else 0):.1f}%
-        
-        🎯 Performance:
-           • Stock Turnover: {(total_items_sold/(total_items_sold + sum(p['quantity'] for p in self.products.values()))*100 if (total_items_sold + sum(p['quantity'] for p in self.products.values())) > 0 else 0):.1f}%
+        A read-only store computes stale rollups from the sales table
+        instead of writing them back.
         """
+        queries = dict(self.ROLLUP_QUERIES)
+        if self.rollups_cover(sales_count):
+            queries = {table: f"SELECT * FROM {table}" for table in queries}
+        elif not self.read_only:
+            with self.conn:
+                self.rebuild_rollups()
+            queries = {table: f"SELECT * FROM {table}" for table in queries}
+        
+        rollups = SalesRollups()
+        rollups.sales_count = sales_count
+        rollups.daily = {day: (r, q, t) for day, r, q, t in self.conn.execute(queries['rollup_daily'])}
+        rollups.products = {name: (r, q, t) for name, r, q, t in self.conn.execute(queries['rollup_products'])}
+        return rollups
+    
+    def rollups_cover(self, sales_count):
+        if not self.has_rollups:
+            return False
+        return all(self.conn.execute(f"SELECT COALESCE(SUM(transactions), 0) FROM {table}").fetchone()[0]
+                   == sales_count for table in self.ROLLUP_QUERIES)
+    
+    def rebuild_rollups(self):
+        """Recompute the rollup tables from the sales table inside the caller's transaction"""
+        for table, query in self.ROLLUP_QUERIES.items():
+            self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute(f"INSERT INTO {table} {query}")
+    
+    def record_sales(self, start_seq, sale_records):
+        """Commit the sale rows, the stock changes and the new revenue together.
         
-        ax4.text(0.5, 0.5, kpi_text, ha='center', va='center',
-                fontsize=10, family='monospace',
-                bbox=dict(boxstyle='round,pad=1', facecolor='#ecf0f1', 
-                         edgecolor='#34495e', linewidth=2))
+        Rows still pending from a failed write are inserted too, so ids
+        stay contiguous; their stock, revenue and rollups wait for the
+        full save that follows a failure.
+        """
+        with self.conn:
+            self.sales_view.write_pending()
+            self.conn.executemany(
+                "UPDATE products SET quantity = quantity - ?, total_sold = total_sold + ? "
+                "WHERE product_id = ?",
+                [(sale['quantity'], sale['quantity'], sale['product_id']) for sale in sale_records])
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('total_revenue', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+                (sum(sale['total_amount'] for sale in sale_records),))
+            self.conn.executemany("INSERT INTO rollup_daily" + self.ROLLUP_UPSERT,
+                                  [(sale['date'][:10], sale['total_amount'], sale['quantity'])
+                                   for sale in sale_records])
+            self.conn.executemany("INSERT INTO rollup_products" + self.ROLLUP_UPSERT,
+                                  [(sale['product_name'], sale['total_amount'], sale['quantity'])
+                                   for sale in sale_records])
+        self.sales_view.committed()
+    
+    writes_through = True
+    
+    def save(self, products, sales_history, total_revenue, rollups, mark=None):
+        """Write product rows and revenue; sales, rollups and catalog edits are committed as they happen.
         
-        ax4.set_title('Business KPI Dashboard', fontweight='bold', 
-                     fontsize=14, pad=20, loc='center')
+        After a failed write this also inserts the sales it left pending
+        and rebuilds the rollup tables they are missing from.
+        """
+        with self.conn:
+            sales_history.write_pending()
+            if not self.rollups_cover(len(sales_history)):
+                self.rebuild_rollups()
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep (product_id TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM keep")
+            self.conn.executemany("INSERT INTO keep VALUES (?)", ((pid,) for pid in products))
+            self.conn.execute("DELETE FROM products WHERE product_id NOT IN (SELECT product_id FROM keep)")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO products (product_id, name, price, quantity, total_sold, reorder_point) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((pid, p['name'], p['price'], p['quantity'], p['total_sold'], p.get('reorder_point'))
+                 for pid, p in products.items()))
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('total_revenue', ?)",
+                              (total_revenue,))
+        sales_history.committed()
+    
+    def record_product(self, product_id, product):
+        with self.conn:
+            if product is None:
+                self.conn.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO products (product_id, name, price, quantity, total_sold, reorder_point) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (product_id, product['name'], product['price'], product['quantity'], product['total_sold'],
+                     product.get('reorder_point')))
+    
+    def size_on_disk(self):
+        return os.path.getsize(self.path)
+    
+    def close(self):
+        self.conn.close()
+
+
+def open_storage(path, read_only=False, create=False):
+    """Pick a storage backend from the data file's extension.
+    
+    create lets a .npstore directory that does not exist yet load as an
+    empty store; JSON and SQLite stores always may.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.db', '.sqlite', '.sqlite3'):
+        return SQLiteStorage(path, read_only=read_only)
+    if extension == '.npstore' or os.path.isdir(path):
+        return NpyStorage(path, read_only=read_only, create=create)
+    return JsonStorage(path, read_only=read_only)
+
+
+def store_exists(path):
+    """True if a store has been saved at path; a JSON store may so far be only its journal"""
+    return os.path.exists(path) or os.path.exists(os.path.splitext(path)[0] + '.journal')
+
+
+def convert_store(source, destination):
+    """Copy a store into a new file or directory; formats follow the extensions"""
+    if os.path.exists(destination):
+        raise ValueError(f"{destination} already exists")
+    storage = open_storage(source)
+    try:
+        products, sales_history, total_revenue, rollups = storage.load()
+        target = open_storage(destination)
+        try:
+            if isinstance(target, JsonStorage):
+                target.compact(products, sales_history, total_revenue, rollups)
+            else:
+                _, target_sales, _, _ = target.load()
+                for start in range(0, len(sales_history), JsonStorage.SALES_CHUNK):
+                    chunk = sales_history[start:start + JsonStorage.SALES_CHUNK]
+                    target_sales.extend(chunk)
+                    target.record_sales(start, chunk)
+                target.save(products, target_sales, total_revenue, rollups)
+        finally:
+            target.close()
+    finally:
+        storage.close()
+    return len(products), len(sales_history)
+
+
+class StoreAggregates:
+    """Running totals that are updated on every store mutation.
+    
+    The dashboard, sales report and KPI panels read these in O(1) instead of
+    rescanning the catalog or sales history. rebuild() recomputes everything
+    from scratch and verify() reports any field that has drifted.
+    """
+    
+    FIELDS = ('product_count', 'total_stock', 'inventory_value', 'units_sold',
+              'sales_count', 'items_sold', 'sales_revenue')
+    
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+    
+    @staticmethod
+    def compute(products, sales_history):
+        """Full-scan values for every field"""
+        sales_count, sales_revenue, items_sold = sales_history.summary()
+        return {
+            'product_count': len(products),
+            'total_stock': sum(p['quantity'] for p in products.values()),
+            'inventory_value': sum(p['price'] * p['quantity'] for p in products.values()),
+            'units_sold': sum(p['total_sold'] for p in products.values()),
+            'sales_count': sales_count,
+            'items_sold': items_sold,
+            'sales_revenue': sales_revenue
+        }
+    
+    def rebuild(self, products, sales_history):
+        for field, value in self.compute(products, sales_history).items():
+            setattr(self, field, value)
+    
+    def verify(self, products, sales_history):
+        """Return {field: (running, actual)} for fields that disagree"""
+        mismatches = {}
+        for field, actual in self.compute(products, sales_history).items():
+            running = getattr(self, field)
+            if not math.isclose(running, actual, rel_tol=1e-9, abs_tol=1e-6):
+                mismatches[field] = (running, actual)
+        return mismatches
+    
+    def product_added(self, product):
+        self.product_count += 1
+        self.total_stock += product['quantity']
+        self.inventory_value += product['price'] * product['quantity']
+        self.units_sold += product['total_sold']
+    
+    def product_removed(self, product):
+        self.product_count -= 1
+        self.total_stock -= product['quantity']
+        self.inventory_value -= product['price'] * product['quantity']
+        self.units_sold -= product['total_sold']
+    
+    def stock_changed(self, product, old_quantity):
+        delta = product['quantity'] - old_quantity
+        self.total_stock += delta
+        self.inventory_value += product['price'] * delta
+    
+    def sale_recorded(self, product, sale_record):
+        """A sale already applied to product's quantity and total_sold"""
+        quantity = sale_record['quantity']
+        self.total_stock -= quantity
+        self.inventory_value -= product['price'] * quantity
+        self.units_sold += quantity
+        self.sales_count += 1
+        self.items_sold += quantity
+        self.sales_revenue += sale_record['total_amount']
+
+
+class StockLevels:
+    """Products ordered by stock level, for low-stock range queries and alerts.
+    
+    (quantity, product_id) pairs are kept in a sorted list, so "at or below
+    N" is one bisect and a slice, and the products at or below their
+    reorder point are kept as a set. A product without its own
+    'reorder_point' uses DEFAULT_REORDER_POINT.
+    """
+    
+    DEFAULT_REORDER_POINT = 5
+    
+    def __init__(self, products=None):
+        self.rebuild(products or {})
+    
+    def rebuild(self, products):
+        self.products = products
+        self.levels = {pid: p['quantity'] for pid, p in products.items()}
+        self.ordered = sorted((quantity, pid) for pid, quantity in self.levels.items())
+        self.low = {pid for pid, p in products.items() if p['quantity'] <= self.reorder_point(p)}
+    
+    def reorder_point(self, product):
+        return product.get('reorder_point', self.DEFAULT_REORDER_POINT)
+    
+    def update(self, product_id):
+        """Re-index a product after its stock, reorder point or existence changed.
         
-        fig.tight_layout(pad=3.0)
+        Returns True if this change took it to or below its reorder point.
+        """
+        old_quantity = self.levels.pop(product_id, None)
+        if old_quantity is not None:
+            del self.ordered[bisect.bisect_left(self.ordered, (old_quantity, product_id))]
+        was_low = product_id in self.low
+        self.low.discard(product_id)
+        product = self.products.get(product_id)
+        if product is None:
+            return False
+        
+        quantity = product['quantity']
+        self.levels[product_id] = quantity
+        bisect.insort(self.ordered, (quantity, product_id))
+        if quantity <= self.reorder_point(product):
+            self.low.add(product_id)
+            return not was_low
+        return False
+    
+    def at_or_below(self, threshold, limit=None):
+        """(count, product IDs) with stock at or below threshold, lowest first"""
+        end = bisect.bisect_left(self.ordered, (threshold + 1,))
+        stop = end if limit is None else min(end, limit)
+        return end, [pid for _, pid in self.ordered[:stop]]
+    
+    def below_reorder_point(self, limit=None):
+        """(count, product IDs) at or below their own reorder point, lowest stock first"""
+        ids = sorted(self.low, key=lambda pid: (self.levels[pid], pid))
+        return len(ids), ids if limit is None else ids[:limit]
+
+
+class AnalyticsCache:
+    """Thread-safe LRU cache of analytics intermediates keyed by data version.
+    
+    Pages ask for shared results (product frame, daily totals, ...) through
+    get(); the first caller for a (name, version) computes it and everyone
+    else, on any page or any later refresh, reuses it. An entry is dropped
+    as soon as a newer version of the same result is stored, so latest()
+    can hand the last one to an incremental update, and the least recently
+    used entries are evicted past max_bytes.
+    """
+    
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.latest_version = None
+        self.computing = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def estimate_bytes(value):
+        if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+            usage = value.memory_usage(deep=True)
+            return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, (list, tuple)):
+            return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+        return sys.getsizeof(value)
+    
+    def get(self, name, version, compute):
+        """Return the cached result, computing it once if missing"""
+        key = (name, version)
+        while True:
+            with self.lock:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return self.entries[key][0]
+                event = self.computing.get(key)
+                if event is None:
+                    event = self.computing[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Another worker is computing the same result; wait and re-check
+            event.wait()
         
-        canvas = FigureCanvasTkAgg(fig, tab)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+        try:
+            value = compute()
+        finally:
+            with self.lock:
+                del self.computing[key]
+            event.set()
+        self.put(key, value)
+        return value
     
-    def on_closing(self):
-        """Handle window closing"""
-        if messagebox.askokcancel("Quit", "Save data before quitting?"):
-            self.save_data()
-        self.root.destroy()
+    def latest(self, name):
+        """The newest cached (version, value) of a result, or None"""
+        with self.lock:
+            versions = [key[1] for key in self.entries if key[0] == name]
+            if not versions:
+                return None
+            key = (name, max(versions))
+            return key[1], self.entries[key][0]
     
-    def run(self):
-        """Start the application"""
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-        self.root.mainloop()
+    def put(self, key, value):
+        size = self.estimate_bytes(value)
+        with self.lock:
+            version = key[1]
+            if self.latest_version is None or version > self.latest_version:
+                self.latest_version = version
+            elif version < self.latest_version:
+                return
+            if size > self.max_bytes:
+                # Storing it would evict everything else and then itself
+                return
+            for old_key in [k for k in self.entries if k[0] == key[0] and k[1] < version]:
+                self.total_bytes -= self.entries.pop(old_key)[1]
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self.total_bytes -= self.entries.popitem(last=False)[1][1]
 
-def main():
+
+class InventoryIndex:
+    """Sorted ID and name indexes over the catalog for paged, filtered views.
+    
+    A search matches every word of the query, case-insensitively, against
+    the start of the product ID or anywhere inside a word of the name.
+    Name words map to the products using them; words are found by prefix
+    bisects into the sorted vocabulary, or for longer terms through a
+    trigram index over the (much smaller) vocabulary. Each sort order is
+    computed once and reused until the catalog changes, so fetching a page
+    costs the same whether the store has a hundred products or a million.
+    """
+    
+    GRAM = 3
+    
+    SORT_KEYS = {
+        'Price': lambda p: p['price'],
+        'Stock': lambda p: p['quantity'],
+        'Sold': lambda p: p['total_sold'],
+        'Revenue': lambda p: p['price'] * p['total_sold']
+    }
+    
+    def __init__(self, products):
+        self.rebuild(products)
+    
+    def rebuild(self, products):
+        self.products = products
+        self.ids = sorted(products)
+        self.lower_ids = sorted((pid.lower(), pid) for pid in products)
+        self.indexed_names = {pid: p['name'].lower() for pid, p in products.items()}
+        self.names = sorted((name, pid) for pid, name in self.indexed_names.items())
+        self.word_products = {}
+        for pid, name in self.indexed_names.items():
+            for word in self._words(name):
+                self.word_products.setdefault(word, set()).add(pid)
+        self.vocabulary = sorted(self.word_products)
+        self.grams = {}
+        for word in self.vocabulary:
+            for gram in self._grams(word):
+                self.grams.setdefault(gram, set()).add(word)
+        self.orders = {}
+    
+    def _words(self, name):
+        return set(re.findall(r'\w+', name))
+    
+    def _grams(self, word):
+        return {word[i:i + self.GRAM] for i in range(len(word) - self.GRAM + 1)}
+    
+    def _add_word(self, word, product_id):
+        products = self.word_products.get(word)
+        if products is None:
+            products = self.word_products[word] = set()
+            bisect.insort(self.vocabulary, word)
+            for gram in self._grams(word):
+                self.grams.setdefault(gram, set()).add(word)
+        products.add(product_id)
+    
+    def _remove_word(self, word, product_id):
+        products = self.word_products[word]
+        products.discard(product_id)
+        if not products:
+            del self.word_products[word]
+            del self.vocabulary[bisect.bisect_left(self.vocabulary, word)]
+            for gram in self._grams(word):
+                words = self.grams[gram]
+                words.discard(word)
+                if not words:
+                    del self.grams[gram]
+    
+    def sync(self, product_ids):
+        """Bring the index up to date after the given products changed"""
+        for product_id in product_ids:
+            product = self.products.get(product_id)
+            name = self.indexed_names.get(product_id)
+            if product is None and name is not None:
+                del self.ids[bisect.bisect_left(self.ids, product_id)]
+                del self.lower_ids[bisect.bisect_left(self.lower_ids, (product_id.lower(), product_id))]
+                del self.names[bisect.bisect_left(self.names, (name, product_id))]
+                for word in self._words(name):
+                    self._remove_word(word, product_id)
+                del self.indexed_names[product_id]
+                self.orders.clear()
+            elif product is not None and name is None:
+                name = product['name'].lower()
+                bisect.insort(self.ids, product_id)
+                bisect.insort(self.lower_ids, (product_id.lower(), product_id))
+                bisect.insort(self.names, (name, product_id))
+                for word in self._words(name):
+                    self._add_word(word, product_id)
+                self.indexed_names[product_id] = name
+                self.orders.clear()
+            elif product is not None:
+                # Only value-sorted orders can move when stock or sales change
+                for key in [key for key in self.orders if key[1] in self.SORT_KEYS]:
+                    del self.orders[key]
+    
+    def term_lookup(self, term):
+        """(IDs starting with term, name words containing it) - both found without touching products"""
+        lo = bisect.bisect_left(self.lower_ids, (term,))
+        hi = bisect.bisect_left(self.lower_ids, (term + '\uffff',))
+        ids = [pid for _, pid in self.lower_ids[lo:hi]]
+        
+        if len(term) < self.GRAM:
+            # Too short for trigrams: match the start of words only
+            lo = bisect.bisect_left(self.vocabulary, term)
+            hi = bisect.bisect_left(self.vocabulary, term + '\uffff')
+            return ids, self.vocabulary[lo:hi]
+        candidates = sorted((self.grams.get(gram, ()) for gram in self._grams(term)), key=len)
+        return ids, [word for word in set(candidates[0]).intersection(*candidates[1:]) if term in word]
+    
+    def term_matches(self, term):
+        """IDs of products whose ID starts with term or whose name has a word containing it"""
+        ids, words = self.term_lookup(term)
+        found = set(ids)
+        for word in words:
+            found.update(self.word_products[word])
+        return found
+    
+    def product_matches(self, term, product_id):
+        """The test term_matches() applies, for a single product"""
+        if product_id.lower().startswith(term):
+            return True
+        name = self.indexed_names[product_id]
+        if term not in name:
+            return False
+        words = self._words(name)
+        if len(term) < self.GRAM:
+            return any(word.startswith(term) for word in words)
+        return any(term in word for word in words)
+    
+    def matches(self, query):
+        """IDs matching every word of query, in ID order"""
+        terms = set(query.lower().split())
+        if not terms:
+            return list(self.ids)
+        
+        # Start from the term with the fewest products (an upper bound from
+        # the lookups alone); once few are left, checking them directly beats
+        # collecting every other term's matches
+        def estimate(term):
+            ids, words = self.term_lookup(term)
+            return len(ids) + sum(len(self.word_products[word]) for word in words)
+        
+        terms = sorted(terms, key=estimate)
+        found = self.term_matches(terms[0])
+        for term in terms[1:]:
+            if len(found) < 1000:
+                found = {pid for pid in found if self.product_matches(term, pid)}
+            else:
+                found &= self.term_matches(term)
+        return sorted(found)
+    
+    def order(self, query, column):
+        """Matching product IDs sorted ascending by column (cached)"""
+        key = (query, column)
+        order = self.orders.get(key)
+        if order is not None:
+            return order
+        
+        if column == 'Name':
+            order = [pid for _, pid in self.names]
+            if query:
+                wanted = set(self.matches(query))
+                order = [pid for pid in order if pid in wanted]
+        else:
+            order = self.matches(query) if query else self.ids
+            if column in self.SORT_KEYS:
+                sort_key = self.SORT_KEYS[column]
+                order = sorted(order, key=lambda pid: sort_key(self.products[pid]))
+        if len(self.orders) >= 32:
+            # Typing a search leaves an order per keystroke behind
+            self.orders.clear()
+        self.orders[key] = order
+        return order
+    
+    def page(self, query='', column='ID', descending=False, offset=0, limit=25):
+        """Return (total matches, product IDs for rows offset..offset+limit)"""
+        order = self.order(query, column)
+        total = len(order)
+        if descending:
+            stop = max(total - offset, 0)
+            return total, order[max(stop - limit, 0):stop][::-1]
+        return total, order[offset:offset + limit]
+
+
+class OrderGate:
+    """Lets many order batches run at once, or one snapshot with none in flight.
+    
+    Orders hold it shared from reserving stock until their sales are
+    applied, so a snapshot taken under exclusive() never sees stock taken
+    for a sale it does not contain.
+    """
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.held = False
+    
+    @contextmanager
+    def shared(self):
+        with self.condition:
+            while self.held or self.waiting:
+                self.condition.wait()
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                if not self.active:
+                    self.condition.notify_all()
+    
+    @contextmanager
+    def exclusive(self):
+        with self.condition:
+            self.waiting += 1
+            while self.held or self.active:
+                self.condition.wait()
+            self.waiting -= 1
+            self.held = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.held = False
+                self.condition.notify_all()
+
+class StoreEngine:
+    """Products, sales and persistence without any GUI.
+    
+    Every change to the store goes through these methods, so the Tk app,
+    the command line and scripts all share the same order logic. Views
+    subscribe() to be told what changed instead of being called directly.
+    
+    Orders may be placed from any number of threads. Listeners are called
+    on the thread that made the change.
+    """
+    
+    CHANGE_EVENTS = ('loaded', 'product_added', 'stock_changed', 'product_removed', 'sales_recorded')
+    # Sent after the change that caused it; the data itself did not change again
+    ALERT_EVENTS = ('low_stock',)
+    LOCK_STRIPES = 64
+    
+    def __init__(self, data_file="store_data.json", read_only=False, create=False):
+        self.products = {}
+        self.sales_history = SalesLedger()
+        self.total_revenue = 0.0
+        self.rollups = SalesRollups()
+        self.aggregates = StoreAggregates()
+        self.stock_levels = StockLevels()
+        self.data_file = data_file
+        # A read-only engine loads without touching the files and refuses changes
+        self.read_only = read_only
+        self.storage = open_storage(self.data_file, read_only, create)
+        # Bumped on every mutation; cached analytics are tied to a version
+        self.data_version = 0
+        # Set when a write-through storage call failed: only a full save()
+        # brings the store on disk back in line with memory
+        self.needs_full_save = False
+        self.listeners = []
+        # True between load_products() and finish_load(); changes are refused
+        self.loading = False
+        # Stock is guarded per product by striped locks; totals, history and
+        # the version by state_lock; the storage connection by storage_lock
+        self.stripes = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self.state_lock = threading.RLock()
+        self.storage_lock = threading.RLock()
+        self.gate = OrderGate()
+        self.commit_condition = threading.Condition()
+        self.commit_queue = []
+        self.committing = False
+    
+    def subscribe(self, listener):
+        """Call listener(event, product_ids) after every change.
+        
+        event is one of CHANGE_EVENTS or ALERT_EVENTS. product_ids is the
+        set of products touched, or None when anything may have changed.
+        'low_stock' lists the products that just reached their reorder point.
+        """
+        self.listeners.append(listener)
+    
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+    
+    def _changed(self, event, product_ids=None):
+        with self.state_lock:
+            self.data_version += 1
+        self._notify(event, product_ids)
+    
+    def _notify(self, event, product_ids=None):
+        for listener in list(self.listeners):
+            listener(event, product_ids)
+    
+    def _check_loaded(self):
+        if self.loading:
+            raise RuntimeError("The sales history is still loading")
+    
+    def _check_writable(self):
+        self._check_loaded()
+        if self.read_only:
+            raise RuntimeError(f"{self.data_file} was opened read-only")
+    
+    def _write_through(self, write, *args):
+        """Persist one change; on failure the next save() must rewrite everything"""
+        try:
+            write(*args)
+        except Exception:
+            self.needs_full_save = True
+            raise
+    
+    def _record_product(self, product_id, product):
+        """Write one catalog edit through with the gate held exclusively, so it lands
+        in the journal at the same place among the sales as in memory.
+        
+        Returns the storage error rather than raising it, so listeners hear
+        of the change first.
+        """
+        try:
+            with self.storage_lock:
+                self._write_through(self.storage.record_product, product_id, product)
+        except Exception as error:
+            return error
+        return None
+    
+    def load(self, progress=None):
+        """Load existing data from the storage backend"""
+        self.load_products()
+        self.finish_load(self.read_sales(progress))
+    
+    def load_products(self):
+        """First load phase: the catalog only, with an empty sales history"""
+        self.loading = True
+        self.products = self.storage.load_products()
+        self.sales_history = SalesLedger()
+        self.total_revenue = 0.0
+        self.rollups = SalesRollups()
+        self.aggregates.rebuild(self.products, self.sales_history)
+        self.stock_levels.rebuild(self.products)
+        self._changed('loaded')
+    
+    def read_sales(self, progress=None):
+        """Second load phase, safe on a worker thread: returns the loaded state for finish_load()"""
+        return self.storage.load_sales(self.products, progress)
+    
+    def finish_load(self, loaded):
+        """Install what read_sales() returned"""
+        self.products, self.sales_history, self.total_revenue, self.rollups = loaded
+        self.aggregates.rebuild(self.products, self.sales_history)
+        self.stock_levels.rebuild(self.products)
+        self.loading = False
+        self._changed('loaded')
+    
+    def snapshot_state(self):
+        """Copy of everything save() writes, cheap enough to take on every autosave"""
+        self._check_loaded()
+        with self.gate.exclusive(), self.state_lock:
+            return {
+                'version': self.data_version,
+                'products': {product_id: dict(product) for product_id, product in self.products.items()},
+                'sales_history': self.sales_history.snapshot(),
+                'total_revenue': self.total_revenue,
+                'rollups': self.rollups.snapshot(),
+                'mark': self.storage.mark()
+            }
+    
+    def save(self, state=None):
+        """Save current data, or a snapshot_state() taken earlier, through the storage backend.
+        
+        Write-through backends always save the current data: their sales are
+        committed as they happen, and an older snapshot would roll stock back.
+        """
+        self._check_writable()
+        if state is None or self.storage.writes_through:
+            with self.gate.exclusive(), self.state_lock, self.storage_lock:
+                self.storage.save(self.products, self.sales_history, self.total_revenue, self.rollups,
+                                  self.storage.mark())
+                self.needs_full_save = False
+        else:
+            self.storage.save(state['products'], state['sales_history'], state['total_revenue'], state['rollups'],
+                              state['mark'])
+    
+    def close(self):
+        self.storage.close()
+    
+    def add_product(self, product_id, name, price, quantity, reorder_point=None):
+        """Add a product to the catalog"""
+        self._check_writable()
+        product = {
+            'name': name,
+            'price': price,
+            'quantity': quantity,
+            'total_sold': 0
+        }
+        if reorder_point is not None:
+            product['reorder_point'] = reorder_point
+        with self.gate.exclusive():
+            with self.product_locks([product_id]), self.state_lock:
+                self.products[product_id] = product
+                self.aggregates.product_added(product)
+                low = self.stock_levels.update(product_id)
+            error = self._record_product(product_id, product)
+        self._changed('product_added', {product_id})
+        if low:
+            self._notify('low_stock', {product_id})
+        if error is not None:
+            raise error
+        return product
+    
+    def set_stock(self, product_id, quantity):
+        """Set a product's stock level"""
+        self._check_writable()
+        with self.gate.exclusive():
+            with self.product_locks([product_id]), self.state_lock:
+                product = self.products[product_id]
+                old_quantity = product['quantity']
+                product['quantity'] = quantity
+                self.aggregates.stock_changed(product, old_quantity)
+                low = self.stock_levels.update(product_id)
+            error = self._record_product(product_id, product)
+        self._changed('stock_changed', {product_id})
+        if low:
+            self._notify('low_stock', {product_id})
+        if error is not None:
+            raise error
+    
+    def set_reorder_point(self, product_id, reorder_point):
+        """Alert when the product's stock reaches reorder_point; None restores the default"""
+        self._check_writable()
+        with self.gate.exclusive():
+            with self.product_locks([product_id]), self.state_lock:
+                product = self.products[product_id]
+                if reorder_point is None:
+                    product.pop('reorder_point', None)
+                else:
+                    product['reorder_point'] = reorder_point
+                low = self.stock_levels.update(product_id)
+            error = self._record_product(product_id, product)
+        self._changed('stock_changed', {product_id})
+        if low:
+            self._notify('low_stock', {product_id})
+        if error is not None:
+            raise error
+    
+    def low_stock(self, threshold=None, limit=None):
+        """(count, product IDs) with stock at or below threshold, or below their reorder point if None.
+        
+        Lowest stock first; at most limit IDs are returned.
+        """
+        with self.state_lock:
+            if threshold is None:
+                return self.stock_levels.below_reorder_point(limit)
+            return self.stock_levels.at_or_below(threshold, limit)
+    
+    def remove_product(self, product_id):
+        """Remove a product from the catalog"""
+        self._check_writable()
+        with self.gate.exclusive():
+            with self.product_locks([product_id]), self.state_lock:
+                product = self.products.pop(product_id)
+                self.aggregates.product_removed(product)
+                self.stock_levels.update(product_id)
+            error = self._record_product(product_id, None)
+        self._changed('product_removed', {product_id})
+        if error is not None:
+            raise error
+        return product
+    
+    def record_sale(self, product_id, quantity):
+        """Sell one product if it is in stock; raises ValueError with the reason if not.
+        
+        Storage errors are raised after the sale has been applied in memory.
+        """
+        sale_records, rejected = self.place_orders([(product_id, quantity)])
+        if rejected:
+            raise ValueError(rejected[0][2])
+        return sale_records[0]
+    
+    @staticmethod
+    def _order_fields(order):
+        if isinstance(order, dict):
+            product_id, quantity = order.get('product_id'), order.get('quantity')
+        else:
+            product_id, quantity = order
+        return str(product_id).strip(), quantity
+    
+    @classmethod
+    def _order_product_ids(cls, orders):
+        """Product IDs of the orders that parse; validate_orders() rejects the rest"""
+        product_ids = set()
+        for order in orders:
+            try:
+                product_ids.add(cls._order_fields(order)[0])
+            except (TypeError, ValueError):
+                pass
+        return product_ids
+    
+    @staticmethod
+    def parse_quantity(quantity):
+        """quantity as an int, or None unless it is a whole number.
+        
+        Numeric strings from CSV files and whole floats like 3.0 are
+        accepted; True/False, 2.9, infinities and NaN are not.
+        """
+        if isinstance(quantity, bool):
+            return None
+        if isinstance(quantity, float) and not quantity.is_integer():
+            return None
+        try:
+            return int(quantity)
+        except (TypeError, ValueError, OverflowError):
+            return None
+    
+    @contextmanager
+    def product_locks(self, product_ids):
+        """Hold the stripe locks covering product_ids, always taken in stripe order"""
+        stripes = [self.stripes[i] for i in sorted({hash(pid) % len(self.stripes) for pid in product_ids})]
+        for lock in stripes:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(stripes):
+                lock.release()
+    
+    def validate_orders(self, batch):
+        """Check a batch against stock in one pass.
+        
+        Orders are (product_id, quantity) pairs or dicts with those keys.
+        Returns (accepted, rejected): accepted orders in batch order, and
+        (index, order, reason) for each one that cannot be filled. Stock
+        taken by earlier orders in the batch counts against later ones.
+        Only a dry run unless the batch's product locks are held.
+        """
+        accepted, rejected = [], []
+        remaining = {}
+        for index, order in enumerate(batch):
+            try:
+                product_id, quantity = self._order_fields(order)
+            except (TypeError, ValueError):
+                rejected.append((index, order, "Invalid order"))
+                continue
+            quantity = self.parse_quantity(quantity)
+            if quantity is None:
+                rejected.append((index, order, "Invalid quantity"))
+                continue
+            if product_id not in self.products:
+                rejected.append((index, order, "Product not found"))
+            elif quantity <= 0:
+                rejected.append((index, order, "Quantity must be positive"))
+            else:
+                available = remaining.get(product_id, self.products[product_id]['quantity'])
+                if quantity > available:
+                    rejected.append((index, order, f"Insufficient stock: {available} available"))
+                else:
+                    remaining[product_id] = available - quantity
+                    accepted.append((product_id, quantity))
+        return accepted, rejected
+    
+    def place_orders(self, batch, atomic=True):
+        """Reserve stock for a batch and record the sales; safe to call from many threads.
+        
+        Stock is checked and taken under the locks of the batch's products
+        only, so orders for different products proceed in parallel. The
+        sales are then appended and persisted through a group commit.
+        Returns (sale_records, rejected).
+        """
+        return self.place_order_groups([batch], atomic)[0]
+    
+    def place_order_groups(self, batches, atomic=True):
+        """place_orders() for several independent batches with one lock pass and one commit.
+        
+        Batches are filled in order, each against the stock left by the
+        ones before it, and atomic applies to each batch on its own.
+        Returns a (sale_records, rejected) pair per batch.
+        """
+        self._check_writable()
+        batches = [list(batch) for batch in batches]
+        results = []
+        sales = []
+        with self.gate.shared():
+            with self.product_locks(self._order_product_ids(order for batch in batches for order in batch)):
+                date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                for batch in batches:
+                    accepted, rejected = self.validate_orders(batch)
+                    if atomic and rejected:
+                        accepted = []
+                    sale_records = []
+                    for product_id, quantity in accepted:
+                        product = self.products[product_id]
+                        product['quantity'] -= quantity
+                        product['total_sold'] += quantity
+                        sale_records.append({
+                            'date': date,
+                            'product_id': product_id,
+                            'product_name': product['name'],
+                            'quantity': quantity,
+                            'unit_price': product['price'],
+                            'total_amount': product['price'] * quantity
+                        })
+                        sales.append((product, sale_records[-1]))
+                    results.append((sale_records, rejected))
+            if sales:
+                self._commit(sales)
+        return results
+    
+    def _commit(self, sales):
+        """Append reserved sales and persist them, sharing one storage write with concurrent callers.
+        
+        The first waiting thread becomes the leader and writes every batch
+        queued so far, so N threads pay for far fewer than N fsyncs, and
+        journal order always matches sales_history order.
+        """
+        ticket = {'sales': sales, 'done': False, 'error': None}
+        with self.commit_condition:
+            self.commit_queue.append(ticket)
+            while not ticket['done']:
+                if self.committing:
+                    self.commit_condition.wait()
+                    continue
+                self.committing = True
+                group, self.commit_queue = self.commit_queue, []
+                self.commit_condition.release()
+                try:
+                    error = None
+                    try:
+                        self._write_group([sale for queued in group for sale in queued['sales']])
+                    except Exception as exc:
+                        error = exc
+                finally:
+                    self.commit_condition.acquire()
+                    self.committing = False
+                    for queued in group:
+                        queued['done'] = True
+                        queued['error'] = error
+                    self.commit_condition.notify_all()
+        if ticket['error'] is not None:
+            raise ticket['error']
+    
+    def _write_group(self, sales):
+        sale_records = [sale for _, sale in sales]
+        # One storage transaction from the SQLite INSERTs in extend() to the commit
+        with self.storage_lock:
+            with self.state_lock:
+                for product, sale_record in sales:
+                    self.rollups.add(sale_record)
+                    self.total_revenue += sale_record['total_amount']
+                    self.aggregates.sale_recorded(product, sale_record)
+                product_ids = {sale['product_id'] for sale in sale_records}
+                low = {product_id for product_id in product_ids if self.stock_levels.update(product_id)}
+                start = len(self.sales_history)
+                self.sales_history.extend(sale_records)
+            self._changed('sales_recorded', product_ids)
+            if low:
+                self._notify('low_stock', low)
+            
+            self._write_through(self.storage.record_sales, start, sale_records)
+    
+    def process_orders(self, batch, atomic=True):
+        """Validate and record a batch of orders.
+        
+        With atomic=True nothing is applied unless every order can be
+        filled; otherwise the valid orders are applied and the rest are
+        reported. Returns a dict with the accepted count, the rejections,
+        the revenue added, the elapsed seconds and orders per second.
+        """
+        start = time.perf_counter()
+        batch = list(batch)
+        sale_records, rejected = self.place_orders(batch, atomic)
+        elapsed = time.perf_counter() - start
+        return {
+            'accepted': len(sale_records),
+            'rejected': rejected,
+            'revenue': sum(sale['total_amount'] for sale in sale_records),
+            'seconds': elapsed,
+            'orders_per_second': len(batch) / elapsed if elapsed > 0 else 0.0
+        }
+
+class AutoSaver:
+    """Background saves for a StoreEngine, coalesced under bursts of changes.
+    
+    The owner calls tick() periodically from the thread that changes the
+    engine. A tick that finds unsaved changes, with no save in flight and
+    none started in the last `interval` seconds, snapshots the engine on
+    that thread and hands the snapshot to a single saver thread, so a burst
+    of orders costs one save. `last` describes the latest finished save.
+    
+    Write-through backends (SQLite) commit every change as it happens, so
+    their saves write nothing unless a write-through call failed; then
+    the repairing full save runs on the saver thread too.
+    """
+    
+    def __init__(self, engine, interval=5.0):
+        self.engine = engine
+        self.interval = interval
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='autosave')
+        self.pending = None
+        self.saved_version = engine.data_version
+        self.last_started = 0.0
+        self.last = None
+        engine.subscribe(self.on_change)
+    
+    def on_change(self, event, product_ids):
+        if event == 'loaded':
+            self.saved_version = self.engine.data_version
+    
+    def dirty(self):
+        return self.engine.data_version != self.saved_version or self.engine.needs_full_save
+    
+    def busy(self):
+        return self.pending is not None and not self.pending.done()
+    
+    def tick(self):
+        """Start an autosave if one is due; returns whether it started"""
+        if (not self.interval or not self.dirty() or self.busy() or self.engine.loading
+                or time.monotonic() - self.last_started < self.interval):
+            return False
+        self.save_now()
+        return True
+    
+    def save_now(self):
+        """Snapshot on the calling thread and write it on the saver thread.
+        
+        Write-through backends have nothing to snapshot. Returns a Future,
+        or None if a save is already running.
+        """
+        if self.busy():
+            return None
+        self.last_started = time.monotonic()
+        state = None if self.engine.storage.writes_through else self.engine.snapshot_state()
+        self.pending = self.executor.submit(self._write, state)
+        return self.pending
+    
+    def _write(self, state):
+        version = self.engine.data_version if state is None else state['version']
+        started = time.perf_counter()
+        try:
+            if not self.engine.storage.writes_through or self.engine.needs_full_save:
+                self.engine.save(state)
+        except Exception as error:
+            self.last = {'error': error, 'finished': datetime.now()}
+            raise
+        self.saved_version = version
+        self.last = {
+            'error': None,
+            'finished': datetime.now(),
+            'seconds': time.perf_counter() - started,
+            'bytes': self.engine.storage.size_on_disk()
+        }
+        return self.last
+    
+    def flush(self):
+        """Wait for a running save, then save on this thread if changes remain"""
+        if self.pending is not None:
+            try:
+                self.pending.result()
+            except Exception:
+                pass
+        if self.dirty() and not self.engine.loading:
+            self._write(None)
+    
+    def close(self):
+        self.engine.unsubscribe(self.on_change)
+        self.executor.shutdown(wait=True)
+
+class HttpError(Exception):
+    """A request the intake server answers with `status` and an error message"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class OrderIntakeServer:
+    """Takes orders as JSON over HTTP and feeds them to a StoreEngine in micro-batches.
+    
+    POST /orders with one order or a list of them ({"product_id": ...,
+    "quantity": ...}); each request is all-or-nothing, like the order
+    dialog. GET /metrics reports counters, batch sizes and latency
+    percentiles. Requests arriving within `batch_window` seconds of each
+    other, up to `max_batch`, are placed with one lock pass and one storage
+    commit. Once `max_pending` requests are waiting, new ones are answered
+    503 straight away instead of queueing without bound.
+    
+    Everything runs on one asyncio loop, either the caller's (serve()) or
+    a daemon thread next to the Tk main loop (start_in_thread()).
+    """
+    
+    MAX_BODY = 1 << 20
+    REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               409: 'Conflict', 413: 'Payload Too Large', 431: 'Request Header Fields Too Large',
+               500: 'Internal Server Error', 503: 'Service Unavailable'}
+    
+    def __init__(self, engine, host='127.0.0.1', port=8765, batch_window=0.005, max_batch=256, max_pending=2048):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        # Engine calls run here so a commit's fsync never blocks the event loop
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='order-intake')
+        self.loop = None
+        self.server = None
+        self.pending = None
+        self.batcher = None
+        self.serving = None
+        self.thread = None
+        self.latencies = deque(maxlen=10000)
+        self.counters = {
+            'requests': 0,
+            'orders': 0,
+            'accepted': 0,
+            'rejected': 0,
+            'overloaded': 0,
+            'errors': 0,
+            'batches': 0,
+            'batched_requests': 0,
+            'largest_batch': 0
+        }
+    
+    async def start(self):
+        """Listen on host:port (port 0 picks a free one, stored back in self.port)"""
+        self.loop = asyncio.get_running_loop()
+        self.pending = asyncio.Queue(self.max_pending)
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.batcher = asyncio.create_task(self.run_batches())
+    
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        try:
+            await self.batcher
+        except asyncio.CancelledError:
+            pass
+        self.executor.shutdown(wait=True)
+    
+    async def serve(self, on_started=None):
+        """Serve until cancelled; on_started() is called once the port is open"""
+        self.serving = asyncio.current_task()
+        await self.start()
+        try:
+            if on_started is not None:
+                on_started()
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+    
+    def start_in_thread(self):
+        """Serve from a daemon thread; returns once listening, or raises the bind error"""
+        started = threading.Event()
+        failure = []
+        
+        def run():
+            try:
+                asyncio.run(self.serve(started.set))
+            except asyncio.CancelledError:
+                pass
+            except Exception as error:
+                failure.append(error)
+                started.set()
+        
+        self.thread = threading.Thread(target=run, name='order-intake-loop', daemon=True)
+        self.thread.start()
+        started.wait()
+        if failure:
+            raise failure[0]
+    
+    def stop_in_thread(self):
+        """Stop a server started with start_in_thread() and wait for the last batch"""
+        if self.thread is None or self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self.serving.cancel)
+        self.thread.join()
+        self.thread = None
+    
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HttpError as error:
+                    status, body = error.status, {'error': error.message}
+                    keep_alive = False
+                else:
+                    if request is None:
+                        break
+                    method, path, headers, payload = request
+                    status, body = await self.route(method, path, payload)
+                    keep_alive = headers.get('connection', '').lower() != 'close'
+                data = json.dumps(body).encode()
+                writer.write(f"HTTP/1.1 {status} {self.REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutting down with the connection open; end the handler quietly
+            pass
+        finally:
+            writer.close()
+    
+    @staticmethod
+    async def read_line(reader, status, what):
+        """One line, or what is left at end of stream; raises HttpError(status) past the reader's limit"""
+        try:
+            return await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as error:
+            return error.partial
+        except asyncio.LimitOverrunError:
+            raise HttpError(status, f"{what} too long")
+    
+    async def read_request(self, reader):
+        """Return (method, path, headers, body), None at end of stream, or raise HttpError"""
+        line = await self.read_line(reader, 400, "Request line")
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split()
+        except ValueError:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = await self.read_line(reader, 431, "Header line")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(400, "Bad Content-Length")
+        if length < 0:
+            raise HttpError(400, "Bad Content-Length")
+        if length > self.MAX_BODY:
+            raise HttpError(413, f"Request body over {self.MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target.split('?', 1)[0], headers, body
+    
+    async def route(self, method, path, payload):
+        if path == '/orders':
+            if method != 'POST':
+                return 405, {'error': "Use POST"}
+            return await self.submit(payload)
+        if path == '/metrics':
+            if method != 'GET':
+                return 405, {'error': "Use GET"}
+            return 200, self.metrics()
+        return 404, {'error': f"No such endpoint: {path}"}
+    
+    async def submit(self, payload):
+        """Queue one request's orders for the next batch and wait for its result"""
+        arrived = time.perf_counter()
+        self.counters['requests'] += 1
+        try:
+            orders = json.loads(payload)
+        except ValueError:
+            return 400, {'error': "Body must be JSON"}
+        if isinstance(orders, dict):
+            orders = [orders]
+        if not isinstance(orders, list) or not orders or not all(isinstance(order, dict) for order in orders):
+            return 400, {'error': "Expected an order object or a non-empty list of them"}
+        for index, order in enumerate(orders):
+            quantity = order.get('quantity')
+            # JSON numbers like 2.5, 1e400 or Infinity arrive as floats; true/false as bools
+            if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                return 400, {'error': f"Order {index}: quantity must be a positive whole number"}
+        
+        result = self.loop.create_future()
+        try:
+            self.pending.put_nowait((orders, result))
+        except asyncio.QueueFull:
+            self.counters['overloaded'] += 1
+            return 503, {'error': "Too many pending orders, retry shortly"}
+        status, body = await result
+        self.latencies.append(time.perf_counter() - arrived)
+        return status, body
+    
+    async def run_batches(self):
+        """Collect queued requests for up to batch_window seconds and place them together"""
+        while True:
+            group = [await self.pending.get()]
+            deadline = self.loop.time() + self.batch_window
+            while len(group) < self.max_batch:
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    group.append(await asyncio.wait_for(self.pending.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            self.counters['batches'] += 1
+            self.counters['batched_requests'] += len(group)
+            self.counters['largest_batch'] = max(self.counters['largest_batch'], len(group))
+            self.counters['orders'] += sum(len(orders) for orders, _ in group)
+            try:
+                results = await self.loop.run_in_executor(
+                    self.executor, self.engine.place_order_groups, [orders for orders, _ in group])
+                replies = self.batch_replies(results)
+            except RuntimeError as error:
+                replies = [(503, {'error': str(error)})] * len(group)
+            except (OSError, sqlite3.Error) as error:
+                self.counters['errors'] += len(group)
+                replies = [(500, {'error': f"Sale recorded, but could not be written to storage: {error}"})] * len(group)
+            except Exception as error:
+                # Anything else fails this batch only; the batcher must keep serving
+                self.counters['errors'] += len(group)
+                replies = [(500, {'error': f"Could not place the order: {error!r}"})] * len(group)
+            for (_, result), reply in zip(group, replies):
+                if not result.done():
+                    result.set_result(reply)
+    
+    def batch_replies(self, results):
+        """One (status, body) per request from place_order_groups() results"""
+        replies = []
+        for sale_records, rejected in results:
+            if rejected:
+                self.counters['rejected'] += 1
+                replies.append((409, {'error': "Order rejected; nothing was applied",
+                                      'rejected': [{'index': index, 'order': order, 'reason': reason}
+                                                   for index, order, reason in rejected]}))
+            else:
+                self.counters['accepted'] += 1
+                replies.append((200, {'sales': sale_records,
+                                      'total': sum(sale['total_amount'] for sale in sale_records)}))
+        return replies
+    
+    def metrics(self):
+        """Counters plus latency percentiles over the last 10,000 requests, in milliseconds"""
+        latencies = sorted(self.latencies)
+        
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 3)
+        
+        metrics = dict(self.counters)
+        metrics['pending'] = self.pending.qsize() if self.pending is not None else 0
+        metrics['average_batch'] = self.counters['batched_requests'] / max(1, self.counters['batches'])
+        metrics['latency_ms'] = {
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': percentile(1.0)
+        }
+        return metrics
+
+class EcommerceStoreComplete:
+    """Tk front end for a StoreEngine; redraws when the engine reports a change"""
+    
+    LOW_STOCK_ROWS = 500
+    
+    def __init__(self, data_file="store_data.json", engine=None, prewarm_analytics=True, profile_startup=False,
+                 autosave_interval=5.0, chart_budgets=None, dashboard_interval=1.0):
+        self.profile_startup = profile_startup
+        self.startup_times = [('imports', IMPORT_SECONDS)]
+        started = time.perf_counter()
+        
+        # Load the catalog before any window exists; sales follow in the background.
+        # An engine passed in is used as it is.
+        if engine is None:
+            engine = StoreEngine(data_file)
+            engine.load_products()
+        self.engine = engine
+        self.autosaver = AutoSaver(engine, autosave_interval)
+        self.manual_save = None
+        self.order_server = None
+        self.startup_times.append(('load products', time.perf_counter() - started))
+        self.executor = None
+        self.analytics_cache = AnalyticsCache()
+        self.chart_budgets = dict(CHART_BUDGETS, **(chart_budgets or {}))
+        self.dashboard_interval = dashboard_interval
+        self.viz_window = None
+        self.viz_refresh = None
+        self.viz_changed = None
+        self.viz_destroy = None
+        self.alert_window = None
+        self.alert_list = None
+        self.report_window = None
+        self.report_refresh = None
+        self.low_stock_alerts = deque(maxlen=500)
+        
+        # Create main window
+        window_started = time.perf_counter()
+        self.root = tk.Tk()
+        self.root.title("🛒 E-commerce Store Manager - Complete System")
+        self.root.geometry("1200x800")
+        self.root.configure(bg='#f0f0f0')
+        
+        # Setup GUI
+        self.setup_gui()
+        self.engine_events = queue.Queue()
+        self.engine.subscribe(self.on_store_changed)
+        self.startup_times.append(('build window', time.perf_counter() - window_started))
+        if self.engine.loading:
+            self.start_sales_load(started)
+        self.root.after_idle(self.startup_finished, started, prewarm_analytics)
+        self.root.after(500, self.autosave_tick)
+        self.root.after(50, self.drain_engine_events)
+    
+    def startup_finished(self, started, prewarm_analytics):
+        """Runs once the window is idle: report startup costs and prewarm analytics"""
+        self.startup_times.append(('first idle', time.perf_counter() - started))
+        if self.profile_startup:
+            print("\n⏱️ Startup profile:")
+            for step, seconds in self.startup_times:
+                print(f"   {step:<14}{seconds * 1000:8.1f} ms")
+        if prewarm_analytics:
+            threading.Thread(target=self.prewarm_analytics, name='analytics-prewarm', daemon=True).start()
+    
+    def prewarm_analytics(self):
+        """Import the analytics stack in the background so the first chart opens quickly"""
+        seconds = load_analytics_stack()
+        if self.profile_startup:
+            print(f"   {'analytics':<14}{seconds * 1000:8.1f} ms (background)")
+    
+    def start_sales_load(self, started):
+        """Read the sales history on a worker thread, showing progress in the status bar"""
+        for button in self.action_buttons:
+            button.config(state='disabled')
+        progress_bar = ttk.Progressbar(self.status_bar, mode='determinate', maximum=1.0)
+        progress_bar.place(relx=1.0, rely=0, relheight=1.0, width=200, anchor='ne')
+        self.load_progress = 0.0
+        results = queue.Queue()
+        
+        def progress(fraction):
+            self.load_progress = fraction
+        
+        def work():
+            try:
+                results.put((self.engine.read_sales(progress), None))
+            except Exception as error:
+                results.put((None, error))
+        
+        def poll():
+            try:
+                loaded, error = results.get_nowait()
+            except queue.Empty:
+                progress_bar['value'] = self.load_progress
+                self.status_bar.config(text=f"Loading sales history... {self.load_progress:.0%}")
+                self.root.after(100, poll)
+                return
+            
+            progress_bar.destroy()
+            if error is not None:
+                messagebox.showerror("Error", f"Could not load {self.engine.data_file}:\n{error}\n\n"
+                                              "The store will close without saving.")
+                self.root.destroy()
+                return
+            self.engine.finish_load(loaded)
+            for button in self.action_buttons:
+                button.config(state='normal')
+            self.startup_times.append(('load sales', time.perf_counter() - started))
+            if self.profile_startup:
+                print(f"   {'load sales':<14}{self.startup_times[-1][1] * 1000:8.1f} ms (background)")
+        
+        threading.Thread(target=work, name='sales-loader', daemon=True).start()
+        self.root.after(100, poll)
+    
+    def on_store_changed(self, event, product_ids):
+        """Engine listener: queue a redraw of whatever changed.
+        
+        Orders placed on other threads are handed to the Tk thread, which
+        is the only one allowed to touch widgets.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            self.engine_events.put((event, product_ids))
+        elif event == 'low_stock':
+            self.add_low_stock_alerts(product_ids)
+        else:
+            self.schedule_inventory_refresh(product_ids)
+    
+    def drain_engine_events(self):
+        """Redraw for changes made on other threads since the last poll"""
+        changed = set()
+        try:
+            while True:
+                event, product_ids = self.engine_events.get_nowait()
+                if event == 'low_stock':
+                    self.add_low_stock_alerts(product_ids)
+                elif product_ids is None:
+                    changed = None
+                elif changed is not None:
+                    changed.update(product_ids)
+        except queue.Empty:
+            pass
+        if changed is None or changed:
+            self.schedule_inventory_refresh(changed)
+        self.root.after(50, self.drain_engine_events)
+    
+    def save_data(self):
+        """Save now on the background saver; the status bar reports the result"""
+        if self.engine.loading:
+            return
+        self.manual_save = self.autosaver.save_now() or self.autosaver.pending
+        self.show_save_status()
+    
+    def autosave_tick(self):
+        """Start an autosave when one is due and report the latest save"""
+        self.autosaver.tick()
+        if self.manual_save is not None and self.manual_save.done():
+            if self.manual_save.exception() is not None:
+                messagebox.showerror("Error", f"Error saving data.\n{self.manual_save.exception()}")
+            self.manual_save = None
+        self.show_save_status()
+        self.root.after(500, self.autosave_tick)
+    
+    def show_save_status(self):
+        last = self.autosaver.last
+        if self.autosaver.busy():
+            self.save_label.config(text="💾 Saving...", fg='black')
+        elif last is not None and last['error'] is not None:
+            self.save_label.config(text=f"⚠️ Save failed at {last['finished']:%H:%M:%S}: {last['error']}", fg='#c0392b')
+        elif last is not None:
+            self.save_label.config(text=f"💾 Saved {last['finished']:%H:%M:%S} in {last['seconds'] * 1000:.0f} ms "
+                                        f"| {last['bytes'] / 1024:,.1f} KB on disk", fg='black')
+        elif self.autosaver.dirty():
+            self.save_label.config(text="💾 Unsaved changes", fg='black')
+    
+    def setup_gui(self):
+        """Setup the main GUI interface"""
+        
+        # Title Frame
+        title_frame = tk.Frame(self.root, bg='#2c3e50', height=60)
+        title_frame.pack(fill='x', padx=5, pady=5)
+        title_frame.pack_propagate(False)
+        
+        title_label = tk.Label(title_frame, text="🛒 E-COMMERCE STORE MANAGER", 
+                              font=('Arial', 16, 'bold'), fg='white', bg='#2c3e50')
+        title_label.pack(expand=True)
+        
+        # Dashboard Frame
+        dashboard_frame = tk.Frame(self.root, bg='#f0f0f0')
+        dashboard_frame.pack(fill='x', padx=5, pady=5)
+        
+        # Revenue Display
+        self.revenue_frame = tk.Frame(dashboard_frame, bg='#27ae60', height=50)
+        self.revenue_frame.pack(side='left', fill='both', expand=True, padx=2)
+        
+        self.revenue_label = tk.Label(self.revenue_frame, 
+                                     text=f"💰 Revenue: ${self.engine.total_revenue:.2f}", 
+                                     font=('Arial', 12, 'bold'), fg='white', bg='#27ae60')
+        self.revenue_label.pack(expand=True)
+        
+        # Products Count
+        self.products_frame = tk.Frame(dashboard_frame, bg='#3498db', height=50)
+        self.products_frame.pack(side='left', fill='both', expand=True, padx=2)
+        
+        self.products_label = tk.Label(self.products_frame, 
+                                      text=f"📦 Products: {len(self.engine.products)}", 
+                                      font=('Arial', 12, 'bold'), fg='white', bg='#3498db')
+        self.products_label.pack(expand=True)
+        
+        # Sales Count
+        self.sales_frame = tk.Frame(dashboard_frame, bg='#e74c3c', height=50)
+        self.sales_frame.pack(side='left', fill='both', expand=True, padx=2)
+        
+        self.sales_label = tk.Label(self.sales_frame, 
+                                    text=f"🛍️ Sales: {len(self.engine.sales_history)}", 
+                                    font=('Arial', 12, 'bold'), fg='white', bg='#e74c3c')
+        self.sales_label.pack(expand=True)
+        
+        # Button Frame
+        button_frame = tk.Frame(self.root, bg='#f0f0f0')
+        button_frame.pack(fill='x', padx=10, pady=5)
+        
+        buttons = [
+            ("➕ Add Product", self.add_product_dialog, '#3498db'),
+            ("📦 Update Stock", self.update_stock_dialog, '#f39c12'),
+            ("❌ Remove", self.remove_product_dialog, '#e74c3c'),
+            ("🛒 Process Order", self.process_order_dialog, '#2ecc71'),
+            ("📊 Sales Report", self.show_sales_report, '#9b59b6'),
+            ("⚠️ Low Stock", self.check_low_stock, '#e67e22'),
+            ("📈 Analytics", self.show_visualizations, '#16a085'),
+            ("💾 Save", self.save_data, '#34495e')
+        ]
+        
+        self.action_buttons = []
+        for i, (text, command, color) in enumerate(buttons):
+            btn = tk.Button(button_frame, text=text, command=command, 
+                           font=('Arial', 9, 'bold'), fg='white', bg=color,
+                           width=13, height=2, relief='flat')
+            btn.grid(row=i//4, column=i%4, padx=3, pady=3, sticky='ew')
+            self.action_buttons.append(btn)
+        self.low_stock_button = self.action_buttons[[command for _, command, _ in buttons].index(self.check_low_stock)]
+        
+        for i in range(4):
+            button_frame.columnconfigure(i, weight=1)
+        
+        # Inventory Frame
+        inventory_frame = tk.LabelFrame(self.root, text="📋 Current Inventory", 
+                                       font=('Arial', 12, 'bold'), bg='#f0f0f0')
+        inventory_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        
+        # Filter and paging controls
+        controls = tk.Frame(inventory_frame, bg='#f0f0f0')
+        controls.pack(fill='x', pady=(0, 5))
+        
+        tk.Label(controls, text="🔍 Search (ID or name):", bg='#f0f0f0').pack(side='left')
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', lambda *args: self.set_inventory_filter(self.filter_var.get()))
+        tk.Entry(controls, textvariable=self.filter_var, width=30).pack(side='left', padx=5)
+        
+        tk.Button(controls, text="▶", width=3, command=lambda: self.scroll_inventory('scroll', 1, 'pages')).pack(side='right')
+        tk.Button(controls, text="◀", width=3, command=lambda: self.scroll_inventory('scroll', -1, 'pages')).pack(side='right')
+        self.page_label = tk.Label(controls, text="", bg='#f0f0f0')
+        self.page_label.pack(side='right', padx=5)
+        
+        # Only the visible window of rows exists as Treeview items; the
+        # scrollbar and mouse wheel move a window over the index instead.
+        columns = ('ID', 'Name', 'Price', 'Stock', 'Sold', 'Revenue')
+        self.inventory_tree = ttk.Treeview(inventory_frame, columns=columns, show='headings', height=12)
+        
+        col_widths = {'ID': 100, 'Name': 200, 'Price': 100, 'Stock': 80, 'Sold': 80, 'Revenue': 120}
+        for col in columns:
+            self.inventory_tree.heading(col, text=col, command=lambda c=col: self.sort_inventory(c))
+            self.inventory_tree.column(col, width=col_widths[col], anchor='center')
+        
+        self.inventory_scrollbar = ttk.Scrollbar(inventory_frame, orient='vertical', command=self.scroll_inventory)
+        
+        self.inventory_tree.pack(side='left', fill='both', expand=True)
+        self.inventory_scrollbar.pack(side='right', fill='y')
+        
+        self.inventory_tree.bind('<Configure>', self.on_inventory_resize)
+        self.inventory_tree.bind('<MouseWheel>',
+                                 lambda e: self.scroll_inventory('scroll', -1 if e.delta > 0 else 1, 'units') or 'break')
+        self.inventory_tree.bind('<Button-4>', lambda e: self.scroll_inventory('scroll', -1, 'units') or 'break')
+        self.inventory_tree.bind('<Button-5>', lambda e: self.scroll_inventory('scroll', 1, 'units') or 'break')
+        
+        self.inventory_index = InventoryIndex(self.engine.products)
+        self.inventory_filter = ''
+        self.sort_column = 'ID'
+        self.sort_descending = False
+        self.inventory_offset = 0
+        self.inventory_total = 0
+        self.page_size = 12
+        self.inventory_rows = {}
+        self.refresh_scheduled = False
+        self.update_inventory_display()
+        
+        # Status bar, with the last save on the right
+        status_frame = tk.Frame(self.root, bd=1, relief='sunken', bg='#ecf0f1')
+        status_frame.pack(side='bottom', fill='x')
+        self.save_label = tk.Label(status_frame, text="", anchor='e', bg='#ecf0f1')
+        self.save_label.pack(side='right', padx=5)
+        self.status_bar = tk.Label(status_frame, text="Ready", anchor='w', bg='#ecf0f1')
+        self.status_bar.pack(side='left', fill='x', expand=True)
+        
+        self.update_dashboard()
+    
+    def inventory_row(self, product_id, product):
+        """Values shown for one product in the inventory treeview"""
+        revenue = product['price'] * product['total_sold']
+        return (
+            product_id,
+            product['name'],
+            f"${product['price']:.2f}",
+            product['quantity'],
+            product['total_sold'],
+            f"${revenue:.2f}"
+        )
+    
+    def update_inventory_display(self):
+        """Show the current window of the inventory, touching only rows that changed.
+        
+        Rows are keyed by product ID and only the visible page is ever
+        materialized as Treeview items.
+        """
+        total, page_ids = self.inventory_index.page(self.inventory_filter, self.sort_column,
+                                                    self.sort_descending, self.inventory_offset,
+                                                    self.page_size)
+        if self.inventory_offset and self.inventory_offset >= total:
+            self.inventory_offset = max(total - self.page_size, 0)
+            total, page_ids = self.inventory_index.page(self.inventory_filter, self.sort_column,
+                                                        self.sort_descending, self.inventory_offset,
+                                                        self.page_size)
+        self.inventory_total = total
+        
+        tree = self.inventory_tree
+        shown = self.inventory_rows
+        wanted = set(page_ids)
+        for product_id in [pid for pid in shown if pid not in wanted]:
+            tree.delete(product_id)
+            del shown[product_id]
+        
+        for position, product_id in enumerate(page_ids):
+            values = self.inventory_row(product_id, self.engine.products[product_id])
+            old_values = shown.get(product_id)
+            if old_values is None:
+                tree.insert('', position, iid=product_id, values=values)
+            else:
+                if old_values != values:
+                    tree.item(product_id, values=values)
+                if tree.index(product_id) != position:
+                    tree.move(product_id, '', position)
+            shown[product_id] = values
+        
+        if total:
+            first = self.inventory_offset / total
+            last = min(self.inventory_offset + self.page_size, total) / total
+            self.page_label.config(text=f"Rows {self.inventory_offset + 1:,}-"
+                                        f"{self.inventory_offset + len(page_ids):,} of {total:,}")
+        else:
+            first, last = 0.0, 1.0
+            self.page_label.config(text="No matching products")
+        self.inventory_scrollbar.set(first, last)
+    
+    def scroll_inventory(self, action, amount=None, unit=None):
+        """Scrollbar/mouse wheel handler that moves the visible window"""
+        if action == 'moveto':
+            offset = int(float(amount) * self.inventory_total)
+        else:
+            step = self.page_size if unit == 'pages' else 1
+            offset = self.inventory_offset + int(amount) * step
+        offset = max(0, min(offset, self.inventory_total - self.page_size))
+        if offset != self.inventory_offset:
+            self.inventory_offset = offset
+            self.update_inventory_display()
+    
+    def on_inventory_resize(self, event):
+        """Materialize as many rows as fit in the Treeview"""
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        page_size = max(1, (event.height - 25) // row_height)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.update_inventory_display()
+    
+    def set_inventory_filter(self, query):
+        self.inventory_filter = query.strip()
+        self.inventory_offset = 0
+        self.update_inventory_display()
+    
+    def sort_inventory(self, column):
+        """Sort by a column; clicking the same heading again reverses it"""
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column, self.sort_descending = column, False
+        for col in ('ID', 'Name', 'Price', 'Stock', 'Sold', 'Revenue'):
+            arrow = (' ▼' if self.sort_descending else ' ▲') if col == column else ''
+            self.inventory_tree.heading(col, text=col + arrow)
+        self.inventory_offset = 0
+        self.update_inventory_display()
+    
+    def schedule_inventory_refresh(self, product_ids=None):
+        """Update the index now and coalesce the redraw to once per frame"""
+        if product_ids is None:
+            self.inventory_index.rebuild(self.engine.products)
+        else:
+            self.inventory_index.sync(product_ids)
+        if not self.refresh_scheduled:
+            self.refresh_scheduled = True
+            self.root.after(16, self.flush_inventory_refresh)
+    
+    def flush_inventory_refresh(self):
+        """Apply the refreshes queued since the last frame"""
+        self.refresh_scheduled = False
+        self.update_inventory_display()
+        self.update_dashboard()
+        self.refresh_low_stock_panel()
+        if self.report_refresh is not None:
+            self.report_refresh()
+        if self.viz_changed is not None:
+            self.viz_changed()
+    
+    def update_dashboard(self):
+        """Update dashboard displays"""
+        self.revenue_label.config(text=f"💰 Revenue: ${self.engine.total_revenue:.2f}")
+        self.products_label.config(text=f"📦 Products: {len(self.engine.products)}")
+        self.sales_label.config(text=f"🛍️ Sales: {len(self.engine.sales_history)}")
+        low_count = len(self.engine.stock_levels.low)
+        self.low_stock_button.config(text=f"⚠️ Low Stock ({low_count:,})" if low_count else "⚠️ Low Stock")
+        
+        self.status_bar.config(text=f"Ready | Products: {self.engine.aggregates.product_count} | "
+                                   f"Stock: {self.engine.aggregates.total_stock}")
+    
+    def add_product_dialog(self):
+        """Dialog to add new product"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Add New Product")
+        dialog.geometry("400x300")
+        dialog.configure(bg='#f0f0f0')
+        dialog.grab_set()
+        
+        tk.Label(dialog, text="Add New Product", font=('Arial', 14, 'bold'), bg='#f0f0f0').pack(pady=10)
+        
+        fields = [
+            ("Product ID:", tk.StringVar()),
+            ("Product Name:", tk.StringVar()),
+            ("Price ($):", tk.StringVar()),
+            ("Initial Stock:", tk.StringVar())
+        ]
+        
+        entries = {}
+        for label_text, var in fields:
+            frame = tk.Frame(dialog, bg='#f0f0f0')
+            frame.pack(fill='x', padx=20, pady=5)
+            tk.Label(frame, text=label_text, width=15, anchor='w', bg='#f0f0f0').pack(side='left')
+            entry = tk.Entry(frame, textvariable=var, width=25)
+            entry.pack(side='right')
+            entries[label_text] = var
+        
+        def add_product():
+            try:
+                product_id = entries["Product ID:"].get().strip()
+                name = entries["Product Name:"].get().strip()
+                price = float(entries["Price ($):"].get())
+                quantity = int(entries["Initial Stock:"].get())
+                
+                if not product_id or not name:
+                    messagebox.showerror("Error", "Please fill all fields!")
+                    return
+                
+                if product_id in self.engine.products:
+                    messagebox.showerror("Error", f"Product {product_id} already exists!")
+                    return
+                
+                self.engine.add_product(product_id, name, price, quantity)
+                messagebox.showinfo("Success", f"Product '{name}' added!")
+                dialog.destroy()
+                
+            except ValueError:
+                messagebox.showerror("Error", "Invalid input!")
+        
+        button_frame = tk.Frame(dialog, bg='#f0f0f0')
+        button_frame.pack(pady=20)
+        
+        tk.Button(button_frame, text="Add", command=add_product, 
+                 bg='#3498db', fg='white', font=('Arial', 10, 'bold'), width=10).pack(side='left', padx=10)
+        tk.Button(button_frame, text="Cancel", command=dialog.destroy, 
+                 bg='#95a5a6', fg='white', font=('Arial', 10, 'bold'), width=10).pack(side='left')
+    
+    def ask_product_id(self, title):
+        """Ask for a product by ID or search words; the selected inventory row is the default"""
+        selection = self.inventory_tree.selection()
+        answer = simpledialog.askstring(title, "Enter Product ID or search words:",
+                                        initialvalue=selection[0] if selection else None)
+        if not answer or not answer.strip():
+            return None
+        answer = answer.strip()
+        if answer in self.engine.products:
+            return answer
+        
+        found = self.inventory_index.matches(answer)
+        if len(found) == 1:
+            return found[0]
+        if not found:
+            messagebox.showerror("Error", "Product not found!")
+            return None
+        self.filter_var.set(answer)
+        messagebox.showinfo(title, f"{len(found):,} products match '{answer}'.\n"
+                                   "They are listed in the inventory; select one and try again.")
+        return None
+    
+    def update_stock_dialog(self):
+        """Update product stock"""
+        if not self.engine.products:
+            messagebox.showwarning("Warning", "No products available!")
+            return
+        
+        product_id = self.ask_product_id("Update Stock")
+        if product_id is None:
+            return
+        
+        new_quantity = simpledialog.askinteger("Update Stock", 
+                                              f"Current: {self.engine.products[product_id]['quantity']}\nNew quantity:")
+        if new_quantity is not None and new_quantity >= 0:
+            self.engine.set_stock(product_id, new_quantity)
+            messagebox.showinfo("Success", "Stock updated!")
+    
+    def remove_product_dialog(self):
+        """Remove product"""
+        if not self.engine.products:
+            messagebox.showwarning("Warning", "No products!")
+            return
+        
+        product_id = self.ask_product_id("Remove Product")
+        if product_id is None:
+            return
+        
+        name = self.engine.products[product_id]['name']
+        if messagebox.askyesno("Confirm", f"Remove '{name}'?"):
+            self.engine.remove_product(product_id)
+            messagebox.showinfo("Success", f"'{name}' removed!")
+    
+    def process_order_dialog(self):
+        """Process customer order"""
+        if not self.engine.products:
+            messagebox.showwarning("Warning", "No products!")
+            return
+        
+        product_id = self.ask_product_id("Process Order")
+        if product_id is None:
+            return
+        
+        product = self.engine.products[product_id]
+        quantity = simpledialog.askinteger("Process Order", 
+                                          f"Product: {product['name']}\nPrice: ${product['price']:.2f}\n"
+                                          f"Available: {product['quantity']}\n\nQuantity:")
+        
+        if quantity is None or quantity <= 0:
+            return
+        
+        # Stock is checked again under the product's lock; other threads may be selling it too
+        try:
+            sale_record = self.engine.record_sale(product_id, quantity)
+        except ValueError as error:
+            messagebox.showerror("Error", f"{error}!")
+            return
+        except (OSError, sqlite3.Error):
+            messagebox.showwarning("Warning", "Sale recorded, but could not be written to storage.")
+            sale_record = {'total_amount': product['price'] * quantity}
+        
+        messagebox.showinfo("Success", 
+                           f"Product: {product['name']}\n"
+                           f"Quantity: {quantity}\n"
+                           f"Total: ${sale_record['total_amount']:.2f}\n"
+                           f"Remaining: {product['quantity']}")
+    
+    def show_sales_report(self):
+        """Sales report filtered by date range and product, paged through a time index.
+        
+        The summary comes from the index's prefix sums and only the rows on
+        screen are fetched, so the window costs the same for a day of sales
+        or the whole history. While new sales arrive the index is extended
+        with them, at most once a second.
+        """
+        if not self.engine.sales_history:
+            messagebox.showinfo("Sales Report", "No sales yet!")
+            return
+        if self.report_window is not None and self.report_window.winfo_exists():
+            self.report_window.deiconify()
+            self.report_window.lift()
+            return
+        
+        report_window = tk.Toplevel(self.root)
+        report_window.title("📊 Sales Report")
+        report_window.geometry("760x600")
+        report_window.configure(bg='#f0f0f0')
+        self.report_window = report_window
+        
+        header = tk.Frame(report_window, bg='#34495e')
+        header.pack(fill='x', padx=5, pady=5)
+        tk.Label(header, text="📊 SALES REPORT",
+                font=('Arial', 14, 'bold'), fg='white', bg='#34495e').pack(pady=10)
+        
+        # Date range and product filters
+        filters = tk.Frame(report_window, bg='#f0f0f0')
+        filters.pack(fill='x', padx=10, pady=5)
+        start_var = tk.StringVar()
+        end_var = tk.StringVar()
+        product_var = tk.StringVar()
+        tk.Label(filters, text="From:", bg='#f0f0f0').pack(side='left')
+        tk.Entry(filters, textvariable=start_var, width=11).pack(side='left', padx=(2, 8))
+        tk.Label(filters, text="To:", bg='#f0f0f0').pack(side='left')
+        tk.Entry(filters, textvariable=end_var, width=11).pack(side='left', padx=(2, 8))
+        tk.Label(filters, text="Product:", bg='#f0f0f0').pack(side='left')
+        tk.Entry(filters, textvariable=product_var, width=16).pack(side='left', padx=2)
+        
+        presets = tk.Frame(report_window, bg='#f0f0f0')
+        presets.pack(fill='x', padx=10)
+        filter_status = tk.Label(presets, text="", fg='#c0392b', bg='#f0f0f0')
+        filter_status.pack(side='right')
+        
+        summary = tk.Frame(report_window, bg='#f0f0f0')
+        summary.pack(fill='x', padx=10, pady=10)
+        summary_labels = {}
+        for key, font, color in (('transactions', ('Arial', 11), 'black'),
+                                 ('revenue', ('Arial', 11, 'bold'), '#27ae60'),
+                                 ('items', ('Arial', 11), 'black'),
+                                 ('average', ('Arial', 11), 'black')):
+            summary_labels[key] = tk.Label(summary, text="", font=font, fg=color, bg='#f0f0f0')
+            summary_labels[key].pack(anchor='w')
+        
+        paging = tk.Frame(report_window, bg='#f0f0f0')
+        paging.pack(fill='x', padx=10)
+        page_label = tk.Label(paging, text="", bg='#f0f0f0')
+        
+        list_frame = tk.Frame(report_window)
+        list_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        
+        columns = ('Date', 'Product', 'Qty', 'Amount')
+        sales_tree = ttk.Treeview(list_frame, columns=columns, show='headings')
+        
+        for col, width in zip(columns, [150, 200, 80, 100]):
+            sales_tree.heading(col, text=col)
+            sales_tree.column(col, width=width, anchor='center' if col in ['Qty', 'Amount'] else 'w')
+        
+        sales_tree.pack(fill='both', expand=True)
+        
+        # Everything the window shows is derived from this state
+        state = {'index': None, 'version': None, 'built': 0.0, 'range': (None, None, None),
+                 'total': 0, 'offset': 0, 'page_size': 20, 'pending': False}
+        
+        def day_start(text):
+            return calendar.timegm(time.strptime(text, "%Y-%m-%d"))
+        
+        def rebuild_index():
+            state['index'] = self.engine.sales_history.snapshot().time_index(state['index'])
+            state['version'] = self.engine.data_version
+            state['built'] = time.monotonic()
+        
+        def read_filters():
+            """Turn the filter boxes into (start, end, product_id), or None with a message"""
+            try:
+                start = day_start(start_var.get().strip()) if start_var.get().strip() else None
+                end = day_start(end_var.get().strip()) + 86400 if end_var.get().strip() else None
+            except ValueError:
+                filter_status.config(text="Dates are YYYY-MM-DD")
+                return None
+            product_id = product_var.get().strip() or None
+            # Products removed from the catalog can still be reported on by exact ID
+            if (product_id is not None and product_id not in self.engine.products
+                    and not state['index'].has_product(product_id)):
+                found = self.inventory_index.matches(product_id)
+                if len(found) != 1:
+                    filter_status.config(text=f"{len(found):,} products match '{product_id}'" if found
+                                         else "Product not found")
+                    return None
+                product_id = found[0]
+            product = self.engine.products.get(product_id)
+            filter_status.config(text=f"{product_id}: {product['name']}" if product is not None else "")
+            return start, end, product_id
+        
+        def show_page():
+            start, end, product_id = state['range']
+            index = state['index']
+            rows = index.page(start, end, product_id, state['offset'], state['page_size'])
+            sales_tree.delete(*sales_tree.get_children())
+            for sale in rows:
+                sales_tree.insert('', 'end', values=(
+                    sale['date'],
+                    sale['product_name'],
+                    sale['quantity'],
+                    f"${sale['total_amount']:.2f}"
+                ))
+            if state['total']:
+                page_label.config(text=f"Rows {state['offset'] + 1:,}-{state['offset'] + len(rows):,} "
+                                       f"of {state['total']:,} (newest first)")
+            else:
+                page_label.config(text="No sales in this range")
+        
+        def apply_filters(*args):
+            filters_read = read_filters()
+            if filters_read is None:
+                return
+            if state['index'] is None:
+                rebuild_index()
+            if filters_read != state['range']:
+                state['range'] = filters_read
+                state['offset'] = 0
+            transactions, revenue, items = state['index'].summary(*state['range'])
+            state['total'] = transactions
+            state['offset'] = min(state['offset'], max(transactions - 1, 0) // state['page_size'] * state['page_size'])
+            summary_labels['transactions'].config(text=f"Transactions: {transactions:,}")
+            summary_labels['revenue'].config(text=f"Revenue: ${revenue:,.2f}")
+            summary_labels['items'].config(text=f"Items Sold: {items:,}")
+            summary_labels['average'].config(text=f"Avg Sale: ${revenue / transactions:,.2f}" if transactions
+                                             else "Avg Sale: -")
+            show_page()
+        
+        def move(pages):
+            offset = state['offset'] + pages * state['page_size']
+            if 0 <= offset < state['total']:
+                state['offset'] = offset
+                show_page()
+        
+        def preset(days):
+            span = state['index'].time_span()
+            if days is None:
+                start_var.set(time.strftime("%Y-%m-%d", time.gmtime(span[0])))
+            else:
+                start_var.set(time.strftime("%Y-%m-%d", time.gmtime(span[1] - (days - 1) * 86400)))
+            end_var.set(time.strftime("%Y-%m-%d", time.gmtime(span[1])))
+        
+        def sales_changed():
+            """Called from the inventory refresh; update the index at most once a second"""
+            if state['version'] == self.engine.data_version or state['pending']:
+                return
+            delay = max(0, int((state['built'] + 1.0 - time.monotonic()) * 1000))
+            state['pending'] = True
+            
+            def refresh():
+                state['pending'] = False
+                if self.report_window is report_window:
+                    rebuild_index()
+                    apply_filters()
+            
+            report_window.after(delay, refresh)
+        
+        def resize(event):
+            row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+            page_size = max(1, (event.height - 25) // row_height)
+            if page_size != state['page_size']:
+                state['page_size'] = page_size
+                state['offset'] -= state['offset'] % page_size
+                show_page()
+        
+        for text, days in (("Last 7 days", 7), ("Last 30 days", 30), ("All", None)):
+            tk.Button(presets, text=text, command=lambda d=days: preset(d)).pack(side='left', padx=2, pady=2)
+        tk.Button(paging, text="▶", width=3, command=lambda: move(1)).pack(side='right')
+        tk.Button(paging, text="◀", width=3, command=lambda: move(-1)).pack(side='right')
+        page_label.pack(side='right', padx=5)
+        sales_tree.bind('<Configure>', resize)
+        sales_tree.bind('<MouseWheel>', lambda e: move(-1 if e.delta > 0 else 1) or 'break')
+        sales_tree.bind('<Button-4>', lambda e: move(-1) or 'break')
+        sales_tree.bind('<Button-5>', lambda e: move(1) or 'break')
+        
+        def close():
+            self.report_window = None
+            self.report_refresh = None
+            report_window.destroy()
+        
+        report_window.protocol("WM_DELETE_WINDOW", close)
+        self.report_refresh = sales_changed
+        rebuild_index()
+        preset(None)
+        for var in (start_var, end_var, product_var):
+            var.trace_add('write', apply_filters)
+        apply_filters()
+    
+    def check_low_stock(self):
+        """Open the low-stock panel: products at or below their reorder point or a threshold, and live alerts"""
+        if self.alert_window is not None and self.alert_window.winfo_exists():
+            self.alert_window.deiconify()
+            self.alert_window.lift()
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("⚠️ Low Stock")
+        window.geometry("700x600")
+        window.configure(bg='#f0f0f0')
+        self.alert_window = window
+        
+        header = tk.Frame(window, bg='#e67e22')
+        header.pack(fill='x', padx=5, pady=5)
+        tk.Label(header, text="⚠️ LOW STOCK",
+                font=('Arial', 14, 'bold'), fg='white', bg='#e67e22').pack(pady=10)
+        
+        controls = tk.Frame(window, bg='#f0f0f0')
+        controls.pack(fill='x', padx=10, pady=5)
+        self.alert_mode = tk.StringVar(value='reorder')
+        self.alert_threshold = tk.StringVar(value='5')
+        tk.Radiobutton(controls, text="At or below reorder point", variable=self.alert_mode, value='reorder',
+                       command=self.refresh_low_stock_panel, bg='#f0f0f0').pack(side='left')
+        tk.Radiobutton(controls, text="Stock at or below", variable=self.alert_mode, value='threshold',
+                       command=self.refresh_low_stock_panel, bg='#f0f0f0').pack(side='left')
+        tk.Spinbox(controls, from_=0, to=10**9, width=8, textvariable=self.alert_threshold,
+                   command=self.refresh_low_stock_panel).pack(side='left', padx=5)
+        self.alert_threshold.trace_add('write', lambda *args: self.refresh_low_stock_panel())
+        self.alert_count_label = tk.Label(controls, text="", bg='#f0f0f0')
+        self.alert_count_label.pack(side='right')
+        
+        list_frame = tk.Frame(window)
+        list_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        columns = ('ID', 'Name', 'Stock', 'Reorder at')
+        self.alert_tree = ttk.Treeview(list_frame, columns=columns, show='headings')
+        for col, width in zip(columns, [100, 250, 80, 100]):
+            self.alert_tree.heading(col, text=col)
+            self.alert_tree.column(col, width=width, anchor='w' if col == 'Name' else 'center')
+        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.alert_tree.yview)
+        self.alert_tree.configure(yscrollcommand=scrollbar.set)
+        self.alert_tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        self.alert_rows = {}
+        
+        tk.Button(window, text="Set reorder point...", command=self.set_reorder_point_dialog,
+                 bg='#e67e22', fg='white', font=('Arial', 10, 'bold')).pack(pady=5)
+        
+        # Alerts pushed by the engine as orders take products to their reorder point
+        alerts_frame = tk.LabelFrame(window, text="🔔 Live alerts", font=('Arial', 11, 'bold'), bg='#f0f0f0')
+        alerts_frame.pack(fill='both', padx=10, pady=5)
+        self.alert_list = tk.Listbox(alerts_frame, height=8)
+        alert_scrollbar = ttk.Scrollbar(alerts_frame, orient='vertical', command=self.alert_list.yview)
+        self.alert_list.configure(yscrollcommand=alert_scrollbar.set)
+        self.alert_list.pack(side='left', fill='both', expand=True)
+        alert_scrollbar.pack(side='right', fill='y')
+        self.alert_list.insert('end', *self.low_stock_alerts)
+        
+        def close():
+            self.alert_window = None
+            self.alert_list = None
+            window.destroy()
+        
+        window.protocol("WM_DELETE_WINDOW", close)
+        self.refresh_low_stock_panel()
+    
+    def refresh_low_stock_panel(self):
+        """Show the current range query in the low-stock panel, touching only rows that changed"""
+        if self.alert_window is None:
+            return
+        if self.alert_mode.get() == 'reorder':
+            count, product_ids = self.engine.low_stock(limit=self.LOW_STOCK_ROWS)
+        else:
+            try:
+                threshold = int(self.alert_threshold.get())
+            except ValueError:
+                return
+            count, product_ids = self.engine.low_stock(threshold, self.LOW_STOCK_ROWS)
+        
+        tree = self.alert_tree
+        shown = self.alert_rows
+        wanted = set(product_ids)
+        for product_id in [pid for pid in shown if pid not in wanted]:
+            tree.delete(product_id)
+            del shown[product_id]
+        for position, product_id in enumerate(product_ids):
+            product = self.engine.products[product_id]
+            values = (product_id, product['name'], product['quantity'],
+                      self.engine.stock_levels.reorder_point(product))
+            if product_id not in shown:
+                tree.insert('', position, iid=product_id, values=values)
+            else:
+                if shown[product_id] != values:
+                    tree.item(product_id, values=values)
+                if tree.index(product_id) != position:
+                    tree.move(product_id, '', position)
+            shown[product_id] = values
+        
+        if count > len(product_ids):
+            self.alert_count_label.config(text=f"{count:,} products (lowest {len(product_ids):,} shown)")
+        else:
+            self.alert_count_label.config(text=f"{count:,} products" if count else "✅ All products have sufficient stock!")
+    
+    def set_reorder_point_dialog(self):
+        selection = self.alert_tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Select a product first!", parent=self.alert_window)
+            return
+        product_id = selection[0]
+        product = self.engine.products.get(product_id)
+        if product is None:
+            return
+        reorder_point = simpledialog.askinteger("Reorder Point",
+                                                f"{product['name']}\nStock: {product['quantity']}\n\n"
+                                                "Alert when stock falls to:",
+                                                initialvalue=self.engine.stock_levels.reorder_point(product),
+                                                minvalue=0, parent=self.alert_window)
+        if reorder_point is not None:
+            self.engine.set_reorder_point(product_id, reorder_point)
+    
+    def add_low_stock_alerts(self, product_ids):
+        """Log products that just reached their reorder point"""
+        now = datetime.now().strftime("%H:%M:%S")
+        for product_id in sorted(product_ids):
+            product = self.engine.products.get(product_id)
+            if product is None:
+                continue
+            message = (f"{now}  {product_id}: {product['name']} down to {product['quantity']} "
+                       f"(reorder at {self.engine.stock_levels.reorder_point(product)})")
+            self.low_stock_alerts.appendleft(message)
+            if self.alert_list is not None:
+                self.alert_list.insert(0, message)
+                self.alert_list.delete(self.low_stock_alerts.maxlen, 'end')
+            self.status_bar.config(text=f"⚠️ Low stock: {message[len(now) + 2:]}")
+    
+    def show_visualizations(self):
+        """Show the analytics dashboard, building it on first use and re-showing it after that."""
+        if not self.engine.products and not self.engine.sales_history:
+            messagebox.showinfo("Analytics", "No data available!")
+            return
+        
+        if self.viz_window is not None:
+            self.viz_window.deiconify()
+            self.viz_window.lift()
+            self.viz_refresh()
+            return
+        
+        viz_window = tk.Toplevel(self.root)
+        viz_window.title("📈 Business Analytics Dashboard")
+        viz_window.geometry("1400x900")
+        viz_window.configure(bg='#f0f0f0')
+        self.viz_window = viz_window
+        
+        header = tk.Frame(viz_window, bg='#2c3e50', height=50)
+        header.pack(fill='x')
+        header.pack_propagate(False)
+        tk.Label(header, text="📈 BUSINESS ANALYTICS DASHBOARD", 
+                font=('Arial', 16, 'bold'), fg='white', bg='#2c3e50').pack(expand=True)
+        
+        notebook = ttk.Notebook(viz_window)
+        notebook.pack(fill='both', expand=True, padx=10, pady=10)
+        progress = ttk.Progressbar(viz_window, mode='indeterminate')
+        
+        pages = {}
+        tab_keys = {}
+        for key, title, builder, updater, empty_text, events in ANALYTICS_PAGES:
+            tab = tk.Frame(notebook, bg='white')
+            notebook.add(tab, text=title)
+            tab_keys[str(tab)] = key
+            pages[key] = {'tab': tab, 'builder': builder, 'updater': updater, 'empty_text': empty_text,
+                          'events': events, 'dirty': True, 'fig': None, 'canvas': None,
+                          'lock': threading.Lock()}
+        
+        snapshot = {'version': None, 'data': None}
+        # Products changed since the last snapshot, or None when anything may have changed
+        changes = {'products': set(), 'lock': threading.Lock()}
+        live = {'finished': 0.0, 'timer': None, 'subscribed': True, 'hidden_version': None}
+        cancelled = threading.Event()
+        results = queue.Queue()
+        pending = {}
+        
+        def on_change(event, product_ids):
+            """Engine listener, on whichever thread made the change: note what is now stale"""
+            if event in StoreEngine.ALERT_EVENTS:
+                return
+            with changes['lock']:
+                if product_ids is None:
+                    changes['products'] = None
+                elif changes['products'] is not None:
+                    changes['products'].update(product_ids)
+            for page in pages.values():
+                if event in page['events']:
+                    page['dirty'] = True
+        
+        def take_snapshot():
+            version = self.engine.data_version
+            if snapshot['version'] != version:
+                with changes['lock']:
+                    changed, changes['products'] = changes['products'], set()
+                snapshot['version'], snapshot['data'] = version, self.analytics_snapshot(snapshot['data'], changed)
+            return snapshot['data']
+        
+        def release(page):
+            """Drop a page's figure and canvas so nothing keeps them alive"""
+            if page['canvas'] is not None:
+                page['canvas'].get_tk_widget().destroy()
+            if page['fig'] is not None:
+                with page['lock']:
+                    page['fig'].clear()
+            page['fig'] = page['canvas'] = None
+        
+        def show_message(page, text):
+            release(page)
+            for child in page['tab'].winfo_children():
+                child.destroy()
+            tk.Label(page['tab'], text=text, font=('Arial', 14), bg='white').pack(expand=True)
+        
+        def show(key, fig):
+            page = pages[key]
+            if fig is None:
+                show_message(page, page['empty_text'])
+            elif page['canvas'] is None:
+                for child in page['tab'].winfo_children():
+                    child.destroy()
+                canvas = FigureCanvasTkAgg(fig, page['tab'])
+                
+                def locked_draw():
+                    # Resizes redraw on the Tk thread; keep them out of a worker's update
+                    with page['lock']:
+                        draw_analytics_figure(fig, redraw=True)
+                        canvas.blit()
+                
+                canvas.draw = locked_draw
+                canvas.draw()
+                canvas.get_tk_widget().pack(fill='both', expand=True)
+                page['fig'], page['canvas'] = fig, canvas
+            else:
+                with page['lock']:
+                    page['canvas'].blit()
+        
+        def render(key):
+            """Bring the page up to date with the current data on a worker"""
+            page = pages[key]
+            if not page['dirty'] or key in pending or viz_window.state() in ('withdrawn', 'iconic'):
+                return
+            
+            # Cleared before the snapshot, so changes made from here on mark it again
+            page['dirty'] = False
+            data = take_snapshot()
+            if page['canvas'] is None:
+                show_message(page, "⏳ Rendering...")
+            future = self.analytics_pool().submit(refresh_analytics_page, page['builder'], page['updater'],
+                                                  page['fig'], page['lock'], data, cancelled)
+            future.add_done_callback(lambda f: results.put((key, f)))
+            pending[key] = future
+            if len(pending) == 1:
+                progress.pack(fill='x', padx=10, before=notebook)
+                progress.start(10)
+                viz_window.after(50, poll)
+        
+        def poll():
+            """Show finished pages on the Tk thread"""
+            if cancelled.is_set():
+                return
+            while True:
+                try:
+                    key, future = results.get_nowait()
+                except queue.Empty:
+                    break
+                del pending[key]
+                try:
+                    fig = future.result()
+                except Exception as error:
+                    show_message(pages[key], f"Could not build chart: {error}")
+                    continue
+                show(key, fig)
+            
+            if pending:
+                viz_window.after(50, poll)
+            else:
+                progress.stop()
+                progress.pack_forget()
+                live['finished'] = time.monotonic()
+                # The data may have changed while this page was rendering
+                store_changed()
+        
+        def store_changed():
+            """Called from the inventory refresh; refresh the open page at most once per interval"""
+            if live['timer'] is not None or pending or viz_window.state() in ('withdrawn', 'iconic'):
+                return
+            delay = max(0, int((live['finished'] + self.dashboard_interval - time.monotonic()) * 1000))
+            
+            def refresh():
+                live['timer'] = None
+                if not cancelled.is_set():
+                    render(tab_keys[notebook.select()])
+            
+            live['timer'] = viz_window.after(delay, refresh)
+        
+        def stop_following():
+            if live['subscribed']:
+                self.engine.unsubscribe(on_change)
+                live['subscribed'] = False
+            if live['timer'] is not None:
+                viz_window.after_cancel(live['timer'])
+                live['timer'] = None
+        
+        def hide():
+            """Close button: keep the figures for the next open but stop following the store.
+            
+            Renders already on a worker still finish; poll() then stops by itself.
+            """
+            # Read before unsubscribing, so a change in between is seen one way or the other
+            live['hidden_version'] = self.engine.data_version
+            viz_window.withdraw()
+            stop_following()
+        
+        def resume():
+            """Show the current page, first catching up on anything missed while hidden"""
+            if not live['subscribed']:
+                self.engine.subscribe(on_change)
+                live['subscribed'] = True
+                if live['hidden_version'] != self.engine.data_version:
+                    with changes['lock']:
+                        changes['products'] = None
+                    for page in pages.values():
+                        page['dirty'] = True
+            render(tab_keys[notebook.select()])
+        
+        def destroy():
+            """Release every figure and canvas; used when the app exits"""
+            cancelled.set()
+            stop_following()
+            for future in pending.values():
+                future.cancel()
+            for page in pages.values():
+                release(page)
+            self.viz_window = self.viz_refresh = self.viz_changed = self.viz_destroy = None
+            viz_window.destroy()
+        
+        notebook.bind('<<NotebookTabChanged>>', lambda e: render(tab_keys[notebook.select()]))
+        # Coming back from minimized shows whatever changed in the meantime
+        viz_window.bind('<Map>', lambda e: e.widget is viz_window and self.viz_refresh())
+        viz_window.protocol("WM_DELETE_WINDOW", hide)
+        self.engine.subscribe(on_change)
+        self.viz_refresh = resume
+        self.viz_changed = store_changed
+        self.viz_destroy = destroy
+        viz_window.after_idle(self.viz_refresh)
+    
+    def analytics_snapshot(self, previous=None, changed=None):
+        """Copy what the chart builders read, so workers never touch live state.
+        
+        Given the previous snapshot and the set of products changed since it,
+        only those products are copied again and the rest are shared with
+        previous; 'changed' tells the analytics which rows to patch.
+        """
+        if previous is None or changed is None:
+            products = {pid: dict(p) for pid, p in self.engine.products.items()}
+            since = changed = None
+        else:
+            products = dict(previous['products'])
+            for product_id in changed:
+                product = self.engine.products.get(product_id)
+                if product is None:
+                    products.pop(product_id, None)
+                else:
+                    products[product_id] = dict(product)
+            since, changed = previous['version'], frozenset(changed)
+        return analytics_data(self.engine, products, self.analytics_cache, self.chart_budgets, since, changed)
+    
+    def analytics_pool(self):
+        """Worker threads shared by every analytics window"""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=len(ANALYTICS_PAGES),
+                                               thread_name_prefix='analytics')
+        return self.executor
+    
+    def start_order_intake(self, port):
+        """Take HTTP orders on a background event loop while the window is open"""
+        server = OrderIntakeServer(self.engine, port=port)
+        try:
+            server.start_in_thread()
+        except OSError as error:
+            messagebox.showwarning("Warning", f"Could not take orders on port {port}:\n{error}")
+            return
+        self.order_server = server
+        print(f"🛒 Taking orders on http://{server.host}:{server.port}/orders (metrics at /metrics)")
+    
+    def on_closing(self):
+        """Handle window closing"""
+        if self.order_server is not None:
+            self.order_server.stop_in_thread()
+        if (not self.engine.loading and self.autosaver.dirty()
+                and messagebox.askokcancel("Quit", "Save data before quitting?")):
+            try:
+                self.autosaver.flush()
+            except Exception:
+                messagebox.showerror("Error", "Error saving data.")
+        self.autosaver.close()
+        if self.viz_destroy is not None:
+            self.viz_destroy()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        self.engine.unsubscribe(self.on_store_changed)
+        self.engine.close()
+        self.root.destroy()
+    
+    def run(self):
+        """Start the application"""
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.mainloop()
+
+# Analytics figure builders. These run on worker threads: they only read the
+# snapshot they are given and never touch Tk.
+
+def analytics_data(engine, products=None, cache=None, budgets=None, since=None, changed=None):
+    """The snapshot the builders read: engine's state copied, plus the cache and chart budgets"""
+    if products is None:
+        products = {pid: dict(p) for pid, p in engine.products.items()}
+    return {
+        'version': engine.data_version,
+        'since': since,
+        'changed': changed,
+        'cache': cache,
+        'products': products,
+        'sales': engine.sales_history.snapshot(),
+        'rollups': engine.rollups.snapshot(),
+        'total_revenue': engine.total_revenue,
+        'aggregates': {field: getattr(engine.aggregates, field) for field in StoreAggregates.FIELDS},
+        'budgets': CHART_BUDGETS if budgets is None else budgets
+    }
+
+# Shared analytics intermediates. Pages fetch these through analytics_result()
+# so each is computed once per data version and reused across tabs.
+
+def compute_product_frame(data):
+    """One row per product with the derived value, revenue and turnover.
+    
+    When the snapshot lists the products changed since an earlier version
+    whose frame is still cached, only those rows are rebuilt.
+    """
+    cache, changed = data.get('cache'), data.get('changed')
+    if cache is not None and changed is not None:
+        previous = cache.latest('product_frame')
+        if previous is not None and previous[0] == data['since']:
+            frame = patch_product_frame(previous[1], data['products'], changed)
+            if frame is not None:
+                return frame
+    return product_rows(data['products'])
+
+
+def product_rows(products):
+    return pd.DataFrame([
+        {
+            'id': pid,
+            'name': p['name'],
+            'price': p['price'],
+            'quantity': p['quantity'],
+            'sold': p['total_sold'],
+            'value': p['price'] * p['quantity'],
+            'revenue': p['price'] * p['total_sold'],
+            'turnover': p['total_sold'] / (p['total_sold'] + p['quantity']) * 100 if (p['total_sold'] + p['quantity']) > 0 else 0
+        }
+        for pid, p in products.items()
+    ])
+
+
+def patch_product_frame(frame, products, product_ids):
+    """A copy of frame with the rows of product_ids rebuilt, or None if the catalog changed shape"""
+    if len(frame) != len(products) or any(pid not in products for pid in product_ids):
+        return None
+    if not product_ids:
+        return frame
+    rows = product_rows({pid: products[pid] for pid in product_ids})
+    positions = pd.Index(frame['id']).get_indexer(rows['id'])
+    if (positions < 0).any():
+        return None
+    frame = frame.copy()
+    rows.index = frame.index[positions]
+    frame.loc[rows.index, rows.columns] = rows
+    return frame
+
+
+def compute_daily_totals(data):
+    """Per-day revenue and units, read from the rollups in O(days)"""
+    return pd.DataFrame(data['rollups'].daily_totals(),
+                        columns=['day', 'revenue', 'quantity']).set_index('day')
+
+
+def compute_product_totals(data):
+    return pd.DataFrame(data['rollups'].product_totals(),
+                        columns=['product_name', 'quantity', 'revenue']).set_index('product_name')
+
+
+def compute_price_bins(data):
+    """Units sold per price range, over five equal-width bins"""
+    product_frame = analytics_result(data, 'product_frame')
+    price_bins = pd.cut(product_frame['price'], bins=5)
+    return product_frame.groupby(price_bins, observed=False)['sold'].sum()
+
+
+ANALYTICS_RESULTS = {
+    'product_frame': compute_product_frame,
+    'daily_totals': compute_daily_totals,
+    'product_totals': compute_product_totals,
+    'price_bins': compute_price_bins
+}
+
+
+def analytics_result(data, name):
+    """Fetch a shared intermediate for this snapshot, computing it at most once"""
+    cache = data.get('cache')
+    if cache is None:
+        return ANALYTICS_RESULTS[name](data)
+    return cache.get(name, data['version'], lambda: ANALYTICS_RESULTS[name](data))
+
+
+# Level of detail. Each chart draws at most this many points, bars, wedges or
+# tick labels: long histories are downsampled and big catalogs grouped, so a
+# page costs the same to draw at ten thousand days or SKUs as at fifty.
+CHART_BUDGETS = {
+    'revenue_trend': 500,   # points on the sales revenue line (LTTB)
+    'revenue_daily': 500,   # points on the financial revenue lines (min-max)
+    'daily_volume': 120,    # bars on the daily units chart; longer runs of days are averaged
+    'markers': 60,          # lines with more points than this are drawn without markers
+    'product_bars': 30,     # bars per product chart; the rest are grouped into "Other"
+    'product_pie': 12,      # wedges in the inventory value pie, "Other" included
+    'ticks': 30             # tick labels per category or day axis
+}
+
+
+def chart_budget(data, chart):
+    """Most points, bars or labels the given chart may draw for this snapshot"""
+    return data.get('budgets', CHART_BUDGETS)[chart]
+
+
+def parse_chart_budgets(items):
+    """Turn CHART=N strings into a budgets dict, checking the names and numbers"""
+    budgets = {}
+    for item in items:
+        chart, _, value = item.partition('=')
+        if chart not in CHART_BUDGETS:
+            raise ValueError(f"Unknown chart '{chart}' (expected one of: {', '.join(CHART_BUDGETS)})")
+        try:
+            budgets[chart] = int(value)
+        except ValueError:
+            raise ValueError(f"Chart budget for '{chart}' must be a whole number, not '{value}'") from None
+        if budgets[chart] < 1:
+            raise ValueError(f"Chart budget for '{chart}' must be at least 1")
+    return budgets
+
+
+def lttb_indices(values, budget):
+    """Positions of about budget points that keep a line's shape (Largest-Triangle-Three-Buckets).
+    
+    The first and last points are always kept. Every bucket of points in
+    between contributes the one forming the largest triangle with the point
+    kept before it and the mean of the next bucket.
+    """
+    count = len(values)
+    if count <= budget or budget < 3:
+        return np.arange(count)
+    values = np.asarray(values, dtype=float)
+    edges = np.linspace(1, count - 1, budget - 1).astype(int)
+    kept = [0]
+    for i in range(budget - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else count
+        mean_x = (end + next_end - 1) / 2
+        mean_y = values[end:next_end].mean()
+        a = kept[-1]
+        x = np.arange(start, end)
+        area = np.abs((a - mean_x) * (values[start:end] - values[a]) - (a - x) * (mean_y - values[a]))
+        kept.append(start + int(area.argmax()))
+    kept.append(count - 1)
+    return np.array(kept)
+
+
+def minmax_indices(values, budget):
+    """Positions of the lowest and highest point in each of budget / 2 buckets, so spikes survive"""
+    count = len(values)
+    if count <= budget or budget < 4:
+        return np.arange(count)
+    values = np.asarray(values, dtype=float)
+    edges = np.linspace(0, count, budget // 2 + 1).astype(int)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        kept.extend((start + values[start:end].argmin(), start + values[start:end].argmax()))
+    return np.unique(kept)
+
+
+def bucket_means(values, budget):
+    """Average values over at most budget runs of neighbours.
+    
+    Returns the centre, bar width and mean of each run, in the units of the
+    original positions, so a run of one keeps its usual 0.8-wide bar.
+    """
+    count = len(values)
+    edges = np.linspace(0, count, min(count, budget) + 1).astype(int)
+    sizes = np.diff(edges)
+    means = np.add.reduceat(np.asarray(values, dtype=float), edges[:-1]) / sizes if count else np.array([])
+    return edges[:-1] + (sizes - 1) / 2, sizes * 0.8, means
+
+
+def group_products(frame, column, budget, average=False):
+    """The products ranked highest by column, with the rest summed into one "Other" row.
+    
+    Catalogs within budget come back unchanged. The "Other" row has no id,
+    its mean price, and a turnover pooled over the products it stands for.
+    Charts comparing products one by one pass average=True to get an
+    "Avg of N" row of per-product means instead of totals that would dwarf
+    every other bar.
+    """
+    if len(frame) <= budget:
+        return frame
+    ranked = frame.sort_values(column, ascending=False)
+    rest = ranked.iloc[budget - 1:]
+    sold, quantity = rest['sold'].sum(), rest['quantity'].sum()
+    combine = 'mean' if average else 'sum'
+    other = pd.DataFrame([{
+        'id': None,
+        'name': f'Avg of {len(rest)}' if average else f'Other ({len(rest)})',
+        'price': rest['price'].mean(),
+        'quantity': rest['quantity'].agg(combine),
+        'sold': rest['sold'].agg(combine),
+        'value': rest['value'].agg(combine),
+        'revenue': rest['revenue'].agg(combine),
+        'turnover': sold / (sold + quantity) * 100 if (sold + quantity) > 0 else 0
+    }])
+    return pd.concat([ranked.iloc[:budget - 1], other], ignore_index=True)
+
+
+def thin_ticks(axis, labels, budget, **kwargs):
+    """Label at most budget evenly spaced positions of a category or day axis"""
+    step = -(-len(labels) // budget) if labels else 1
+    positions = np.arange(0, len(labels), step)
+    if list(axis.get_ticklocs()) != list(positions):
+        axis.set_ticks(positions)
+    set_tick_labels(axis, [labels[i] for i in positions], **kwargs)
+
+
+def analytics_figure(fig=None):
+    """A blank page figure: a new one, or fig cleared so a page can be rebuilt into it"""
+    if fig is None:
+        return Figure(figsize=(14, 8), facecolor='white', dpi=100)
+    fig.clear()
+    return fig
+
+
+def analytics_handles(fig, layout):
+    """The artists a builder kept on fig, or None if they were laid out for other data.
+    
+    Builders record the artists they create, plus a layout key describing
+    what the axes were laid out for (the products, the days). An updater can
+    only move those artists while the key still matches; anything else needs
+    a rebuild.
+    """
+    handles = getattr(fig, 'analytics_handles', None)
+    if handles is None or handles['layout'] != layout:
+        return None
+    return handles
+
+
+def set_bar_heights(bars, heights, labels=None, fmt='{:.0f}'):
+    """Move bars, and the value labels sitting on top of them, to new heights"""
+    for i, (bar, height) in enumerate(zip(bars, heights)):
+        bar.set_height(height)
+        if labels is not None:
+            labels[i].set_y(height)
+            labels[i].set_text(fmt.format(height))
+
+
+def fit_axes(ax, points=None):
+    """Fit ax to its data again, keeping the current view while the data still fits it.
+    
+    The limits only move when the data leaves the view or shrinks to under
+    half of it, and then with 20% headroom, so most refreshes leave the
+    ticks alone and can reuse the page's static background.
+    """
+    old = (ax.get_xlim(), ax.get_ylim())
+    ax.relim()
+    if points is not None:
+        ax.update_datalim(points)
+    ax.autoscale_view()
+    fitted = (ax.get_xlim(), ax.get_ylim())
+    data = (ax.dataLim.intervalx, ax.dataLim.intervaly)
+    for (old_low, old_high), (low, high), (fit_low, fit_high), set_limits in zip(old, data, fitted,
+                                                                                (ax.set_xlim, ax.set_ylim)):
+        if old_low <= low and high <= old_high and high - low >= (old_high - old_low) / 2:
+            set_limits(old_low, old_high, auto=None)
+        elif high > old_high:
+            set_limits(fit_low, fit_high + (fit_high - fit_low) * 0.2, auto=None)
+
+
+def rescale_axes(*axes):
+    for ax in axes:
+        fit_axes(ax)
+
+
+def set_tick_labels(axis, labels, **kwargs):
+    """Relabel fixed ticks, leaving the axis (and the page background) alone if nothing changed"""
+    if [label.get_text() for label in axis.get_ticklabels()] != list(labels):
+        axis.set_ticklabels(labels, **kwargs)
+
+
+def stock_colors(frame):
+    """Green / amber / red by stock level, and grey for a grouped "Other" bar"""
+    stocks = frame['quantity'].values
+    colors = np.where(stocks > 10, '#2ecc71', np.where(stocks > 5, '#f39c12', '#e74c3c'))
+    return np.where(frame['id'].isna().values, '#95a5a6', colors)
+
+
+def stock_status(stocks):
+    """How many products have high / medium / low stock"""
+    return np.array([(stocks > 10).sum(), ((stocks > 5) & (stocks <= 10)).sum(), (stocks <= 5).sum()])
+
+
+def plot_inventory_value_pie(ax, product_data, budget):
+    shown = group_products(product_data, 'value', budget)
+    values = shown['value'].values
+    if values.sum() > 0:
+        # Wedges too thin to read stay unlabeled rather than stacking their labels
+        shares = values / values.sum()
+        names = [n[:15] if share >= 0.02 else '' for n, share in zip(shown['name'], shares)]
+        wedges, texts, autotexts = ax.pie(values, labels=names,
+                                          autopct=lambda pct: f'{pct:.1f}%' if pct >= 2 else '',
+                                          startangle=90, colors=cm.Pastel1.colors,
+                                          explode=[0.05] * len(names))
+        for text in texts:
+            text.set_fontsize(8)
+        for autotext in autotexts:
+            autotext.set_color('black')
+            autotext.set_fontweight('bold')
+            autotext.set_fontsize(8)
+        
+        ax.set_title('Inventory Value Distribution ($)', fontweight='bold', fontsize=12, pad=15)
+
+
+def create_inventory_analytics(data, fig=None):
+    """Inventory analytics with numpy, pandas, matplotlib"""
+    products = data['products']
+    if not products:
+        return None
+    
+    fig = analytics_figure(fig)
+    
+    # Prepare data using pandas
+    product_data = analytics_result(data, 'product_frame')
+    
+    # Chart 1: Stock Levels Bar Chart
+    # Large catalogs show the products holding the most stock value, plus "Other"
+    ax1 = fig.add_subplot(2, 2, 1)
+    stocks = product_data['quantity'].values
+    shown = group_products(product_data, 'value', chart_budget(data, 'product_bars'), average=True)
+    names = [n[:15] for n in shown['name']]
+    
+    # Color coding using numpy
+    colors = stock_colors(shown)
+    counts = stock_status(stocks)
+    
+    bars = ax1.bar(range(len(names)), shown['quantity'].values, color=colors, alpha=0.8, edgecolor='black',
+                   linewidth=1.2)
+    ax1.set_xlabel('Products', fontweight='bold', fontsize=10)
+    ax1.set_ylabel('Stock Quantity', fontweight='bold', fontsize=10)
+    ax1.set_title('Current Stock Levels by Product', fontweight='bold', fontsize=12, pad=15)
+    thin_ticks(ax1.xaxis, names, chart_budget(data, 'ticks'), rotation=45, ha='right', fontsize=8)
+    ax1.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    stock_labels = []
+    for bar in bars:
+        height = bar.get_height()
+        stock_labels.append(ax1.text(bar.get_x() + bar.get_width()/2., height, f'{int(height)}',
+                                     ha='center', va='bottom', fontsize=9, fontweight='bold'))
+    
+    # Chart 2: Inventory Value Pie Chart
+    ax2 = fig.add_subplot(2, 2, 2)
+    values = product_data['value'].values
+    plot_inventory_value_pie(ax2, product_data, chart_budget(data, 'product_pie'))
+    
+    # Chart 3: Stock vs Sold Comparison
+    ax3 = fig.add_subplot(2, 2, 3)
+    x = np.arange(len(names))
+    width = 0.35
+    
+    bars1 = ax3.bar(x - width/2, shown['quantity'], width, 
+                   label='Current Stock', color='#3498db', alpha=0.8, edgecolor='black')
+    bars2 = ax3.bar(x + width/2, shown['sold'], width, 
+                   label='Total Sold', color='#e74c3c', alpha=0.8, edgecolor='black')
+    
+    ax3.set_xlabel('Products', fontweight='bold', fontsize=10)
+    ax3.set_ylabel('Quantity', fontweight='bold', fontsize=10)
+    ax3.set_title('Stock vs Sales Comparison', fontweight='bold', fontsize=12, pad=15)
+    thin_ticks(ax3.xaxis, names, chart_budget(data, 'ticks'), rotation=45, ha='right', fontsize=8)
+    ax3.legend(loc='upper right', fontsize=9)
+    ax3.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    # Chart 4: Stock Status Distribution
+    ax4 = fig.add_subplot(2, 2, 4)
+    categories = ['High Stock\n(>10)', 'Medium Stock\n(5-10)', 'Low Stock\n(≤5)']
+    colors_status = ['#2ecc71', '#f39c12', '#e74c3c']
+    
+    status_bars = ax4.bar(categories, counts, color=colors_status, alpha=0.8, edgecolor='black', linewidth=1.5)
+    ax4.set_ylabel('Number of Products', fontweight='bold', fontsize=10)
+    ax4.set_title('Stock Status Distribution', fontweight='bold', fontsize=12, pad=15)
+    ax4.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    status_labels = []
+    for bar in status_bars:
+        height = bar.get_height()
+        status_labels.append(ax4.text(bar.get_x() + bar.get_width()/2., height, f'{int(height)}',
+                                      ha='center', va='bottom', fontsize=11, fontweight='bold'))
+    
+    # Add statistics text
+    total_value = values.sum()
+    avg_stock = stocks.mean()
+    stats_text = f'Total Inventory Value: ${total_value:.2f}\nAverage Stock: {avg_stock:.1f} units'
+    stats = fig.text(0.99, 0.01, stats_text, ha='right', va='bottom', fontsize=9,
+                     bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+    
+    fig.analytics_handles = {
+        'layout': len(product_data),
+        'axes': (ax1, ax2, ax3, ax4),
+        'stock_bars': bars,
+        'stock_labels': stock_labels,
+        'stock_sold_bars': (bars1, bars2),
+        'status_bars': status_bars,
+        'status_labels': status_labels,
+        'stats': stats,
+        'pie_axes': ax2,
+        'animated': ('stock_bars', 'stock_labels', 'pie_axes', 'stock_sold_bars', 'status_bars',
+                     'status_labels', 'stats')
+    }
+    fig.tight_layout(pad=3.0)
+    return fig
+
+
+def update_inventory_analytics(fig, data):
+    """Move an inventory page's artists to new data; False if it needs a rebuild"""
+    handles = analytics_handles(fig, len(data['products']))
+    if handles is None or not data['products']:
+        return False
+    ax1, ax2, ax3, ax4 = handles['axes']
+    product_data = analytics_result(data, 'product_frame')
+    stocks = product_data['quantity'].values
+    values = product_data['value'].values
+    shown = group_products(product_data, 'value', chart_budget(data, 'product_bars'), average=True)
+    names = [n[:15] for n in shown['name']]
+    
+    set_bar_heights(handles['stock_bars'], shown['quantity'].values, handles['stock_labels'])
+    for bar, color in zip(handles['stock_bars'], stock_colors(shown)):
+        bar.set_facecolor(color)
+    thin_ticks(ax1.xaxis, names, chart_budget(data, 'ticks'), rotation=45, ha='right', fontsize=8)
+    
+    # Wedge geometry depends on every value, so only the pie's own axes are redrawn
+    ax2.clear()
+    plot_inventory_value_pie(ax2, product_data, chart_budget(data, 'product_pie'))
+    
+    stock_bars, sold_bars = handles['stock_sold_bars']
+    set_bar_heights(stock_bars, shown['quantity'].values)
+    set_bar_heights(sold_bars, shown['sold'].values)
+    thin_ticks(ax3.xaxis, names, chart_budget(data, 'ticks'), rotation=45, ha='right', fontsize=8)
+    set_bar_heights(handles['status_bars'], stock_status(stocks), handles['status_labels'])
+    rescale_axes(ax1, ax3, ax4)
+    
+    handles['stats'].set_text(f'Total Inventory Value: ${values.sum():.2f}\n'
+                              f'Average Stock: {stocks.mean():.1f} units')
+    return True
+
+
+def plot_sales_revenue_pie(ax, by_product):
+    product_revenue = by_product['revenue'].sort_values(ascending=False)
+    top_8 = product_revenue.head(8)
+    
+    explode = np.array([0.1 if i == 0 else 0.05 for i in range(len(top_8))])
+    wedges, texts, autotexts = ax.pie(top_8.values, labels=[n[:15] for n in top_8.index],
+                                      autopct='%1.1f%%', startangle=90,
+                                      colors=cm.Set3.colors, explode=explode,
+                                      shadow=True)
+    for text in texts:
+        text.set_fontsize(8)
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+        autotext.set_fontsize(8)
+    
+    ax.set_title('Revenue Distribution by Product', fontweight='bold', fontsize=12, pad=15)
+
+
+def create_sales_analytics(data, fig=None):
+    """Sales analytics with numpy, pandas, matplotlib"""
+    sales = data['sales']
+    if not sales:
+        return None
+    
+    fig = analytics_figure(fig)
+    
+    # Read the pre-aggregated rollups rather than the raw sales
+    daily = analytics_result(data, 'daily_totals')
+    by_product = analytics_result(data, 'product_totals')
+    
+    # Chart 1: Daily Revenue Trend
+    ax1 = fig.add_subplot(2, 2, 1)
+    daily_revenue = daily['revenue']
+    
+    # Long histories are thinned to the points that carry the line's shape
+    shown = lttb_indices(daily_revenue.values, chart_budget(data, 'revenue_trend'))
+    marker = 'o' if len(shown) <= chart_budget(data, 'markers') else None
+    revenue_line, = ax1.plot(shown, daily_revenue.values[shown],
+                             marker=marker, linewidth=2.5, markersize=7, color='#2ecc71',
+                             markerfacecolor='#27ae60', markeredgecolor='white', markeredgewidth=2)
+    revenue_fill = ax1.fill_between(shown, daily_revenue.values[shown],
+                                    alpha=0.3, color='#2ecc71')
+    
+    ax1.set_xlabel('Days', fontweight='bold', fontsize=10)
+    ax1.set_ylabel('Revenue ($)', fontweight='bold', fontsize=10)
+    ax1.set_title('Daily Sales Revenue Trend', fontweight='bold', fontsize=12, pad=15)
+    ax1.grid(True, alpha=0.3, linestyle='--')
+    thin_ticks(ax1.xaxis, [str(d) for d in daily_revenue.index], chart_budget(data, 'ticks'),
+               rotation=45, ha='right', fontsize=7)
+    
+    # Add trend line using numpy polyfit; being straight, it only needs its ends
+    trend_line = trend_legend = trend_label = None
+    if len(daily_revenue) > 1:
+        z = np.polyfit(range(len(daily_revenue)), daily_revenue.values, 1)
+        p = np.poly1d(z)
+        ends = np.array([0, len(daily_revenue) - 1])
+        trend_line, = ax1.plot(ends, p(ends),
+                               "r--", alpha=0.8, linewidth=2, label=f'Trend: ${z[0]:.2f}/day')
+        trend_legend = ax1.legend(fontsize=9)
+        trend_label = trend_legend.get_texts()[0]
+    
+    # Chart 2: Top Selling Products
+    ax2 = fig.add_subplot(2, 2, 2)
+    product_sales = by_product['quantity'].sort_values(ascending=True)
+    top_10 = product_sales.tail(10)
+    
+    colors_grad = cm.viridis(np.linspace(0.3, 0.9, len(top_10)))
+    bars = ax2.barh(range(len(top_10)), top_10.values, color=colors_grad, 
+                   alpha=0.8, edgecolor='black')
+    ax2.set_yticks(range(len(top_10)))
+    ax2.set_yticklabels([name[:20] for name in top_10.index], fontsize=9)
+    ax2.set_xlabel('Quantity Sold', fontweight='bold', fontsize=10)
+    ax2.set_title('Top 10 Best-Selling Products', fontweight='bold', fontsize=12, pad=15)
+    ax2.grid(axis='x', alpha=0.3, linestyle='--')
+    
+    top_labels = []
+    for i, (bar, value) in enumerate(zip(bars, top_10.values)):
+        top_labels.append(ax2.text(value + 0.5, i, f'{int(value)}', va='center', fontsize=9, fontweight='bold'))
+    
+    # Chart 3: Revenue Distribution by Product
+    ax3 = fig.add_subplot(2, 2, 3)
+    plot_sales_revenue_pie(ax3, by_product)
+    
+    # Chart 4: Sales Volume Over Time
+    ax4 = fig.add_subplot(2, 2, 4)
+    daily_quantity = daily['quantity']
+    
+    # Past the bar budget, each bar is the daily average over a run of days
+    centers, widths, heights = bucket_means(daily_quantity.values, chart_budget(data, 'daily_volume'))
+    colors_bars = cm.coolwarm(np.linspace(0.2, 0.8, len(heights)))
+    volume_bars = ax4.bar(centers, heights, widths,
+                          color=colors_bars, alpha=0.8, edgecolor='black')
+    
+    ax4.set_xlabel('Days', fontweight='bold', fontsize=10)
+    ax4.set_ylabel('Items Sold', fontweight='bold', fontsize=10)
+    ax4.set_title('Daily Sales Volume (Units)', fontweight='bold', fontsize=12, pad=15)
+    thin_ticks(ax4.xaxis, [str(d) for d in daily_quantity.index], chart_budget(data, 'ticks'),
+               rotation=45, ha='right', fontsize=7)
+    ax4.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    # Add average line
+    avg_qty = daily_quantity.mean()
+    average_line = ax4.axhline(y=avg_qty, color='r', linestyle='--', linewidth=2,
+                               label=f'Average: {avg_qty:.1f} units/day', alpha=0.7)
+    average_legend = ax4.legend(fontsize=9)
+    average_label = average_legend.get_texts()[0]
+    
+    # Add statistics
+    total_sales = daily_revenue.sum()
+    total_items = daily_quantity.sum()
+    stats_text = f'Total Revenue: ${total_sales:.2f}\nTotal Items Sold: {total_items}'
+    stats = fig.text(0.99, 0.01, stats_text, ha='right', va='bottom', fontsize=9,
+                     bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
+    
+    fig.analytics_handles = {
+        'layout': (tuple(daily.index), len(top_10)),
+        'axes': (ax1, ax2, ax3, ax4),
+        'revenue_line': revenue_line,
+        'revenue_fill': revenue_fill,
+        'trend_line': trend_line,
+        'trend_label': trend_label,
+        'top_bars': bars,
+        'top_labels': top_labels,
+        'volume_bars': volume_bars,
+        'average_line': average_line,
+        'average_label': average_label,
+        'stats': stats,
+        'legends': (trend_legend, average_legend),
+        # The ranking reorders its tick labels as sales come in, so it moves as a whole
+        'ranking_axes': ax2,
+        'pie_axes': ax3,
+        'animated': ('revenue_line', 'revenue_fill', 'trend_line', 'legends', 'ranking_axes', 'pie_axes',
+                     'volume_bars', 'average_line', 'stats')
+    }
+    fig.tight_layout(pad=3.0)
+    return fig
+
+
+def update_sales_analytics(fig, data):
+    """Move a sales page's artists to new data; False if it needs a rebuild"""
+    if not data['sales']:
+        return False
+    daily = analytics_result(data, 'daily_totals')
+    by_product = analytics_result(data, 'product_totals')
+    top_10 = by_product['quantity'].sort_values(ascending=True).tail(10)
+    handles = analytics_handles(fig, (tuple(daily.index), len(top_10)))
+    if handles is None:
+        return False
+    ax1, ax2, ax3, ax4 = handles['axes']
+    
+    daily_revenue = daily['revenue'].values
+    shown = lttb_indices(daily_revenue, chart_budget(data, 'revenue_trend'))
+    handles['revenue_line'].set_data(shown, daily_revenue[shown])
+    if handles['trend_line'] is not None:
+        z = np.polyfit(np.arange(len(daily_revenue)), daily_revenue, 1)
+        handles['trend_line'].set_ydata(np.poly1d(z)(handles['trend_line'].get_xdata()))
+        handles['trend_label'].set_text(f'Trend: ${z[0]:.2f}/day')
+    handles['revenue_fill'].set_data(shown, daily_revenue[shown], 0)
+    fit_axes(ax1, handles['revenue_fill'].get_datalim(ax1.transData).get_points())
+    
+    for i, (bar, label, value) in enumerate(zip(handles['top_bars'], handles['top_labels'], top_10.values)):
+        bar.set_width(value)
+        label.set_position((value + 0.5, i))
+        label.set_text(f'{int(value)}')
+    set_tick_labels(ax2.yaxis, [name[:20] for name in top_10.index], fontsize=9)
+    
+    ax3.clear()
+    plot_sales_revenue_pie(ax3, by_product)
+    
+    daily_quantity = daily['quantity']
+    avg_qty = daily_quantity.mean()
+    set_bar_heights(handles['volume_bars'], bucket_means(daily_quantity.values, chart_budget(data, 'daily_volume'))[2])
+    handles['average_line'].set_ydata([avg_qty, avg_qty])
+    handles['average_label'].set_text(f'Average: {avg_qty:.1f} units/day')
+    rescale_axes(ax2, ax4)
+    
+    handles['stats'].set_text(f'Total Revenue: ${daily_revenue.sum():.2f}\n'
+                              f'Total Items Sold: {daily_quantity.sum()}')
+    return True
+
+
+def annotate_top_performers(ax, perf_data):
+    return [ax.annotate(row['name'][:10], (row['sold'], row['revenue']),
+                        xytext=(5, 5), textcoords='offset points', fontsize=7,
+                        bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.7))
+            for idx, row in perf_data.nlargest(3, 'revenue').iterrows()]
+
+
+def turnover_colors(turnover):
+    return ['#2ecc71' if x > 50 else '#f39c12' if x > 25 else '#e74c3c' for x in turnover]
+
+
+def price_bin_labels(price_sales):
+    return [f'${interval.left:.0f}-${interval.right:.0f}' for interval in price_sales.index]
+
+
+def create_performance_analytics(data, fig=None):
+    """Product performance analytics"""
+    products = data['products']
+    if not products:
+        return None
+    
+    fig = analytics_figure(fig)
+    
+    # Prepare performance data
+    perf_data = analytics_result(data, 'product_frame')
+    
+    # Chart 1: Product Performance Matrix (Scatter Plot)
+    ax1 = fig.add_subplot(2, 2, 1)
+    scatter = ax1.scatter(perf_data['sold'], perf_data['revenue'], 
+                        s=perf_data['price']*20, alpha=0.6, 
+                        c=perf_data['turnover'], cmap='RdYlGn',
+                        edgecolors='black', linewidth=1.5)
+    
+    ax1.set_xlabel('Units Sold', fontweight='bold', fontsize=10)
+    ax1.set_ylabel('Revenue Generated ($)', fontweight='bold', fontsize=10)
+    ax1.set_title('Product Performance Matrix', fontweight='bold', fontsize=12, pad=15)
+    ax1.grid(True, alpha=0.3, linestyle='--')
+    
+    # Add colorbar
+    cbar = fig.colorbar(scatter, ax=ax1)
+    cbar.set_label('Turnover Rate (%)', fontweight='bold', fontsize=9)
+    
+    # Annotate top performers
+    annotations = annotate_top_performers(ax1, perf_data)
+    
+    # Chart 2: Revenue per Product (Horizontal Bar)
+    ax2 = fig.add_subplot(2, 2, 2)
+    top_revenue = perf_data.nlargest(10, 'revenue').sort_values('revenue')
+    
+    colors = cm.plasma(np.linspace(0.3, 0.9, len(top_revenue)))
+    bars = ax2.barh(range(len(top_revenue)), top_revenue['revenue'], 
+                   color=colors, alpha=0.8, edgecolor='black')
+    ax2.set_yticks(range(len(top_revenue)))
+    ax2.set_yticklabels([n[:20] for n in top_revenue['name']], fontsize=9)
+    ax2.set_xlabel('Revenue ($)', fontweight='bold', fontsize=10)
+    ax2.set_title('Top 10 Revenue Generators', fontweight='bold', fontsize=12, pad=15)
+    ax2.grid(axis='x', alpha=0.3, linestyle='--')
+    
+    revenue_labels = []
+    for i, (bar, value) in enumerate(zip(bars, top_revenue['revenue'])):
+        revenue_labels.append(ax2.text(value + max(top_revenue['revenue'])*0.01, i, f'${value:.0f}',
+                                       va='center', fontsize=8, fontweight='bold'))
+    
+    # Chart 3: Turnover Rate Analysis
+    ax3 = fig.add_subplot(2, 2, 3)
+    sorted_turnover = group_products(perf_data.sort_values('turnover', ascending=False), 'turnover',
+                                     chart_budget(data, 'product_bars'))
+    
+    colors_turn = turnover_colors(sorted_turnover['turnover'])
+    
+    turnover_bars = ax3.bar(range(len(sorted_turnover)), sorted_turnover['turnover'],
+                            color=colors_turn, alpha=0.8, edgecolor='black')
+    ax3.set_xlabel('Products', fontweight='bold', fontsize=10)
+    ax3.set_ylabel('Turnover Rate (%)', fontweight='bold', fontsize=10)
+    ax3.set_title('Product Turnover Rate', fontweight='bold', fontsize=12, pad=15)
+    thin_ticks(ax3.xaxis, [n[:12] for n in sorted_turnover['name']], chart_budget(data, 'ticks'),
+               rotation=45, ha='right', fontsize=7)
+    ax3.grid(axis='y', alpha=0.3, linestyle='--')
+    ax3.axhline(y=50, color='green', linestyle='--', alpha=0.5, label='Good (>50%)')
+    ax3.axhline(y=25, color='orange', linestyle='--', alpha=0.5, label='Fair (>25%)')
+    ax3.legend(fontsize=8, loc='upper right')
+    
+    # Chart 4: Price vs Sales Correlation
+    ax4 = fig.add_subplot(2, 2, 4)
+    
+    # Create price bins
+    price_sales = analytics_result(data, 'price_bins')
+    
+    bin_labels = price_bin_labels(price_sales)
+    
+    price_bars = ax4.bar(range(len(price_sales)), price_sales.values,
+                         color='#9b59b6', alpha=0.8, edgecolor='black')
+    ax4.set_xlabel('Price Range', fontweight='bold', fontsize=10)
+    ax4.set_ylabel('Units Sold', fontweight='bold', fontsize=10)
+    ax4.set_title('Sales by Price Range', fontweight='bold', fontsize=12, pad=15)
+    ax4.set_xticks(range(len(price_sales)))
+    ax4.set_xticklabels(bin_labels, rotation=45, ha='right', fontsize=8)
+    ax4.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    price_labels = []
+    for bar in price_bars:
+        height = bar.get_height()
+        price_labels.append(ax4.text(bar.get_x() + bar.get_width()/2., height,
+                                     f'{int(height)}', ha='center', va='bottom',
+                                     fontsize=9, fontweight='bold'))
+    
+    # Add statistics
+    avg_turnover = perf_data['turnover'].mean()
+    best_product = perf_data.loc[perf_data['revenue'].idxmax(), 'name']
+    stats_text = f'Avg Turnover: {avg_turnover:.1f}%\nBest Product: {best_product[:15]}'
+    stats = fig.text(0.99, 0.01, stats_text, ha='right', va='bottom', fontsize=9,
+                     bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.5))
+    
+    fig.analytics_handles = {
+        'layout': (len(perf_data), len(price_sales)),
+        'axes': (ax1, ax2, ax3, ax4),
+        'scatter': scatter,
+        'annotations': annotations,
+        'revenue_bars': bars,
+        'revenue_labels': revenue_labels,
+        'turnover_bars': turnover_bars,
+        'price_bars': price_bars,
+        'price_labels': price_labels,
+        'stats': stats,
+        # Both charts are re-sorted on refresh, so they move as a whole, tick labels included
+        'ranking_axes': ax2,
+        'turnover_axes': ax3,
+        'animated': ('scatter', 'annotations', 'ranking_axes', 'turnover_axes', 'price_bars', 'price_labels',
+                     'stats')
+    }
+    fig.tight_layout(pad=3.0)
+    return fig
+
+
+def update_performance_analytics(fig, data):
+    """Move a performance page's artists to new data; False if it needs a rebuild"""
+    if not data['products']:
+        return False
+    price_sales = analytics_result(data, 'price_bins')
+    handles = analytics_handles(fig, (len(data['products']), len(price_sales)))
+    if handles is None:
+        return False
+    ax1, ax2, ax3, ax4 = handles['axes']
+    perf_data = analytics_result(data, 'product_frame')
+    
+    # The colorbar follows the scatter's norm; like the axes, it is only
+    # rescaled once the turnover leaves its current range
+    points = np.column_stack([perf_data['sold'].values, perf_data['revenue'].values])
+    turnover = perf_data['turnover'].values
+    scatter = handles['scatter']
+    scatter.set_offsets(points)
+    scatter.set_sizes(perf_data['price'].values * 20)
+    scatter.set_array(turnover)
+    if turnover.min() < scatter.norm.vmin or turnover.max() > scatter.norm.vmax:
+        scatter.autoscale()
+    for annotation in handles['annotations']:
+        annotation.remove()
+    handles['annotations'] = annotate_top_performers(ax1, perf_data)
+    fit_axes(ax1, points)
+    
+    top_revenue = perf_data.nlargest(10, 'revenue').sort_values('revenue')
+    offset = max(top_revenue['revenue']) * 0.01
+    for i, (bar, label, value) in enumerate(zip(handles['revenue_bars'], handles['revenue_labels'],
+                                                top_revenue['revenue'])):
+        bar.set_width(value)
+        label.set_position((value + offset, i))
+        label.set_text(f'${value:.0f}')
+    set_tick_labels(ax2.yaxis, [n[:20] for n in top_revenue['name']], fontsize=9)
+    
+    sorted_turnover = group_products(perf_data.sort_values('turnover', ascending=False), 'turnover',
+                                     chart_budget(data, 'product_bars'))
+    set_bar_heights(handles['turnover_bars'], sorted_turnover['turnover'].values)
+    for bar, color in zip(handles['turnover_bars'], turnover_colors(sorted_turnover['turnover'])):
+        bar.set_facecolor(color)
+    thin_ticks(ax3.xaxis, [n[:12] for n in sorted_turnover['name']], chart_budget(data, 'ticks'),
+               rotation=45, ha='right', fontsize=7)
+    
+    set_bar_heights(handles['price_bars'], price_sales.values, handles['price_labels'])
+    set_tick_labels(ax4.xaxis, price_bin_labels(price_sales), rotation=45, ha='right', fontsize=8)
+    rescale_axes(ax2, ax3, ax4)
+    
+    best_product = perf_data.loc[perf_data['revenue'].idxmax(), 'name']
+    handles['stats'].set_text(f"Avg Turnover: {perf_data['turnover'].mean():.1f}%\n"
+                              f"Best Product: {best_product[:15]}")
+    return True
+
+
+def financial_overview(data):
+    """Total revenue, inventory value and the estimated 30% profit"""
+    total_revenue = data['total_revenue']
+    return np.array([total_revenue, data['aggregates']['inventory_value'], total_revenue * 0.30])
+
+
+def financial_kpi_text(data):
+    products = data['products']
+    sales = data['sales']
+    aggregates = data['aggregates']
+    total_revenue, total_inventory, estimated_profit = financial_overview(data)
+    
+    # Calculate KPIs
+    total_products = len(products)
+    total_sales_count = len(sales)
+    avg_order_value = total_revenue / total_sales_count if total_sales_count > 0 else 0
+    total_items_sold = aggregates['units_sold']
+    total_stock = aggregates['total_stock']
+    
+    # Create KPI display
+    return f"""
+    KEY PERFORMANCE INDICATORS (KPIs)
+    {'='*50}
+    
+    📊 Sales Metrics:
+       • Total Revenue: ${total_revenue:,.2f}
+       • Total Transactions: {total_sales_count}
+       • Average Order Value: ${avg_order_value:.2f}
+       • Total Units Sold: {total_items_sold}
+    
+    📦 Inventory Metrics:
+       • Total Products: {total_products}
+       • Inventory Value: ${total_inventory:,.2f}
+       • Avg Product Value: ${total_inventory/total_products if total_products > 0 else 0:.2f}
+    
+    💰 Financial Metrics:
+       • Estimated Profit: ${estimated_profit:,.2f}
+       • Profit Margin: 30.0%
+       • ROI: {(total_revenue/total_inventory*100 if total_inventory > 0 else 0):.1f}%
+    
+    🎯 Performance:
+       • Stock Turnover: {(total_items_sold/(total_items_sold + total_stock)*100 if (total_items_sold + total_stock) > 0 else 0):.1f}%
+    """
+
+
+def create_financial_analytics(data, fig=None):
+    """Financial analytics dashboard"""
+    products = data['products']
+    sales = data['sales']
+    
+    fig = analytics_figure(fig)
+    
+    # Prepare financial data
+    if products:
+        product_df = analytics_result(data, 'product_frame')
+    else:
+        product_df = pd.DataFrame()
+    
+    # Chart 1: Revenue vs Inventory Value (top earners, plus "Other" for big catalogs)
+    ax1 = fig.add_subplot(2, 2, 1)
+    revenue_bars = value_bars = ()
+    if not product_df.empty:
+        shown = group_products(product_df, 'revenue', chart_budget(data, 'product_bars'), average=True)
+        x = np.arange(len(shown))
+        width = 0.35
+        
+        revenue_bars = ax1.bar(x - width/2, shown['revenue'], width,
+                               label='Revenue', color='#2ecc71', alpha=0.8, edgecolor='black')
+        value_bars = ax1.bar(x + width/2, shown['value'], width,
+                             label='Inventory Value', color='#3498db', alpha=0.8, edgecolor='black')
+        
+        ax1.set_xlabel('Products', fontweight='bold', fontsize=10)
+        ax1.set_ylabel('Amount ($)', fontweight='bold', fontsize=10)
+        ax1.set_title('Revenue vs Inventory Value', fontweight='bold', fontsize=12, pad=15)
+        thin_ticks(ax1.xaxis, [n[:12] for n in shown['name']], chart_budget(data, 'ticks'),
+                   rotation=45, ha='right', fontsize=8)
+        ax1.legend(fontsize=9)
+        ax1.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    # Chart 2: Revenue Breakdown
+    ax2 = fig.add_subplot(2, 2, 2)
+    financial_data = financial_overview(data)
+    labels = ['Total Revenue', 'Inventory Value', 'Est. Profit (30%)']
+    colors_fin = ['#2ecc71', '#3498db', '#f39c12']
+    
+    bars = ax2.bar(range(3), financial_data, color=colors_fin, 
+                  alpha=0.8, edgecolor='black', linewidth=2)
+    ax2.set_ylabel('Amount ($)', fontweight='bold', fontsize=10)
+    ax2.set_title('Financial Overview', fontweight='bold', fontsize=12, pad=15)
+    ax2.set_xticks(range(3))
+    ax2.set_xticklabels(labels, fontsize=9)
+    ax2.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    overview_labels = []
+    for bar, value in zip(bars, financial_data):
+        overview_labels.append(ax2.text(bar.get_x() + bar.get_width()/2., value,
+                                        f'${value:.2f}', ha='center', va='bottom',
+                                        fontsize=10, fontweight='bold'))
+    
+    # Chart 3: Sales Trend with Moving Average
+    ax3 = fig.add_subplot(2, 2, 3)
+    days = revenue_line = average_line = revenue_fill = None
+    if sales:
+        daily_rev = analytics_result(data, 'daily_totals')['revenue']
+        days = tuple(daily_rev.index)
+        
+        # Plot daily revenue; long histories keep each stretch's low and high day
+        shown = minmax_indices(daily_rev.values, chart_budget(data, 'revenue_daily'))
+        marker = 'o' if len(shown) <= chart_budget(data, 'markers') else None
+        revenue_line, = ax3.plot(shown, daily_rev.values[shown],
+                                 marker=marker, linewidth=2, markersize=6, color='#3498db',
+                                 label='Daily Revenue', alpha=0.7)
+        
+        # Calculate moving average if enough data
+        if len(daily_rev) >= 3:
+            window = min(3, len(daily_rev))
+            moving_avg = pd.Series(daily_rev.values).rolling(window=window).mean()
+            average_line, = ax3.plot(shown, moving_avg.values[shown],
+                                     linewidth=3, color='#e74c3c', linestyle='--',
+                                     label=f'{window}-Day Moving Avg', alpha=0.8)
+        
+        ax3.set_xlabel('Days', fontweight='bold', fontsize=10)
+        ax3.set_ylabel('Revenue ($)', fontweight='bold', fontsize=10)
+        ax3.set_title('Revenue Trend Analysis', fontweight='bold', fontsize=12, pad=15)
+        ax3.legend(fontsize=9)
+        ax3.grid(True, alpha=0.3, linestyle='--')
+        revenue_fill = ax3.fill_between(shown, daily_rev.values[shown], alpha=0.2, color='#3498db')
+    
+    # Chart 4: Key Performance Indicators
+    ax4 = fig.add_subplot(2, 2, 4)
+    ax4.axis('off')
+    
+    kpis = ax4.text(0.5, 0.5, financial_kpi_text(data), ha='center', va='center',
+                    fontsize=10, family='monospace',
+                    bbox=dict(boxstyle='round,pad=1', facecolor='#ecf0f1',
+                              edgecolor='#34495e', linewidth=2))
+    
+    ax4.set_title('Business KPI Dashboard', fontweight='bold', 
+                 fontsize=14, pad=20, loc='center')
+    
+    fig.analytics_handles = {
+        'layout': (len(products), days),
+        'axes': (ax1, ax2, ax3, ax4),
+        'revenue_bars': revenue_bars,
+        'value_bars': value_bars,
+        'overview_bars': bars,
+        'overview_labels': overview_labels,
+        'revenue_line': revenue_line,
+        'average_line': average_line,
+        'revenue_fill': revenue_fill,
+        'kpis': kpis,
+        'animated': ('revenue_bars', 'value_bars', 'overview_bars', 'overview_labels', 'revenue_line',
+                     'average_line', 'revenue_fill', 'kpis')
+    }
+    fig.tight_layout(pad=3.0)
+    return fig
+
+
+def update_financial_analytics(fig, data):
+    """Move a financial page's artists to new data; False if it needs a rebuild"""
+    daily_rev = analytics_result(data, 'daily_totals')['revenue'] if data['sales'] else None
+    handles = analytics_handles(fig, (len(data['products']), None if daily_rev is None else tuple(daily_rev.index)))
+    if handles is None:
+        return False
+    ax1, ax2, ax3, ax4 = handles['axes']
+    
+    if data['products']:
+        shown = group_products(analytics_result(data, 'product_frame'), 'revenue', chart_budget(data, 'product_bars'),
+                               average=True)
+        set_bar_heights(handles['revenue_bars'], shown['revenue'].values)
+        set_bar_heights(handles['value_bars'], shown['value'].values)
+        thin_ticks(ax1.xaxis, [n[:12] for n in shown['name']], chart_budget(data, 'ticks'),
+                   rotation=45, ha='right', fontsize=8)
+        rescale_axes(ax1)
+    
+    set_bar_heights(handles['overview_bars'], financial_overview(data), handles['overview_labels'], '${:.2f}')
+    rescale_axes(ax2)
+    
+    if daily_rev is not None:
+        shown = minmax_indices(daily_rev.values, chart_budget(data, 'revenue_daily'))
+        handles['revenue_line'].set_data(shown, daily_rev.values[shown])
+        if handles['average_line'] is not None:
+            window = min(3, len(daily_rev))
+            moving_avg = pd.Series(daily_rev.values).rolling(window=window).mean().values
+            handles['average_line'].set_data(shown, moving_avg[shown])
+        handles['revenue_fill'].set_data(shown, daily_rev.values[shown], 0)
+        fit_axes(ax3, handles['revenue_fill'].get_datalim(ax3.transData).get_points())
+    
+    handles['kpis'].set_text(financial_kpi_text(data))
+    return True
+
+
+def render_analytics_page(builder, data, cancelled=None):
+    """Build one page and render it with Agg off the Tk thread.
+    
+    Returns the Figure, or None when there is no data for the page or the
+    job was cancelled.
+    """
+    if cancelled is not None and cancelled.is_set():
+        return None
+    load_analytics_stack()
+    fig = builder(data)
+    if fig is None or (cancelled is not None and cancelled.is_set()):
+        return None
+    FigureCanvasAgg(fig).draw()
+    return fig
+
+
+def flatten_artists(value):
+    """The artists in a handle: one artist, None, or (nested) lists and BarContainers"""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [artist for item in value for artist in flatten_artists(item)]
+    return [value]
+
+
+def draw_analytics_figure(fig, redraw=False):
+    """Render fig into its canvas's Agg buffer, repainting only the artists that move.
+    
+    The artists a builder lists as animated are left out of a full draw,
+    which is kept as the page's static background: axes, ticks, titles and
+    grids. Later draws restore that background and paint just the animated
+    artists over it, unless the figure was resized or an update moved a view
+    or relabelled ticks, in which case the background is drawn again.
+    """
+    canvas = fig.canvas
+    handles = getattr(fig, 'analytics_handles', None)
+    if handles is None:
+        FigureCanvasAgg.draw(canvas)
+        return
+    animated = [artist for key in handles['animated'] for artist in flatten_artists(handles[key])]
+    for artist in animated:
+        artist.set_animated(True)
+    static = (canvas.get_width_height(),
+              [(ax.viewLim.bounds, ax.xaxis.get_major_formatter(), ax.yaxis.get_major_formatter())
+               for ax in fig.axes if not ax.get_animated()])
+    
+    if redraw or handles.get('static') != static:
+        FigureCanvasAgg.draw(canvas)
+        handles['background'] = canvas.copy_from_bbox(fig.bbox)
+        handles['static'] = static
+    else:
+        canvas.restore_region(handles['background'])
+    for artist in sorted(animated, key=lambda artist: artist.get_zorder()):
+        fig.draw_artist(artist)
+
+
+def refresh_analytics_page(builder, updater, fig, lock, data, cancelled=None):
+    """Bring a page's figure up to date and render it with Agg off the Tk thread.
+    
+    A figure the dashboard already shows is updated in place by the page's
+    updater, and only rebuilt (into the same Figure) when its layout no
+    longer fits the data. It is rendered into its own canvas's Agg buffer
+    under lock, so the Tk thread just has to blit it. Without a figure this
+    is render_analytics_page. Returns the Figure, or None when there is no
+    data for the page or the job was cancelled.
+    """
+    if fig is None:
+        return render_analytics_page(builder, data, cancelled)
+    if cancelled is not None and cancelled.is_set():
+        return None
+    with lock:
+        rebuilt = not updater(fig, data)
+        if rebuilt and builder(data, fig) is None:
+            return None
+        draw_analytics_figure(fig, rebuilt)
+    return fig
+
+
+# (key, tab title, builder, updater, text when empty, engine events that change the page)
+ANALYTICS_PAGES = [
+    ('inventory', '📦 Inventory Analytics', create_inventory_analytics, update_inventory_analytics,
+     "No inventory data", StoreEngine.CHANGE_EVENTS),
+    ('sales', '📊 Sales Analytics', create_sales_analytics, update_sales_analytics, "No sales data",
+     ('loaded', 'sales_recorded')),
+    ('performance', '🎯 Performance Metrics', create_performance_analytics, update_performance_analytics,
+     "No performance data", StoreEngine.CHANGE_EVENTS),
+    ('financial', '💰 Financial Summary', create_financial_analytics, update_financial_analytics,
+     "No financial data", StoreEngine.CHANGE_EVENTS)
+]
+
+def read_orders(path):
+    """Read orders from a CSV file with product_id,quantity columns, or from JSON / JSON lines"""
+    with open(path, 'r', newline='') as file:
+        if os.path.splitext(path)[1].lower() == '.csv':
+            return list(csv.DictReader(file))
+        text = file.read()
+    try:
+        orders = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(orders, dict) and 'product_id' in orders:
+        # A JSON lines file holding a single order
+        return [orders]
+    if not isinstance(orders, list):
+        raise ValueError(f"{path} must hold a JSON list of orders (found {type(orders).__name__})")
+    return orders
+
+
+def import_orders(data_file, orders_file, atomic=True):
+    """Process an order file against the store without starting the GUI"""
+    engine = StoreEngine(data_file)
+    engine.load()
+    batch = read_orders(orders_file)
+    try:
+        result = engine.process_orders(batch, atomic=atomic)
+        if result['accepted']:
+            engine.save()
+    finally:
+        engine.close()
+    
+    print(f"Orders: {len(batch)} | Accepted: {result['accepted']} | Rejected: {len(result['rejected'])}")
+    print(f"Revenue: ${result['revenue']:.2f} | {result['seconds']:.3f}s "
+          f"({result['orders_per_second']:,.0f} orders/s)")
+    for index, order, reason in result['rejected'][:20]:
+        print(f"   ✗ #{index + 1}: {order} - {reason}")
+    if len(result['rejected']) > 20:
+        print(f"   ... and {len(result['rejected']) - 20} more")
+    if atomic and result['rejected']:
+        print("No orders were applied (all-or-nothing). Use --best-effort to apply the valid ones.")
+    return result
+
+
+def run_order_benchmark(data_file, orders_per_thread=2000, thread_counts=(1, 2, 4, 8), product_count=200):
+    """Place random single orders from several threads against a scratch store and check for overselling.
+    
+    The scratch store uses the same format as data_file. Stock is set so
+    roughly a fifth of the orders must be turned away. Returns a list of
+    dicts with threads, orders, accepted, seconds, orders_per_second and
+    problems (empty when stock, history and totals all agree).
+    """
+    extension = os.path.splitext(data_file)[1] or '.json'
+    results = []
+    for threads in thread_counts:
+        with tempfile.TemporaryDirectory() as folder:
+            engine = StoreEngine(os.path.join(folder, 'bench' + extension), create=True)
+            engine.load()
+            stock = max(1, int(threads * orders_per_thread * 2 * 0.8 / product_count))
+            for i in range(product_count):
+                engine.add_product(f"B{i:04d}", f"Bench product {i}", 1.0 + i % 50, stock)
+            product_ids = list(engine.products)
+            barrier = threading.Barrier(threads + 1)
+            accepted = [0] * threads
+            
+            def worker(slot):
+                rng = random.Random(slot)
+                barrier.wait()
+                for _ in range(orders_per_thread):
+                    sales, _ = engine.place_orders([(rng.choice(product_ids), rng.randint(1, 3))])
+                    accepted[slot] += len(sales)
+            
+            workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+            for thread in workers:
+                thread.start()
+            barrier.wait()
+            started = time.perf_counter()
+            for thread in workers:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            
+            sold = {}
+            for sale in engine.sales_history:
+                sold[sale['product_id']] = sold.get(sale['product_id'], 0) + sale['quantity']
+            problems = []
+            for product_id, product in engine.products.items():
+                if product['quantity'] < 0:
+                    problems.append(f"{product_id} oversold: stock {product['quantity']}")
+                if product['quantity'] + product['total_sold'] != stock or product['total_sold'] != sold.get(product_id, 0):
+                    problems.append(f"{product_id} stock, total_sold and sales history disagree")
+            if len(engine.sales_history) != sum(accepted):
+                problems.append(f"{len(engine.sales_history)} sales recorded for {sum(accepted)} accepted orders")
+            for field, (running, actual) in engine.aggregates.verify(engine.products, engine.sales_history).items():
+                problems.append(f"{field}: running {running} != actual {actual}")
+            engine.close()
+        
+        results.append({
+            'threads': threads,
+            'orders': threads * orders_per_thread,
+            'accepted': sum(accepted),
+            'seconds': elapsed,
+            'orders_per_second': threads * orders_per_thread / elapsed,
+            'problems': problems
+        })
+    return results
+
+
+def serve_orders(data_file, host='127.0.0.1', port=8765, autosave_interval=5.0):
+    """Run the order endpoint without the GUI until interrupted, autosaving as orders arrive"""
+    engine = StoreEngine(data_file)
+    engine.load()
+    autosaver = AutoSaver(engine, autosave_interval)
+    server = OrderIntakeServer(engine, host, port)
+    
+    def started():
+        print(f"🛒 Taking orders on http://{host}:{server.port}/orders "
+              f"(metrics at /metrics). Press Ctrl+C to stop.")
+    
+    async def run():
+        serving = asyncio.create_task(server.serve(started))
+        while not serving.done():
+            await asyncio.sleep(0.5)
+            autosaver.tick()
+        await serving
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            autosaver.flush()
+        finally:
+            autosaver.close()
+            engine.close()
+    
+    metrics = server.metrics()
+    print(f"Served {metrics['requests']} requests in {metrics['batches']} batches "
+          f"| Accepted: {metrics['accepted']} | Rejected: {metrics['rejected']} | Overloaded: {metrics['overloaded']} "
+          f"| p50 {metrics['latency_ms']['p50']} ms | p99 {metrics['latency_ms']['p99']} ms")
+    return metrics
+
+
+EXPORT_FORMATS = ('png', 'pdf', 'html')
+
+
+# Each export worker process keeps the store it loaded last, so the pages of
+# one store that land on the same worker share a single load.
+export_state = {'path': None, 'data': None}
+
+
+def init_export_worker():
+    """Pool initializer: import the chart stack and start with no store loaded"""
+    load_analytics_stack()
+    export_state['path'] = export_state['data'] = None
+
+
+def export_store_page(store_path, key, base_path, formats, budgets):
+    """Render one analytics page of a store file with Agg; runs in an export worker process.
+    
+    The store is loaded read-only, so exporting never repairs or rewrites
+    the files of a store that may be open elsewhere, and only when this
+    worker's last page was of another store. Returns export_page()'s
+    result with the seconds spent loading.
+    """
+    started = time.perf_counter()
+    if export_state['path'] != store_path:
+        export_state['path'] = export_state['data'] = None
+        engine = StoreEngine(store_path, read_only=True)
+        try:
+            engine.load()
+            export_state['data'] = analytics_data(engine, cache=AnalyticsCache(), budgets=budgets)
+        finally:
+            engine.close()
+        export_state['path'] = store_path
+    loaded = time.perf_counter()
+    builder = next(page[2] for page in ANALYTICS_PAGES if page[0] == key)
+    return dict(export_page(export_state['data'], builder, base_path, formats), load=loaded - started)
+
+
+def export_page(data, builder, base_path, formats):
+    """Build one page from analytics_data() and write base_path.png and/or base_path.pdf.
+    
+    Returns the seconds spent building and writing, the files written and,
+    when HTML is wanted, the PNG as base64. No files are written when the
+    store has no data for the page.
+    """
+    started = time.perf_counter()
+    fig = builder(data)
+    built = time.perf_counter()
+    
+    files, image = [], None
+    if fig is not None:
+        if 'png' in formats or 'html' in formats:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png')
+            if 'png' in formats:
+                with open(base_path + '.png', 'wb') as file:
+                    file.write(buffer.getvalue())
+                files.append(base_path + '.png')
+            if 'html' in formats:
+                image = base64.b64encode(buffer.getvalue()).decode('ascii')
+        if 'pdf' in formats:
+            fig.savefig(base_path + '.pdf', format='pdf')
+            files.append(base_path + '.pdf')
+    return {
+        'build': built - started,
+        'write': time.perf_counter() - built,
+        'files': files,
+        'image': image
+    }
+
+
+def write_export_html(report_path, store_path, pages):
+    """Write one store's pages as a single HTML file with the images inlined and the timings"""
+    rows, sections = [], []
+    for (key, title, _, _, empty_text, _), result in pages:
+        escaped = html.escape(title)
+        if result['error']:
+            body = f"<p class=\"error\">Could not build chart: {html.escape(result['error'])}</p>"
+        elif result['image']:
+            body = f"<img src=\"data:image/png;base64,{result['image']}\" alt=\"{escaped}\">"
+        else:
+            body = f"<p>{html.escape(empty_text)}</p>"
+        sections.append(f"<section id=\"{key}\"><h2>{escaped}</h2>{body}</section>")
+        rows.append(f"<tr><td><a href=\"#{key}\">{escaped}</a></td><td>{result['load'] * 1000:.0f}</td>"
+                    f"<td>{result['build'] * 1000:.0f}</td><td>{result['write'] * 1000:.0f}</td></tr>")
+    
+    name = html.escape(os.path.basename(store_path))
+    with open(report_path, 'w', encoding='utf-8') as file:
+        file.write(f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Business Analytics - {name}</title>
+<style>
+body {{ font-family: Arial, sans-serif; background: #f0f0f0; margin: 20px; }}
+h1 {{ background: #2c3e50; color: white; padding: 12px; }}
+section {{ background: white; margin: 20px 0; padding: 10px; }}
+img {{ max-width: 100%; }}
+table {{ border-collapse: collapse; background: white; }}
+td, th {{ border: 1px solid #ccc; padding: 4px 10px; text-align: right; }}
+.error {{ color: #e74c3c; }}
+</style>
+</head>
+<body>
+<h1>📈 Business Analytics - {name}</h1>
+<p>Generated {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
+<table>
+<tr><th>Page</th><th>Load ms</th><th>Build ms</th><th>Write ms</th></tr>
+{chr(10).join(rows)}
+</table>
+{chr(10).join(sections)}
+</body>
+</html>
+""")
+
+
+def export_reports(store_paths, out_dir, formats=EXPORT_FORMATS, budgets=None, workers=None):
+    """Render every analytics page of each store file to out_dir, in parallel worker processes.
+    
+    Each store gets a folder under out_dir named after the file, holding
+    <page>.png and <page>.pdf and an index.html with every page inlined.
+    Every (store, page) is a job of its own, and a worker loads a store
+    once for the pages of it that it draws. Pages are drawn with Agg, so
+    no display is needed. Yields a dict per page as it finishes with
+    store, page, load/build/write seconds, files and error (None on
+    success); the page that completes a store's index.html also carries
+    its path as 'report'.
+    """
+    for store_path in store_paths:
+        if not store_exists(store_path):
+            raise ValueError(f"{store_path} does not exist")
+    budgets = dict(CHART_BUDGETS, **(budgets or {}))
+    
+    folders = {}
+    for store_path in dict.fromkeys(store_paths):
+        name = os.path.splitext(os.path.basename(os.path.normpath(store_path)))[0] or 'store'
+        folder, number = os.path.join(out_dir, name), 1
+        while folder in folders.values():
+            number += 1
+            folder = os.path.join(out_dir, f"{name}-{number}")
+        os.makedirs(folder, exist_ok=True)
+        folders[store_path] = folder
+    
+    # Store-major order keeps a store's pages together on the workers
+    jobs = [(store_path, page) for store_path in folders for page in ANALYTICS_PAGES]
+    finished = {store_path: [] for store_path in folders}
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(jobs)),
+                             initializer=init_export_worker) as pool:
+        futures = {pool.submit(export_store_page, store_path, page[0], os.path.join(folders[store_path], page[0]),
+                               tuple(formats), budgets): (store_path, page)
+                   for store_path, page in jobs}
+        for future in as_completed(futures):
+            store_path, page = futures[future]
+            try:
+                result = dict(future.result(), error=None)
+            except Exception as error:
+                result = {'load': 0.0, 'build': 0.0, 'write': 0.0, 'files': [], 'image': None,
+                          'error': str(error) or type(error).__name__}
+            result.update(store=store_path, page=page[0], report=None)
+            finished[store_path].append((page, result))
+            if len(finished[store_path]) == len(ANALYTICS_PAGES) and 'html' in formats:
+                result['report'] = os.path.join(folders[store_path], 'index.html')
+                write_export_html(result['report'], store_path,
+                                  sorted(finished[store_path], key=lambda item: ANALYTICS_PAGES.index(item[0])))
+            yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="E-commerce Store Manager")
+    parser.add_argument('--data', default="store_data.json",
+                        help="store file (.json, or .db/.sqlite for SQLite)")
+    parser.add_argument('--orders', help="import orders from a CSV/JSON file without opening the GUI")
+    parser.add_argument('--best-effort', action='store_true',
+                        help="apply the valid orders even if some are rejected")
+    parser.add_argument('--bench-orders', type=int, nargs='?', const=2000, metavar='ORDERS',
+                        help="stress-test concurrent orders on a scratch store in --data's format and exit")
+    parser.add_argument('--convert-to', metavar='PATH',
+                        help="copy the store to PATH (.json, .db or .npstore) and exit")
+    parser.add_argument('--autosave', type=float, default=5.0, metavar='SECONDS',
+                        help="save in the background at most this often after changes (0 turns it off)")
+    parser.add_argument('--serve', type=int, nargs='?', const=8765, metavar='PORT',
+                        help="also take orders as JSON over HTTP on 127.0.0.1:PORT (default 8765)")
+    parser.add_argument('--headless', action='store_true',
+                        help="with --serve, run the order endpoint without opening the GUI")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print import, load_data and window build times")
+    parser.add_argument('--no-prewarm', action='store_true',
+                        help="load the analytics libraries only when Analytics is opened")
+    parser.add_argument('--export', metavar='DIR',
+                        help="render the analytics pages to DIR as PNG/PDF/HTML without a display and exit")
+    parser.add_argument('--export-stores', nargs='+', metavar='STORE',
+                        help="with --export, the store files to render (default: --data)")
+    parser.add_argument('--export-formats', nargs='+', choices=EXPORT_FORMATS, default=list(EXPORT_FORMATS),
+                        help="with --export, the files to write (default: all)")
+    parser.add_argument('--export-workers', type=int, metavar='N',
+                        help="with --export, how many worker processes render pages (default: one per CPU)")
+    parser.add_argument('--dashboard-interval', type=float, default=1.0, metavar='SECONDS',
+                        help="while orders arrive, refresh an open analytics dashboard at most this often")
+    parser.add_argument('--chart-budget', action='append', default=[], metavar='CHART=N',
+                        help=f"most points/bars/labels one chart draws; repeatable (charts: {', '.join(CHART_BUDGETS)})")
+    args = parser.parse_args(argv)
+    try:
+        chart_budgets = parse_chart_budgets(args.chart_budget)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.export_workers is not None and args.export_workers < 1:
+        parser.error("--export-workers must be at least 1")
+    if args.bench_orders is not None and args.bench_orders < 1:
+        parser.error("--bench-orders must be at least 1")
+    
+    if args.convert_to:
+        try:
+            product_count, sales_count = convert_store(args.data, args.convert_to)
+        except (OSError, ValueError) as error:
+            print(f"❌ {error}")
+            return 1
+        print(f"✓ Copied {product_count} products and {sales_count} sales to {args.convert_to}")
+        return 0
+    
+    if args.bench_orders is not None:
+        print("Threads   Orders  Accepted     Seconds   Orders/s  Check")
+        failed = False
+        for result in run_order_benchmark(args.data, args.bench_orders):
+            failed = failed or bool(result['problems'])
+            check = "✓ no overselling" if not result['problems'] else f"❌ {'; '.join(result['problems'][:3])}"
+            print(f"{result['threads']:>7}{result['orders']:>9}{result['accepted']:>10}"
+                  f"{result['seconds']:>12.3f}{result['orders_per_second']:>11,.0f}  {check}")
+        return 1 if failed else 0
+    
+    if args.orders:
+        try:
+            result = import_orders(args.data, args.orders, atomic=not args.best_effort)
+        except (OSError, ValueError) as error:
+            print(f"❌ {error}")
+            return 1
+        return 1 if result['rejected'] else 0
+    
+    if args.export:
+        started = time.perf_counter()
+        failed = pages = 0
+        busy = 0.0
+        try:
+            for result in export_reports(args.export_stores or [args.data], args.export, args.export_formats,
+                                         chart_budgets, args.export_workers):
+                if not pages:
+                    print(f"{'Store':<24}{'Page':<13}{'Load ms':>9}{'Build ms':>10}{'Write ms':>10}  Result")
+                pages += 1
+                busy += result['load'] + result['build'] + result['write']
+                if result['error']:
+                    failed += 1
+                    status = f"❌ {result['error']}"
+                elif result['files']:
+                    status = "✓ " + ", ".join(os.path.basename(path) for path in result['files'])
+                else:
+                    status = "- no data"
+                print(f"{result['store'][-23:]:<24}{result['page']:<13}"
+                      f"{result['load'] * 1000:>9.0f}{result['build'] * 1000:>10.0f}{result['write'] * 1000:>10.0f}"
+                      f"  {status}")
+                if result['report']:
+                    print(f"   📄 {result['report']}")
+        except (OSError, ValueError) as error:
+            print(f"❌ {error}")
+            return 1
+        elapsed = time.perf_counter() - started
+        print(f"Exported {pages} pages in {elapsed:.2f}s ({busy:.2f}s of rendering across workers)"
+              + (f" | {failed} failed" if failed else ""))
+        return 1 if failed else 0
+    
+    if args.headless:
+        if args.serve is None:
+            parser.error("--headless needs --serve")
+        try:
+            serve_orders(args.data, port=args.serve, autosave_interval=args.autosave)
+        except (OSError, ValueError) as error:
+            print(f"❌ {error}")
+            return 1
+        return 0
+    
     print("="*60)
     print("🚀 E-COMMERCE STORE MANAGEMENT SYSTEM")
     print("   Complete with Data Visualization")
@@ -938,8 +5451,16 @@ def main():
     print("   4. Generate reports and visualizations")
     print("\n" + "="*60)
     
-    app = EcommerceStoreComplete()
+    try:
+        app = EcommerceStoreComplete(args.data, prewarm_analytics=not args.no_prewarm,
+                                     profile_startup=args.profile_startup, autosave_interval=args.autosave,
+                                     chart_budgets=chart_budgets, dashboard_interval=args.dashboard_interval)
+    except (OSError, ValueError) as error:
+        print(f"❌ Could not load {args.data}: {error}")
+        return 1
+    if args.serve is not None:
+        app.start_order_intake(args.serve)
     app.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
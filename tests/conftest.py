@@ -0,0 +1,50 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+MODULE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ecommerce_viz (2).py")
+
+
+def load_module():
+    """Import the app script, whose file name is not a valid module name"""
+    if 'ecommerce_viz' not in sys.modules:
+        spec = importlib.util.spec_from_file_location('ecommerce_viz', MODULE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['ecommerce_viz'] = module
+        spec.loader.exec_module(module)
+    return sys.modules['ecommerce_viz']
+
+
+@pytest.fixture(scope='session')
+def ecom():
+    return load_module()
+
+
+@pytest.fixture
+def make_store(ecom):
+    """make_store(path, stock=None, sales=()) -> loaded StoreEngine with products and sales recorded"""
+    engines = []
+
+    def make(path, stock=None, sales=()):
+        engine = ecom.StoreEngine(str(path), create=True)
+        engine.load()
+        for product_id, quantity in (stock or {}).items():
+            engine.add_product(product_id, f"Product {product_id}", 2.5, quantity)
+        for product_id, quantity in sales:
+            engine.record_sale(product_id, quantity)
+        engines.append(engine)
+        return engine
+
+    def reopen(path):
+        """The store at path as a new engine would load it"""
+        engine = ecom.StoreEngine(str(path))
+        engine.load()
+        engines.append(engine)
+        return engine
+
+    make.reopen = reopen
+    yield make
+    for engine in engines:
+        engine.close()
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import numpy as np
+
+
+def test_cache_computes_each_version_once(ecom):
+    cache = ecom.AnalyticsCache()
+    calls = []
+
+    def compute(value):
+        def run():
+            calls.append(value)
+            return value
+        return run
+
+    assert cache.get('totals', 1, compute('v1')) == 'v1'
+    assert cache.get('totals', 1, compute('again')) == 'v1'
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.get('totals', 2, compute('v2')) == 'v2'
+    assert calls == ['v1', 'v2']
+    # The newer version replaces the older one
+    assert ('totals', 1) not in cache.entries
+    assert cache.latest('totals') == (2, 'v2')
+    assert cache.latest('frame') is None
+
+
+def test_cache_ignores_results_for_older_versions(ecom):
+    cache = ecom.AnalyticsCache()
+    cache.get('totals', 5, lambda: 'new')
+    assert cache.get('frame', 3, lambda: 'stale') == 'stale'
+    assert ('frame', 3) not in cache.entries
+    assert cache.latest('totals') == (5, 'new')
+
+
+def test_cache_evicts_least_recently_used(ecom):
+    cache = ecom.AnalyticsCache(max_bytes=3 * 8000 + 500)
+    for name in ('a', 'b', 'c'):
+        cache.get(name, 1, lambda: np.zeros(1000))
+    cache.get('a', 1, lambda: None)
+    cache.get('d', 1, lambda: np.zeros(1000))
+    assert sorted(name for name, _ in cache.entries) == ['a', 'c', 'd']
+    assert cache.total_bytes == sum(size for _, size in cache.entries.values())
+    # A result bigger than the whole cache is returned but not kept
+    cache.get('huge', 2, lambda: np.zeros(10000))
+    assert sorted(name for name, _ in cache.entries) == ['a', 'c', 'd']
+
+
+def test_concurrent_gets_share_one_computation(ecom):
+    cache = ecom.AnalyticsCache()
+    calls = []
+    barrier = threading.Barrier(6)
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'frame'
+
+    def worker():
+        barrier.wait()
+        results.append(cache.get('frame', 1, compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['frame'] * 6
+    assert len(calls) == 1
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+
+def reference_lttb(values, budget):
+    """Largest-Triangle-Three-Buckets written out point by point"""
+    count = len(values)
+    edges = [int(edge) for edge in np.linspace(1, count - 1, budget - 1)] + [count]
+    kept = [0]
+    for i in range(budget - 2):
+        bucket = range(edges[i], edges[i + 1])
+        following = range(edges[i + 1], edges[i + 2])
+        mean_x = sum(following) / len(following)
+        mean_y = sum(values[j] for j in following) / len(following)
+        a = kept[-1]
+        areas = [abs((a - mean_x) * (values[x] - values[a]) - (a - x) * (mean_y - values[a])) for x in bucket]
+        kept.append(bucket[areas.index(max(areas))])
+    return kept + [count - 1]
+
+
+@pytest.mark.parametrize('count, budget', [(1000, 50), (101, 100), (5000, 7), (37, 3)])
+def test_lttb_matches_reference(ecom, count, budget):
+    values = np.cumsum(np.random.default_rng(count).normal(size=count))
+    kept = ecom.lttb_indices(values, budget)
+    assert kept.tolist() == reference_lttb(values.tolist(), budget)
+    assert len(kept) == budget
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_lttb_keeps_a_lone_spike(ecom):
+    values = np.zeros(2000)
+    values[1234] = 50.0
+    assert 1234 in ecom.lttb_indices(values, 40)
+
+
+def test_minmax_keeps_each_buckets_extremes(ecom):
+    values = np.random.default_rng(1).normal(size=3000)
+    values[[17, 2500]] = [-40.0, 40.0]
+    budget = 60
+    kept = ecom.minmax_indices(values, budget)
+    assert len(kept) <= budget
+    assert np.all(np.diff(kept) > 0)
+    edges = np.linspace(0, len(values), budget // 2 + 1).astype(int)
+    for start, end in zip(edges[:-1], edges[1:]):
+        assert start + values[start:end].argmin() in kept
+        assert start + values[start:end].argmax() in kept
+    assert {17, 2500} <= set(kept.tolist())
+
+
+@pytest.mark.parametrize('function', ['lttb_indices', 'minmax_indices'])
+def test_short_series_are_kept_whole(ecom, function):
+    downsample = getattr(ecom, function)
+    assert downsample(np.arange(10.0), 10).tolist() == list(range(10))
+    assert downsample(np.arange(10.0), 2).tolist() == list(range(10))
+    assert downsample(np.array([]), 10).tolist() == []
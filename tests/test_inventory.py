@@ -0,0 +1,133 @@
+import random
+import re
+
+import pytest
+
+WORDS = ['red', 'blue', 'steel', 'mug', 'cable', 'usb', 'lamp', 'desk', 'pro', 'mini', 'bluetooth', 'speaker']
+
+
+def random_catalog(rng, count):
+    return {
+        f"{rng.choice(['SKU', 'AB', 'X'])}{i:04d}": {
+            'name': " ".join(rng.choice(WORDS).title() for _ in range(rng.randint(1, 3))),
+            'price': rng.randint(1, 50) * 0.5,
+            'quantity': rng.randint(0, 30),
+            'total_sold': rng.randint(0, 30)
+        }
+        for i in range(count)
+    }
+
+
+def brute_matches(products, query):
+    """What InventoryIndex.matches() promises, checked product by product"""
+    def term_matches(term, product_id, name):
+        if product_id.lower().startswith(term):
+            return True
+        words = re.findall(r'\w+', name.lower())
+        if len(term) < 3:
+            return any(word.startswith(term) for word in words)
+        return any(term in word for word in words)
+
+    terms = query.lower().split()
+    return sorted(pid for pid, p in products.items() if all(term_matches(t, pid, p['name']) for t in terms))
+
+
+QUERIES = ['', 'blue', 'BLU', 'e', 'oo', 'sku00', 'x01 lamp', 'tooth', 'red mug', 'eel', 'ab', 'zzz', 'pro mini desk']
+
+
+def test_search_matches_brute_force(ecom):
+    rng = random.Random(3)
+    products = random_catalog(rng, 400)
+    index = ecom.InventoryIndex(products)
+    for query in QUERIES:
+        assert index.matches(query) == brute_matches(products, query), query
+
+    # Kept in step with catalog changes
+    for product_id in rng.sample(sorted(products), 50):
+        del products[product_id]
+        index.sync([product_id])
+    added = random_catalog(random.Random(4), 60)
+    added = {f"N{product_id}": product for product_id, product in added.items()}
+    products.update(added)
+    index.sync(added)
+    for query in QUERIES:
+        assert index.matches(query) == brute_matches(products, query), query
+
+
+@pytest.mark.parametrize('column', ['ID', 'Name', 'Price', 'Stock', 'Sold', 'Revenue'])
+def test_pages_follow_the_sort_order(ecom, column):
+    rng = random.Random(5)
+    products = random_catalog(rng, 200)
+    index = ecom.InventoryIndex(products)
+    keys = {
+        'ID': lambda pid: pid,
+        'Name': lambda pid: (products[pid]['name'].lower(), pid),
+        'Price': lambda pid: products[pid]['price'],
+        'Stock': lambda pid: products[pid]['quantity'],
+        'Sold': lambda pid: products[pid]['total_sold'],
+        'Revenue': lambda pid: products[pid]['price'] * products[pid]['total_sold']
+    }
+    wanted = brute_matches(products, 'blue')
+    total, page = index.page('blue', column, offset=5, limit=10)
+    assert total == len(wanted)
+    assert [keys[column](pid) for pid in page] == sorted(keys[column](pid) for pid in wanted)[5:15]
+    total, page = index.page('blue', column, descending=True, limit=10)
+    assert [keys[column](pid) for pid in page] == sorted((keys[column](pid) for pid in wanted), reverse=True)[:10]
+
+    # Stock changes re-sort the value columns
+    for product_id in rng.sample(wanted, 5):
+        products[product_id]['quantity'] += 100
+        index.sync([product_id])
+    total, page = index.page('blue', column, limit=len(wanted))
+    assert [keys[column](pid) for pid in page] == sorted(keys[column](pid) for pid in wanted)
+
+
+def test_stock_levels_match_a_scan(ecom):
+    rng = random.Random(6)
+    products = random_catalog(rng, 300)
+    for product_id in rng.sample(sorted(products), 40):
+        products[product_id]['reorder_point'] = rng.randint(0, 20)
+    levels = ecom.StockLevels(products)
+
+    def check():
+        for threshold in (0, 3, 10, 30):
+            wanted = sorted((p['quantity'], pid) for pid, p in products.items() if p['quantity'] <= threshold)
+            assert levels.at_or_below(threshold) == (len(wanted), [pid for _, pid in wanted])
+            assert levels.at_or_below(threshold, limit=5) == (len(wanted), [pid for _, pid in wanted[:5]])
+        low = sorted((p['quantity'], pid) for pid, p in products.items()
+                     if p['quantity'] <= p.get('reorder_point', ecom.StockLevels.DEFAULT_REORDER_POINT))
+        assert levels.below_reorder_point() == (len(low), [pid for _, pid in low])
+
+    check()
+    for _ in range(200):
+        product_id = rng.choice(sorted(products))
+        products[product_id]['quantity'] = rng.randint(0, 30)
+        levels.update(product_id)
+    for product_id in rng.sample(sorted(products), 20):
+        del products[product_id]
+        levels.update(product_id)
+    check()
+
+
+def test_low_stock_alerts_once_per_crossing(make_store, tmp_path):
+    engine = make_store(tmp_path / 'store.json', {'a': 10, 'b': 10})
+    engine.set_reorder_point('b', 8)
+    alerts = []
+
+    def listener(event, product_ids):
+        if event == 'low_stock':
+            alerts.append(product_ids)
+
+    engine.subscribe(listener)
+
+    engine.record_sale('a', 4)
+    assert alerts == []
+    engine.record_sale('a', 1)
+    engine.record_sale('a', 1)
+    engine.record_sale('b', 2)
+    assert alerts == [{'a'}, {'b'}]
+    engine.set_stock('a', 20)
+    engine.set_stock('a', 2)
+    assert alerts == [{'a'}, {'b'}, {'a'}]
+    assert engine.low_stock() == (2, ['a', 'b'])
+    assert engine.low_stock(threshold=8, limit=1) == (2, ['a'])
@@ -0,0 +1,114 @@
+import json
+import shutil
+
+import pytest
+
+
+def journal_lines(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+def test_replay_drops_torn_tail(make_store, tmp_path):
+    store = tmp_path / 'store.json'
+    engine = make_store(store, {'a': 10, 'b': 10}, [('a', 1), ('b', 2), ('a', 3)])
+    engine.save()
+    engine.record_sale('b', 1)
+    journal = tmp_path / 'store.journal'
+    intact = journal.stat().st_size
+    with open(journal, 'a') as file:
+        file.write('{"type": "sale", "seq": 4, "sale": {"date": "2024-')
+
+    loaded = make_store.reopen(store)
+    assert len(loaded.sales_history) == 4
+    assert loaded.products['a']['quantity'] == 6
+    assert loaded.products['b']['quantity'] == 7
+    assert journal.stat().st_size == intact
+
+    # The repaired journal takes new sales cleanly
+    engine = make_store(store)
+    engine.record_sale('a', 1)
+    assert len(make_store.reopen(store).sales_history) == 5
+
+
+def test_compaction_starts_next_generation(make_store, tmp_path):
+    store = tmp_path / 'store.json'
+    engine = make_store(store, {'a': 100})
+    engine.storage.journal.compact_every = 3
+    for _ in range(4):
+        engine.record_sale('a', 1)
+    engine.save()
+
+    assert engine.storage.journal.generation == 1
+    assert not (tmp_path / 'store.journal').exists()
+    with open(store) as file:
+        snapshot = json.load(file)
+    assert snapshot['journal_generation'] == 1
+    assert len(snapshot['sales_history']) == 4
+
+    engine.record_sale('a', 2)
+    lines = journal_lines(tmp_path / 'store.journal')
+    assert lines[0] == {'type': 'header', 'generation': 1}
+    assert [line['seq'] for line in lines[1:]] == [4]
+
+    loaded = make_store.reopen(store)
+    assert len(loaded.sales_history) == 5
+    assert loaded.products['a']['quantity'] == 94
+    assert loaded.total_revenue == 6 * 2.5
+
+
+def test_previous_generation_journal_is_not_applied_twice(make_store, tmp_path):
+    store = tmp_path / 'store.json'
+    engine = make_store(store, {'a': 100}, [('a', 1), ('a', 1)])
+    engine.save()
+    journal = tmp_path / 'store.journal'
+    shutil.copy(journal, tmp_path / 'before.journal')
+    engine.storage.journal.compact_every = 1
+    engine.save()
+    # As if the process died between replacing the snapshot and restarting the journal
+    shutil.copy(tmp_path / 'before.journal', journal)
+
+    loaded = make_store.reopen(store)
+    assert len(loaded.sales_history) == 2
+    assert loaded.products['a']['quantity'] == 98
+    assert not journal.exists() or journal_lines(journal)[0]['generation'] == 1
+
+
+@pytest.mark.parametrize('extension', ['.json', '.npstore'])
+def test_catalog_edits_replay_in_order_with_sales(make_store, tmp_path, extension):
+    store = tmp_path / f"store{extension}"
+    engine = make_store(store, {'a': 10})
+    engine.save()
+    engine.set_stock('a', 100)
+    engine.record_sale('a', 50)
+    engine.add_product('b', "Product b", 2.5, 5)
+    engine.record_sale('b', 2)
+    engine.set_reorder_point('b', 1)
+    # Closed without saving, as after a crash
+
+    loaded = make_store.reopen(store)
+    assert loaded.products['a']['quantity'] == 50
+    assert loaded.products['b']['quantity'] == 3
+    assert loaded.products['b']['reorder_point'] == 1
+    assert len(loaded.sales_history) == 2
+    assert loaded.total_revenue == 52 * 2.5
+
+    engine.remove_product('b')
+    assert 'b' not in make_store.reopen(store).products
+
+
+def test_compaction_carries_edits_made_after_the_snapshot(make_store, tmp_path):
+    store = tmp_path / 'store.json'
+    engine = make_store(store, {'a': 10}, [('a', 1)])
+    state = engine.snapshot_state()
+    engine.set_stock('a', 40)
+    engine.record_sale('a', 2)
+    engine.storage.journal.compact_every = 1
+    engine.save(state)
+
+    lines = journal_lines(tmp_path / 'store.journal')
+    assert lines[0] == {'type': 'header', 'generation': 1}
+    assert [line['type'] for line in lines[1:]] == ['product', 'sale']
+    loaded = make_store.reopen(store)
+    assert loaded.products['a']['quantity'] == 38
+    assert len(loaded.sales_history) == 2
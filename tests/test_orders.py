@@ -0,0 +1,94 @@
+import json
+import random
+import threading
+
+import pytest
+
+
+@pytest.mark.parametrize('extension', ['.json', '.db'])
+def test_concurrent_order_groups_never_oversell(make_store, tmp_path, extension):
+    stock = {f"p{i}": 40 for i in range(5)}
+    store = tmp_path / ('store' + extension)
+    engine = make_store(store, stock)
+    barrier = threading.Barrier(8)
+    placed = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _ in range(30):
+            batches = [[(rng.choice(list(stock)), rng.randint(1, 3)) for _ in range(rng.randint(1, 3))]
+                       for _ in range(rng.randint(1, 3))]
+            for sale_records, _ in engine.place_order_groups(batches, atomic=rng.random() < 0.5):
+                placed.extend(sale_records)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sold = {product_id: 0 for product_id in stock}
+    for sale in placed:
+        sold[sale['product_id']] += sale['quantity']
+    for product_id, product in engine.products.items():
+        assert product['quantity'] >= 0
+        assert product['quantity'] + sold[product_id] == stock[product_id]
+        assert product['total_sold'] == sold[product_id]
+    assert len(engine.sales_history) == len(placed)
+
+    engine.save()
+    loaded = make_store.reopen(store)
+    assert loaded.products == engine.products
+    assert len(loaded.sales_history) == len(placed)
+
+
+@pytest.mark.parametrize('quantity', [True, False, 2.5, float('inf'), float('nan'), 'abc', None, [1]])
+def test_validate_orders_rejects_bad_quantities(make_store, tmp_path, quantity):
+    engine = make_store(tmp_path / 'store.json', {'a': 10})
+    accepted, rejected = engine.validate_orders([{'product_id': 'a', 'quantity': quantity}, ('a', 1)])
+    assert accepted == [('a', 1)]
+    assert [(index, reason) for index, _, reason in rejected] == [(0, "Invalid quantity")]
+
+
+def test_validate_orders_accepts_whole_numbers(make_store, tmp_path):
+    engine = make_store(tmp_path / 'store.json', {'a': 10})
+    accepted, rejected = engine.validate_orders([('a', '3'), ('a', 2.0), ('a', 0), ('a', 6)])
+    assert accepted == [('a', 3), ('a', 2)]
+    assert [(index, reason) for index, _, reason in rejected] == [
+        (2, "Quantity must be positive"), (3, "Insufficient stock: 5 available")]
+
+
+def test_read_orders_rejects_json_object(ecom, tmp_path):
+    path = tmp_path / 'orders.json'
+    path.write_text(json.dumps({'orders': [{'product_id': 'a', 'quantity': 1}]}))
+    with pytest.raises(ValueError, match="must hold a JSON list"):
+        ecom.read_orders(str(path))
+
+
+def test_malformed_orders_are_rejected(make_store, tmp_path):
+    engine = make_store(tmp_path / 'store.json', {'a': 10})
+    result = engine.process_orders([5, None, ('P1',), ('a', 2)], atomic=False)
+    assert result['accepted'] == 1
+    assert [(index, reason) for index, _, reason in result['rejected']] == [
+        (0, "Invalid order"), (1, "Invalid order"), (2, "Invalid order")]
+    assert engine.products['a']['quantity'] == 8
+
+    assert engine.place_orders([5, ('a', 1)]) == ([], [(0, 5, "Invalid order")])
+    assert engine.products['a']['quantity'] == 8
+
+
+def test_import_orders_with_non_object_entries(ecom, make_store, tmp_path, capsys):
+    store = tmp_path / 'store.json'
+    make_store(store, {'a': 10}).close()
+    orders = tmp_path / 'orders.json'
+    orders.write_text(json.dumps([1, "a", None]))
+    ecom.import_orders(str(store), str(orders), atomic=False)
+    assert "Accepted: 0 | Rejected: 3" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('orders', ['0', '-5'])
+def test_bench_orders_must_be_positive(ecom, tmp_path, capsys, orders):
+    with pytest.raises(SystemExit):
+        ecom.main(['--data', str(tmp_path / 'store.json'), '--bench-orders', orders])
+    assert "--bench-orders must be at least 1" in capsys.readouterr().err
@@ -0,0 +1,78 @@
+import calendar
+import random
+import time
+
+
+def sales_between(first_day, last_day, count, seed, products='abcd'):
+    """count sales in time order spread over March 2024 days first_day..last_day"""
+    rng = random.Random(seed)
+    start = calendar.timegm((2024, 3, first_day, 0, 0, 0))
+    end = calendar.timegm((2024, 3, last_day, 23, 59, 59))
+    sales = []
+    for timestamp in sorted(rng.randint(start, end) for _ in range(count)):
+        product = rng.choice(products)
+        quantity = rng.randint(1, 4)
+        sales.append({
+            'date': time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp)),
+            'product_id': product,
+            'product_name': f"Product {product}",
+            'quantity': quantity,
+            'unit_price': 2.5,
+            'total_amount': 2.5 * quantity
+        })
+    return sales
+
+
+def day(number):
+    return calendar.timegm((2024, 3, number, 0, 0, 0))
+
+
+RANGES = [(None, None), (day(3), day(10)), (day(9), None), (None, day(2)), (day(25), day(26))]
+
+
+def assert_same_reports(index, fresh, product_ids):
+    assert index.time_span() == fresh.time_span()
+    for product_id in product_ids:
+        assert index.has_product(product_id) == fresh.has_product(product_id)
+        for start, end in RANGES:
+            assert index.summary(start, end, product_id) == fresh.summary(start, end, product_id)
+            for offset in (0, 7):
+                assert (index.page(start, end, product_id, offset, 10)
+                        == fresh.page(start, end, product_id, offset, 10))
+
+
+def test_extended_index_matches_a_rebuild(ecom):
+    ledger = ecom.SalesLedger.from_records(sales_between(1, 12, 300, seed=1))
+    index = ledger.snapshot().time_index()
+    # A per-product index built before the extension has to be extended too
+    index.summary(product_id='a')
+
+    for seed, (first, last) in enumerate([(13, 15), (16, 16), (17, 28)], 2):
+        ledger.extend(sales_between(first, last, 150, seed, products='abcde'))
+        extended = ledger.snapshot().time_index(index)
+        assert extended is index
+        assert_same_reports(index, ledger.snapshot().time_index(), [None, 'a', 'b', 'e', 'zz'])
+
+
+def test_out_of_order_sales_rebuild_the_index(ecom):
+    ledger = ecom.SalesLedger.from_records(sales_between(5, 12, 100, seed=1))
+    index = ledger.snapshot().time_index()
+    ledger.extend(sales_between(1, 2, 10, seed=2))
+    rebuilt = ledger.snapshot().time_index(index)
+    assert rebuilt is not index
+    assert_same_reports(rebuilt, ledger.snapshot().time_index(), [None, 'a'])
+    assert rebuilt.summary(None, day(3))[0] == 10
+
+
+def test_sqlite_index_matches_the_ledger(ecom, make_store, tmp_path):
+    engine = make_store(tmp_path / 'store.db', {'a': 1000, 'b': 1000})
+    for product_id, quantity in [('a', 2), ('b', 1), ('a', 3)] * 20:
+        engine.record_sale(product_id, quantity)
+    index = engine.sales_history.snapshot().time_index()
+    index.summary(product_id='a')
+    engine.record_sale('b', 4)
+
+    view = engine.sales_history.snapshot()
+    extended = view.time_index(index)
+    ledger = ecom.SalesLedger.from_records(list(view))
+    assert_same_reports(extended, ledger.time_index(), [None, 'a', 'b', 'zz'])
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+
+def random_sales(count, seed=0):
+    """Sales over a few weeks, with amounts exact in binary so sums agree in any order"""
+    rng = random.Random(seed)
+    sales = []
+    for i in range(count):
+        product = rng.choice('abcde')
+        quantity = rng.randint(1, 4)
+        sales.append({
+            'date': f"2024-03-{1 + i * 20 // count:02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+            'product_id': product,
+            'product_name': f"Product {product}",
+            'quantity': quantity,
+            'unit_price': 2.5,
+            'total_amount': 2.5 * quantity
+        })
+    return sales
+
+
+def test_incremental_rollups_match_a_rebuild(ecom):
+    sales = random_sales(500)
+    rollups = ecom.SalesRollups()
+    for sale in sales:
+        rollups.add(sale)
+    rebuilt = ecom.SalesRollups.from_ledger(ecom.SalesLedger.from_records(sales))
+    assert rollups.to_dict() == rebuilt.to_dict()
+    assert rollups.sales_count == 500
+    assert sum(t for _, _, t in rollups.daily.values()) == 500
+    assert ecom.SalesRollups.from_dict(rollups.to_dict()).to_dict() == rollups.to_dict()
+
+
+def test_empty_ledger_has_empty_rollups(ecom):
+    rollups = ecom.SalesRollups.from_ledger(ecom.SalesLedger())
+    assert rollups.to_dict() == {'sales_count': 0, 'daily': {}, 'products': {}}
+
+
+@pytest.mark.parametrize('extension', ['.json', '.npstore', '.db'])
+def test_stored_rollups_match_a_rebuild(ecom, make_store, tmp_path, extension):
+    store = tmp_path / f"store{extension}"
+    engine = make_store(store, {product: 1000 for product in 'abcde'})
+    for sale in random_sales(200, seed=1):
+        engine.record_sale(sale['product_id'], sale['quantity'])
+    engine.save()
+
+    loaded = make_store.reopen(store)
+    rebuilt = ecom.SalesRollups.from_ledger(ecom.SalesLedger.from_records(list(loaded.sales_history)))
+    assert loaded.rollups.to_dict() == rebuilt.to_dict()
+    assert loaded.rollups.to_dict() == engine.rollups.to_dict()
@@ -0,0 +1,46 @@
+import json
+import socket
+
+import pytest
+
+
+@pytest.fixture
+def server(ecom, make_store, tmp_path):
+    engine = make_store(tmp_path / 'store.json', {'a': 10})
+    server = ecom.OrderIntakeServer(engine, port=0, batch_window=0)
+    server.start_in_thread()
+    yield server
+    server.stop_in_thread()
+
+
+def exchange(server, data):
+    """Send raw bytes and return (status, JSON body) of the reply"""
+    with socket.create_connection((server.host, server.port), timeout=5) as sock:
+        sock.sendall(data)
+        reply = b''
+        while chunk := sock.recv(65536):
+            reply += chunk
+    head, _, body = reply.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+def post(body):
+    data = json.dumps(body).encode()
+    return (b"POST /orders HTTP/1.1\r\nConnection: close\r\n"
+            b"Content-Length: %d\r\n\r\n" % len(data) + data)
+
+
+def test_orders_and_bad_requests(server):
+    status, body = exchange(server, post({'product_id': 'a', 'quantity': 3}))
+    assert status == 200
+    assert server.engine.products['a']['quantity'] == 7
+
+    assert exchange(server, b"GARBAGE\r\n\r\n")[0] == 400
+    assert exchange(server, b"GET /" + b"x" * 70000 + b" HTTP/1.1\r\n\r\n")[0] == 400
+    assert exchange(server, b"GET /metrics HTTP/1.1\r\nX-Big: " + b"x" * 70000 + b"\r\n\r\n")[0] == 431
+    assert exchange(server, b"POST /orders HTTP/1.1\r\nContent-Length: -1\r\n\r\n")[0] == 400
+    assert exchange(server, post([5]))[0] == 400
+
+    status, body = exchange(server, b"GET /metrics HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert status == 200
+    assert body['accepted'] == 1
@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+
+import pytest
+
+
+def store_state(engine):
+    return engine.products, list(engine.sales_history), round(engine.total_revenue, 6)
+
+
+def test_convert_round_trip(ecom, make_store, tmp_path):
+    source = make_store(tmp_path / 'store.json', {'a': 50, 'b': 20, 'c': 5},
+                        [('a', 3), ('b', 1), ('a', 2), ('c', 5)])
+    source.set_reorder_point('b', 7)
+    source.save()
+    expected = store_state(make_store.reopen(tmp_path / 'store.json'))
+
+    previous = tmp_path / 'store.json'
+    for name in ('copy.db', 'copy.npstore', 'copy.json'):
+        assert ecom.convert_store(str(previous), str(tmp_path / name)) == (3, 4)
+        assert store_state(make_store.reopen(tmp_path / name)) == expected
+        previous = tmp_path / name
+
+
+def test_convert_refuses_existing_destination(ecom, make_store, tmp_path):
+    make_store(tmp_path / 'store.json', {'a': 1}).save()
+    (tmp_path / 'taken.db').write_bytes(b'')
+    with pytest.raises(ValueError):
+        ecom.convert_store(str(tmp_path / 'store.json'), str(tmp_path / 'taken.db'))
+
+
+def test_missing_npstore_is_not_created(ecom, tmp_path):
+    engine = ecom.StoreEngine(str(tmp_path / 'typo.npstore'))
+    with pytest.raises(FileNotFoundError):
+        engine.load()
+    assert not (tmp_path / 'typo.npstore').exists()
+
+
+class FailingConnection:
+    """Wraps a sqlite3 connection and fails the next stock update, rolling the transaction back"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.fail = True
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def __enter__(self):
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self.conn.__exit__(*exc_info)
+
+    def executemany(self, sql, params):
+        if self.fail and sql.startswith("UPDATE products"):
+            self.fail = False
+            raise sqlite3.OperationalError("disk I/O error")
+        return self.conn.executemany(sql, params)
+
+
+def test_failed_sqlite_write_is_saved_in_full(make_store, tmp_path):
+    store = tmp_path / 'store.db'
+    engine = make_store(store, {'a': 10})
+    engine.storage.conn = engine.storage.sales_view._conn = FailingConnection(engine.storage.conn)
+    with pytest.raises(sqlite3.OperationalError):
+        engine.record_sale('a', 3)
+    assert engine.needs_full_save
+    assert len(engine.sales_history) == 1
+    assert engine.sales_history[0]['quantity'] == 3
+    assert engine.sales_history[-1:] == [engine.sales_history[0]]
+
+    engine.record_sale('a', 1)
+    engine.save()
+    loaded = make_store.reopen(store)
+    assert loaded.products['a']['quantity'] == 6
+    assert [sale['quantity'] for sale in loaded.sales_history] == [3, 1]
+    assert loaded.total_revenue == 4 * 2.5
+    assert loaded.rollups.sales_count == 2
+    assert sum(t for _, _, t in loaded.rollups.daily.values()) == 2
+
+
+def test_read_only_db_without_rollup_tables(ecom, make_store, tmp_path):
+    store = tmp_path / 'store.db'
+    engine = make_store(store, {'a': 10, 'b': 10}, [('a', 2), ('b', 1), ('a', 1)])
+    expected = engine.rollups.to_dict()
+    engine.close()
+    # As written before the rollup tables existed
+    conn = sqlite3.connect(store)
+    for table in ('rollup_daily', 'rollup_products'):
+        conn.execute(f"DROP TABLE {table}")
+    conn.close()
+
+    loaded = ecom.StoreEngine(str(store), read_only=True)
+    loaded.load()
+    try:
+        assert loaded.rollups.to_dict() == expected
+    finally:
+        loaded.close()
+
+
+def test_sqlite_snapshots_share_a_connection_per_thread(make_store, tmp_path):
+    engine = make_store(tmp_path / 'store.db', {'a': 10}, [('a', 1)])
+    first, second = engine.sales_history.snapshot(), engine.sales_history.snapshot()
+    assert first.conn is second.conn is not engine.sales_history.conn
+    engine.record_sale('a', 2)
+    assert [sale['quantity'] for sale in first] == [1]
+    assert [sale['quantity'] for sale in engine.sales_history.snapshot()] == [1, 2]
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(first.snapshot().conn))
+    thread.start()
+    thread.join()
+    assert other[0] is not first.conn